@@ -1,8 +1,9 @@
+from django.conf import settings
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
 
 from blog.models import Post
-from core.elasticsearch import COMMON_ANALYSIS, ActiveOnlyMixin
+from core.elasticsearch import COMMON_ANALYSIS, SUGGEST_CONTEXTS, ActiveOnlyMixin, build_suggestions
 
 
 class PostDocument(ActiveOnlyMixin, Document):
@@ -15,6 +16,8 @@ class PostDocument(ActiveOnlyMixin, Document):
             "phonetic": fields.TextField(analyzer="name_phonetic"),
         },
     )
+    slug = fields.KeywordField(attr="slug")
+    suggest = fields.CompletionField(analyzer="autocomplete_search", contexts=SUGGEST_CONTEXTS)
 
     class Index:
         name = "posts"
@@ -32,5 +35,8 @@ class PostDocument(ActiveOnlyMixin, Document):
     def prepare_title(self, instance):
         return getattr(instance, "title", "") or ""
 
+    def prepare_suggest(self, instance):
+        return build_suggestions({settings.LANGUAGE_CODE: instance.title})
+
 
 registry.register_document(PostDocument)
@@ -4,10 +4,11 @@ from rest_framework.viewsets import ReadOnlyModelViewSet
 from blog.filters import PostFilter
 from blog.models import Post
 from blog.serializers import PostSerializer
+from core.mixins import ConditionalGetMixin
 from core.permissions import EvibesPermission
 
 
-class PostViewSet(ReadOnlyModelViewSet):
+class PostViewSet(ConditionalGetMixin, ReadOnlyModelViewSet):
     serializer_class = PostSerializer
     permission_classes = (EvibesPermission,)
     queryset = Post.objects.filter(is_active=True)
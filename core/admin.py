@@ -9,6 +9,7 @@ from django.utils.translation import gettext_lazy as _
 from modeltranslation.admin import TabbedTranslationAdmin
 from mptt.admin import DraggableMPTTAdmin
 
+from core.utils.caching import CATALOG_MODELS, bump_model_version
 from evibes.settings import CONSTANCE_CONFIG
 
 from .forms import OrderForm, OrderProductForm, VendorForm
@@ -27,6 +28,7 @@ from .models import (
     ProductTag,
     PromoCode,
     Promotion,
+    SearchQuery,
     Stock,
     Vendor,
     Wishlist,
@@ -37,13 +39,21 @@ class BasicModelAdmin(ModelAdmin):
     @admin.action(description=str(_("activate selected %(verbose_name_plural)s")))
     def activate_selected(self, request, queryset) -> str:
         queryset.update(is_active=True)
+        self.bump_catalog_version(queryset)
         return ""
 
     @admin.action(description=str(_("deactivate selected %(verbose_name_plural)s")))
     def deactivate_selected(self, request, queryset) -> str:
         queryset.update(is_active=False)
+        self.bump_catalog_version(queryset)
         return ""
 
+    @staticmethod
+    def bump_catalog_version(queryset) -> None:
+        # update() sends no signals, cached catalog responses have to be invalidated here
+        if queryset.model._meta.label in CATALOG_MODELS:
+            bump_model_version(queryset.model._meta.label)
+
     def get_actions(self, request):
         actions = super().get_actions(request)
         actions["activate_selected"] = (
@@ -360,6 +370,15 @@ class ProductImageAdmin(BasicModelAdmin):
     autocomplete_fields = ("product",)
 
 
+@admin.register(SearchQuery)
+class SearchQueryAdmin(ModelAdmin):
+    list_display = ("query", "locale", "source", "tier", "total_results", "latency", "searched_at")
+    list_filter = ("locale", "source", "tier", "searched_at")
+    search_fields = ("query",)
+    date_hierarchy = "searched_at"
+    readonly_fields = ("query", "locale", "source", "tier", "results", "total_results", "latency", "searched_at")
+
+
 @admin.register(Address)
 class AddressAdmin(GISModelAdmin):
     list_display = ("street", "city", "region", "country", "user")
@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 
 from core.sitemaps import BrandSitemap, CategorySitemap, ProductSitemap
 from core.views import (
+    AutocompleteView,
     CacheOperatorView,
     ContactUsView,
     GlobalSearchView,
@@ -57,6 +58,7 @@ urlpatterns = [
     path("sitemap-<section>-<int:page>.xml", sitemap_detail, {"sitemaps": sitemaps}, name="sitemap-detail"),
     path("download/<str:order_product_uuid>/", download_digital_asset_view, name="download_digital_asset"),
     path("search/", GlobalSearchView.as_view(), name="global_search"),
+    path("search/autocomplete/", AutocompleteView.as_view(), name="autocomplete"),
     path("app/cache/", CacheOperatorView.as_view(), name="cache_operator"),
     path("app/languages/", SupportedLanguagesView.as_view(), name="supported_languages"),
     path("app/parameters/", WebsiteParametersView.as_view(), name="parameters"),
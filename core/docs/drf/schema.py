@@ -0,0 +1,37 @@
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.openapi import AutoSchema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+class EvibesAutoSchema(AutoSchema):
+    """AutoSchema documenting the `fields` and `expand` parameters of the EvibesViewSet reads."""
+
+    def get_override_parameters(self):
+        parameters = super().get_override_parameters()
+        if self.method != "GET" or not hasattr(self.view, "get_sparse_fields"):
+            return parameters
+
+        parameters.append(
+            OpenApiParameter(
+                name="fields",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=_(
+                    "Comma-separated fields to render, all others are left out, e.g. `uuid,name,category.slug`. "
+                    "Dotted paths narrow nested objects."
+                ),
+            )
+        )
+        expandable = getattr(self.view, "expandable_fields", {})
+        if expandable:
+            parameters.append(
+                OpenApiParameter(
+                    name="expand",
+                    type=OpenApiTypes.STR,
+                    location=OpenApiParameter.QUERY,
+                    description=_("Comma-separated fields to render in full: %(fields)s")
+                    % {"fields": ", ".join(f"`{name}`" for name in expandable)},
+                )
+            )
+        return parameters
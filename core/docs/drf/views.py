@@ -1,7 +1,7 @@
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework import status
-from rest_framework.fields import CharField, DictField, JSONField, ListField
+from rest_framework.fields import CharField, DictField, FloatField, JSONField, ListField
 
 from core.docs.drf import error
 from core.serializers import (
@@ -78,7 +78,11 @@ SEARCH_SCHEMA = {
         responses={
             200: inline_serializer(
                 name="GlobalSearchResponse",
-                fields={"results": DictField(child=ListField(child=DictField(child=CharField())))},
+                fields={
+                    "results": DictField(child=ListField(child=DictField(child=CharField()))),
+                    "tier": CharField(),
+                    "timings": DictField(child=FloatField()),
+                },
             ),
             400: inline_serializer(name="GlobalSearchErrorResponse", fields={"error": CharField()}),
         },
@@ -86,6 +90,33 @@ SEARCH_SCHEMA = {
     )
 }
 
+AUTOCOMPLETE_SCHEMA = {
+    "get": extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                description="The prefix typed so far.",
+                required=True,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="size",
+                description="Maximum number of suggestions, 20 at most.",
+                required=False,
+                type=int,
+            ),
+        ],
+        responses={
+            200: inline_serializer(
+                name="AutocompleteResponse",
+                fields={"results": DictField(child=ListField(child=DictField(child=CharField())))},
+            ),
+            400: inline_serializer(name="AutocompleteErrorResponse", fields={"error": CharField()}),
+        },
+        description=(_("typeahead suggestions for the request language, grouped by index")),
+    )
+}
+
 BUY_AS_BUSINESS_SCHEMA = {
     "post": extend_schema(
         summary=_("purchase an order as a business"),
@@ -1,11 +1,29 @@
+import asyncio
+import logging
+import unicodedata
+from datetime import timedelta
+from hashlib import sha1
+from itertools import batched
+from time import monotonic, sleep, time
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import Http404
+from django.core.cache import cache
+from django.utils import timezone, translation
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django_elasticsearch_dsl import fields
 from django_elasticsearch_dsl.registries import registry
-from elasticsearch import NotFoundError
-from elasticsearch.dsl import Q, Search
+from elasticsearch import ApiError, AsyncElasticsearch, TransportError
+from elasticsearch.dsl import AsyncSearch, Q, Search, connections
+from elasticsearch.helpers import bulk, parallel_bulk, streaming_bulk
+
+from core.elasticsearch.breaker import search_breaker
+
+logger = logging.getLogger(__name__)
+
+INDEX_GENERATION_CACHE_KEY = "elasticsearch:index_generation"
 
 SMART_FIELDS = [
     "name^4",
@@ -29,63 +47,473 @@ SMART_FIELDS = [
 ]
 
 
+def get_index_generation() -> int:
+    """Return the current search index generation, search cache entries of older generations are never read."""
+    generation = cache.get(INDEX_GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(INDEX_GENERATION_CACHE_KEY, int(time()), timeout=None)
+        generation = cache.get(INDEX_GENERATION_CACHE_KEY, 0)
+    return generation
+
+
+def bump_index_generation() -> int:
+    """Start a new index generation, invalidating every cached search result at once."""
+    try:
+        return cache.incr(INDEX_GENERATION_CACHE_KEY)
+    except ValueError:
+        generation = int(time())
+        cache.set(INDEX_GENERATION_CACHE_KEY, generation, timeout=None)
+        return generation
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, unicode forms and whitespace, so equivalent queries share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+SEARCH_INDICES = ("products", "categories", "brands", "posts")
+
+SEARCH_ERRORS = (ApiError, TransportError)
+
+
+def record_search_error(error: Exception) -> None:
+    """
+    Count `error` against the search breaker when Elasticsearch itself failed: transport errors,
+    timeouts and 5xx answers. A 4xx is caused by the request and proves the cluster answers.
+    """
+    status = getattr(getattr(error, "meta", None), "status", None)
+    if isinstance(error, TransportError) or (isinstance(error, ApiError) and (status is None or status >= 500)):
+        search_breaker.record_failure()
+    else:
+        search_breaker.record_success()
+
+
+def search_client():
+    """The default client bounded by ELASTICSEARCH_SEARCH_TIMEOUT, without retries, for request-path searches."""
+    return connections.get_connection().options(
+        request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT, max_retries=0, retry_on_timeout=False
+    )
+
+
+_async_search_clients = WeakKeyDictionary()
+
+
+def async_search_client() -> AsyncElasticsearch:
+    """
+    `search_client` for async views: an AsyncElasticsearch of the default connection over httpx,
+    one per event loop so every request the loop serves shares its ELASTICSEARCH_ASYNC_CONNECTIONS.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_search_clients.get(loop)
+    if client is None:
+        client = _async_search_clients[loop] = AsyncElasticsearch(
+            **settings.ELASTICSEARCH_DSL["default"],
+            node_class="httpxasync",
+            connections_per_node=settings.ELASTICSEARCH_ASYNC_CONNECTIONS,
+            request_timeout=settings.ELASTICSEARCH_SEARCH_TIMEOUT,
+            max_retries=0,
+            retry_on_timeout=False,
+        )
+    return client
+
+
+TRANSLATED_FIELDS = ("name", "description")
+
+
+def search_language(language: str | None = None) -> str:
+    """Return `language`, or the active one, when it is one of LANGUAGES, LANGUAGE_CODE otherwise."""
+    language = (language or translation.get_language() or "").lower()
+    return language if language in dict(settings.LANGUAGES) else settings.LANGUAGE_CODE
+
+
+def language_subfields(language: str) -> tuple[str, ...]:
+    """Sub-fields indexed for the translated fields of `language`, see ELASTICSEARCH_LANGUAGE_SUBFIELDS."""
+    subfields = settings.ELASTICSEARCH_LANGUAGE_SUBFIELDS
+    return tuple(subfields.get(language, subfields["*"]))
+
+
+def search_fields(language: str | None = None) -> list[str]:
+    """
+    SMART_FIELDS routed to a single locale.
+
+    Translated fields are searched in `language` only, through the sub-fields that language
+    indexes, followed by the untranslated fields which hold the fallback language value.
+    """
+    language = search_language(language)
+    available = language_subfields(language)
+    suffix = language.replace("-", "_")
+
+    localized = []
+    for field in SMART_FIELDS:
+        path, _sep, boost = field.partition("^")
+        base, _sep, subfield = path.partition(".")
+        if base in TRANSLATED_FIELDS and (not subfield or subfield in available):
+            localized.append(f"{base}_{suffix}{f'.{subfield}' if subfield else ''}{f'^{boost}' if boost else ''}")
+    return localized + SMART_FIELDS
+
+
+def _exact_fields(fields: list[str]) -> list[str]:
+    return [f for f in fields if ".ngram" not in f and ".phonetic" not in f and ".auto" not in f]
+
+
+def _auto_fields(fields: list[str]) -> list[str]:
+    return [f for f in fields if ".auto" in f]
+
+
+def _fuzzy_fields(fields: list[str]) -> list[str]:
+    return [f for f in fields if ".phonetic" not in f]
+
+
+def _prefix_tier(query: str, fields: list[str]) -> Q:
+    """Exact terms and edge-ngram prefixes only: cheap, and enough for exact names and typeahead."""
+    return Q(
+        "bool",
+        should=[
+            Q("multi_match", query=query, fields=_exact_fields(fields), operator="and"),
+            Q("multi_match", query=query, fields=_auto_fields(fields), type="bool_prefix"),
+        ],
+        minimum_should_match=1,
+    )
+
+
+def _fuzzy_tier(query: str, fields: list[str]) -> Q:
+    """Typo tolerance over exact, n-gram and prefix sub-fields."""
+    return Q(
+        "bool",
+        should=[
+            Q("multi_match", query=query, fields=_fuzzy_fields(fields), fuzziness="AUTO", operator="and"),
+            Q("multi_match", query=query, fields=_auto_fields(fields), type="bool_prefix"),
+        ],
+        minimum_should_match=1,
+    )
+
+
+def _phonetic_tier(query: str, fields: list[str]) -> Q:
+    """The most lenient shape: fuzziness over every field, phonetic sub-fields included."""
+    return Q(
+        "bool",
+        should=[
+            Q("multi_match", query=query, fields=fields, fuzziness="AUTO", operator="and"),
+            Q("multi_match", query=query, fields=_auto_fields(fields), type="bool_prefix"),
+        ],
+        minimum_should_match=1,
+    )
+
+
+SEARCH_TIERS = (
+    ("prefix", _prefix_tier),
+    ("fuzzy", _fuzzy_tier),
+    ("phonetic", _phonetic_tier),
+)
+
+
 def process_query(query: str = ""):
     """
     Perform a lenient, typo‑tolerant, multi‑index search.
 
-    * Full‑text with fuzziness for spelling mistakes
-    * `bool_prefix` for edge‑ngram autocomplete / “icontains”
+    * Exact terms and `bool_prefix` edge‑ngram prefixes first
+    * Fuzziness and phonetic matching only when the cheaper tiers found too little
+
+    Returns the matches grouped by index, see `search_catalog` for the tier and timings.
     """
-    if not query:
+    return search_catalog(query)["results"]
+
+
+def _search_cache_key(normalized: str) -> str:
+    digest = sha1(normalized.encode()).hexdigest()
+    return f"search:{get_index_generation()}:{translation.get_language()}:{digest}"
+
+
+def _search_cache_timeout(response: dict) -> int:
+    # Fallback answers only live until the breaker probes Elasticsearch again
+    if response["tier"] == "database":
+        return settings.ELASTICSEARCH_BREAKER_COOLDOWN
+    return settings.ELASTICSEARCH_SEARCH_CACHE_TIMEOUT
+
+
+def search_catalog(query: str = "") -> dict:
+    """
+    Run the tiered search for `query` and return ``{"results", "tier", "timings"}``.
+
+    Tiers run from the cheapest to the most lenient and stop as soon as one returns at least
+    ELASTICSEARCH_SEARCH_MIN_HITS hits; `tier` names the one that answered and `timings`
+    holds the latency of every executed tier in milliseconds.
+
+    Responses are cached per normalized query, active language and index generation for
+    ELASTICSEARCH_SEARCH_CACHE_TIMEOUT seconds. Concurrent misses for the same key are
+    collapsed: only one caller queries Elasticsearch while the others wait for its result.
+    """
+    if not query or not query.strip():
         raise ValueError(_("no search term provided."))
 
-    query = query.strip()
+    normalized = normalize_query(query)
+    cache_key = _search_cache_key(normalized)
+
+    response = cache.get(cache_key)
+    if response is not None:
+        return response
+
+    lock_key = f"{cache_key}:lock"
+    lock_timeout = settings.ELASTICSEARCH_SEARCH_CACHE_LOCK_TIMEOUT
+
+    locked = cache.add(lock_key, 1, timeout=lock_timeout)
+    if not locked:
+        deadline = monotonic() + lock_timeout
+        while monotonic() < deadline:
+            sleep(0.05)
+            response = cache.get(cache_key)
+            if response is not None:
+                return response
+            if locked := cache.add(lock_key, 1, timeout=lock_timeout):
+                break
+        else:
+            logger.warning(f"Search for {normalized!r} did not complete in {lock_timeout}s, querying directly")
+
     try:
-        # Build the boolean query
-        q = Q(
-            "bool",
-            should=[
-                Q(
-                    "multi_match",
-                    query=query,
-                    fields=SMART_FIELDS,
-                    fuzziness="AUTO",
-                    operator="and",
-                ),
-                Q(
-                    "multi_match",
-                    query=query,
-                    fields=[f for f in SMART_FIELDS if f.endswith(".auto")],
-                    type="bool_prefix",
-                ),
-            ],
-            minimum_should_match=1,
+        response = _guarded_search(normalized)
+        cache.set(cache_key, response, timeout=_search_cache_timeout(response))
+        return response
+    finally:
+        # A caller that gave up waiting doesn't own the lock, the one holding it releases it
+        if locked:
+            cache.delete(lock_key)
+
+
+async def asearch_catalog(query: str = "") -> dict:
+    """
+    `search_catalog` for async views. The tiers are awaited on `async_search_client`, so a
+    slow Elasticsearch holds neither a worker nor a thread; the cache, breaker and database
+    fallback, which are quick or rare, run through `sync_to_async`.
+    """
+    if not query or not query.strip():
+        raise ValueError(_("no search term provided."))
+
+    normalized = normalize_query(query)
+    cache_key = await sync_to_async(_search_cache_key)(normalized)
+
+    response = await cache.aget(cache_key)
+    if response is not None:
+        return response
+
+    lock_key = f"{cache_key}:lock"
+    lock_timeout = settings.ELASTICSEARCH_SEARCH_CACHE_LOCK_TIMEOUT
+
+    locked = await cache.aadd(lock_key, 1, timeout=lock_timeout)
+    if not locked:
+        deadline = monotonic() + lock_timeout
+        while monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            response = await cache.aget(cache_key)
+            if response is not None:
+                return response
+            if locked := await cache.aadd(lock_key, 1, timeout=lock_timeout):
+                break
+        else:
+            logger.warning(f"Search for {normalized!r} did not complete in {lock_timeout}s, querying directly")
+
+    try:
+        response = await _guarded_asearch(normalized)
+        await cache.aset(cache_key, response, timeout=_search_cache_timeout(response))
+        return response
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+
+
+def _fallback_search(query: str) -> dict:
+    from core.elasticsearch.fallback import trigram_search
+
+    started = monotonic()
+    results = trigram_search(query)
+    return {"results": results, "tier": "database", "timings": {"database": round((monotonic() - started) * 1000, 2)}}
+
+
+def _guarded_search(query: str) -> dict:
+    """
+    Run `_search` through the circuit breaker, answering from the pg_trgm fallback while
+    Elasticsearch is failing or the breaker is open.
+    """
+    if search_breaker.allow():
+        try:
+            response = _search(query)
+        except SEARCH_ERRORS as e:
+            record_search_error(e)
+            logger.warning(f"Search for {query!r} failed, answering from the database: {e!s}")
+        else:
+            search_breaker.record_success()
+            return response
+
+    return _fallback_search(query)
+
+
+async def _guarded_asearch(query: str) -> dict:
+    """`_guarded_search` awaiting `_asearch`."""
+    if await sync_to_async(search_breaker.allow)():
+        try:
+            response = await _asearch(query)
+        except SEARCH_ERRORS as e:
+            await sync_to_async(record_search_error)(e)
+            logger.warning(f"Search for {query!r} failed, answering from the database: {e!s}")
+        else:
+            await sync_to_async(search_breaker.record_success)()
+            return response
+
+    return await sync_to_async(_fallback_search)(query)
+
+
+def _alias_of(index: str) -> str:
+    """Map a concrete `<alias>-<timestamp>` index name back to the alias it serves."""
+    for alias in SEARCH_INDICES:
+        if index == alias or index.startswith(f"{alias}-"):
+            return alias
+    return index
+
+
+def _search_results(response) -> dict:
+    results = {"products": [], "categories": [], "brands": [], "posts": []}
+    for hit in response.hits:
+        obj_uuid = getattr(hit, "uuid", None) or hit.meta.id
+        obj_name = getattr(hit, "name", None) or getattr(hit, "title", None) or "N/A"
+        # Safely generate a slug
+        obj_slug = getattr(hit, "slug", None) or slugify(obj_name)
+
+        idx = _alias_of(hit.meta.index)
+        if idx in results:
+            results[idx].append(
+                {
+                    "uuid": str(obj_uuid),
+                    "name": obj_name,
+                    "slug": obj_slug,
+                }
+            )
+    return results
+
+
+def _search(query: str) -> dict:
+    timings = {}
+    results = {}
+    tier = None
+    fields = search_fields()
+    client = search_client()
+
+    for tier, build in SEARCH_TIERS:
+        started = monotonic()
+        response = (
+            Search(using=client, index=list(SEARCH_INDICES)).query(build(query, fields)).extra(size=100).execute()
         )
+        timings[tier] = round((monotonic() - started) * 1000, 2)
+
+        results = _search_results(response)
+        if len(response.hits) >= settings.ELASTICSEARCH_SEARCH_MIN_HITS:
+            break
 
-        # Execute search across multiple indices
-        search = Search(index=["products", "categories", "brands", "posts"]).query(q).extra(size=100)
-        response = search.execute()
-
-        # Collect results, guard against None values
-        results = {"products": [], "categories": [], "brands": [], "posts": []}
-        for hit in response.hits:
-            obj_uuid = getattr(hit, "uuid", None) or hit.meta.id
-            obj_name = getattr(hit, "name", None) or getattr(hit, "title", None) or "N/A"
-            # Safely generate a slug
-            obj_slug = getattr(hit, "slug", None) or slugify(obj_name)
-
-            idx = hit.meta.index
-            if idx in results:
-                results[idx].append(
-                    {
-                        "uuid": str(obj_uuid),
-                        "name": obj_name,
-                        "slug": obj_slug,
-                    }
-                )
+    logger.debug(f"Search for {query!r} answered by the {tier} tier, timings: {timings}")
+    return {"results": results, "tier": tier, "timings": timings}
+
+
+async def _asearch(query: str) -> dict:
+    timings = {}
+    results = {}
+    tier = None
+    fields = search_fields()
+    client = async_search_client()
+
+    for tier, build in SEARCH_TIERS:
+        started = monotonic()
+        response = await (
+            AsyncSearch(using=client, index=list(SEARCH_INDICES)).query(build(query, fields)).extra(size=100).execute()
+        )
+        timings[tier] = round((monotonic() - started) * 1000, 2)
+
+        results = _search_results(response)
+        if len(response.hits) >= settings.ELASTICSEARCH_SEARCH_MIN_HITS:
+            break
+
+    logger.debug(f"Search for {query!r} answered by the {tier} tier, timings: {timings}")
+    return {"results": results, "tier": tier, "timings": timings}
+
+
+SUGGEST_CONTEXTS = [{"name": "locale", "type": "category"}]
+
+
+def build_suggestions(values: dict[str, str]) -> list[dict]:
+    """
+    Build completion inputs scoped per locale from a language code -> text mapping.
+
+    Languages without their own text suggest the text of the first fallback language that
+    has one, mirroring modeltranslation. Locales sharing a text share a single input.
+    """
+    locales_by_text = {}
+    for code, _name in settings.LANGUAGES:
+        text = values.get(code) or next(
+            (values[lang] for lang in settings.MODELTRANSLATION_FALLBACK_LANGUAGES if values.get(lang)), None
+        )
+        if text:
+            locales_by_text.setdefault(text, []).append(code)
+    return [{"input": [text], "contexts": {"locale": locales}} for text, locales in locales_by_text.items()]
+
+
+def autocomplete(query: str, size: int | None = None) -> dict:
+    """
+    Return typeahead suggestions for `query` in the active language, grouped by index.
+
+    A single completion suggester request across every index, with `_source` limited to the
+    uuid and slug, answers each keystroke. Responses are micro-cached for
+    ELASTICSEARCH_AUTOCOMPLETE_CACHE_TIMEOUT seconds.
+    """
+    prefix = " ".join(unicodedata.normalize("NFKC", query or "").split())
+    if not prefix:
+        raise ValueError(_("no search term provided."))
+
+    size = max(1, min(size or settings.ELASTICSEARCH_AUTOCOMPLETE_SIZE, 20))
+    language = search_language()
+    digest = sha1(prefix.casefold().encode()).hexdigest()
+    cache_key = f"autocomplete:{get_index_generation()}:{language}:{size}:{digest}"
+
+    results = cache.get(cache_key)
+    if results is not None:
         return results
-    except NotFoundError:
-        raise Http404
+
+    if search_breaker.allow():
+        try:
+            results = _suggest(prefix, size, language)
+        except SEARCH_ERRORS as e:
+            record_search_error(e)
+            logger.warning(f"Autocomplete for {prefix!r} failed, answering from the database: {e!s}")
+        else:
+            search_breaker.record_success()
+            cache.set(cache_key, results, timeout=settings.ELASTICSEARCH_AUTOCOMPLETE_CACHE_TIMEOUT)
+            return results
+
+    from core.elasticsearch.fallback import trigram_search
+
+    return trigram_search(prefix, size)
+
+
+def _suggest(prefix: str, size: int, language: str) -> dict:
+    search = (
+        Search(using=search_client(), index=list(SEARCH_INDICES))
+        .source(["uuid", "slug"])
+        .suggest(
+            "names",
+            prefix,
+            completion={"field": "suggest", "size": size, "skip_duplicates": True, "contexts": {"locale": [language]}},
+        )
+        .extra(size=0)
+    )
+    response = search.execute()
+
+    results = {alias: [] for alias in SEARCH_INDICES}
+    for option in response.suggest.names[0].options:
+        source = option._source
+        results.setdefault(_alias_of(option._index), []).append(
+            {
+                "uuid": str(getattr(source, "uuid", None) or option._id),
+                "name": option.text,
+                "slug": getattr(source, "slug", None) or slugify(option.text),
+            }
+        )
+    return results
 
 
 LANGUAGE_ANALYZER_MAP = {
@@ -119,11 +547,19 @@ class ActiveOnlyMixin:
     """QuerySet & indexing helpers, so only *active* objects are indexed."""
 
     def get_queryset(self):
-        return super().get_queryset().filter(is_active=True)
+        return self.annotate_queryset(super().get_queryset().filter(is_active=True))
+
+    def annotate_queryset(self, queryset):
+        """Hook adding SQL-computed values used by the document's prepare methods."""
+        return queryset
 
     def should_index_object(self, obj):
         return getattr(obj, "is_active", False)
 
+    def get_changed_queryset(self, since):
+        """Rows whose indexed representation may have changed after `since`, inactive ones included."""
+        return self.django.model._default_manager.filter(modified__gt=since)
+
 
 COMMON_ANALYSIS = {
     "filter": {
@@ -138,12 +574,87 @@ COMMON_ANALYSIS = {
         "name_phonetic": {"tokenizer": "standard", "filter": ["lowercase", "asciifolding", "double_metaphone"]},
         "query_lc": {"tokenizer": "standard", "filter": ["lowercase", "asciifolding"]},
     },
+    "normalizer": {
+        "lowercase_ascii": {"type": "custom", "filter": ["lowercase", "asciifolding"]},
+    },
+}
+
+
+def localized_value(row: dict, field: str) -> str:
+    """
+    Pick the value of a translated `field` from a `.values()` row the way modeltranslation
+    would for an instance: the active language first, then the fallback languages.
+    """
+    languages = (translation.get_language() or settings.LANGUAGE_CODE, *settings.MODELTRANSLATION_FALLBACK_LANGUAGES)
+    for language in languages:
+        value = row.get(f"{field}_{language.replace('-', '_').lower()}")
+        if value:
+            return value
+    return row.get(field) or ""
+
+
+class RowPrepareMixin:
+    """
+    Vectorized preparation path building documents straight from `.values()` rows.
+
+    Each prepared field is read from `prepare_<field>_row(row)` when defined, otherwise from
+    the row column of the same name, so no model instances are constructed while indexing.
+    """
+
+    row_fields: tuple[str, ...] = ()
+
+    def get_values_queryset(self, queryset=None):
+        queryset = self.get_queryset() if queryset is None else queryset
+        columns = {f.attname for f in queryset.model._meta.concrete_fields} | set(queryset.query.annotations)
+        return queryset.values(
+            "pk",
+            *self.row_fields,
+            *(name for name, _field, _fn in self._prepared_fields if name in columns),
+        )
+
+    def load_row_relations(self, rows: list[dict]) -> None:
+        """Hook fetching related data for a batch of rows with a constant number of queries."""
+
+    def prepare_row(self, row: dict) -> dict:
+        data = {}
+        for name, _field, _fn in self._prepared_fields:
+            prepare = getattr(self, f"prepare_{name}_row", None)
+            data[name] = prepare(row) if prepare else row.get(name)
+        return data
+
+    def get_row_actions(self, queryset=None, index: str | None = None, chunk_size: int = 2000):
+        index = index or self._index._name
+        for rows in batched(self.get_values_queryset(queryset).iterator(chunk_size=chunk_size), chunk_size):
+            self.load_row_relations(rows)
+            for row in rows:
+                yield {
+                    "_op_type": "index",
+                    "_index": index,
+                    "_id": str(row["pk"]),
+                    "_source": self.prepare_row(row),
+                }
+
+
+LANGUAGE_SUBFIELDS = {
+    "ngram": lambda: fields.TextField(analyzer="name_ngram", search_analyzer="query_lc"),
+    "phonetic": lambda: fields.TextField(analyzer="name_phonetic"),
+    "auto": lambda: fields.TextField(analyzer="autocomplete", search_analyzer="autocomplete_search"),
 }
 
 
+def _language_subfields(code: str) -> dict:
+    subfields = {"raw": fields.KeywordField(ignore_above=256)}
+    for name in language_subfields(code):
+        subfields[name] = LANGUAGE_SUBFIELDS[name]()
+    return subfields
+
+
 def _add_multilang_fields(cls):
     """
     Dynamically add multilingual name/description fields and prepare methods to guard against None.
+
+    Each language only gets the sub-fields ELASTICSEARCH_LANGUAGE_SUBFIELDS enables for it, and
+    nothing is copied into the untranslated fields, which keep the fallback language value.
     """
     for code, _lang in settings.LANGUAGES:
         lc = code.replace("-", "_").lower()
@@ -152,44 +663,190 @@ def _add_multilang_fields(cls):
         setattr(
             cls,
             name_field,
-            fields.TextField(
-                attr=name_field,
-                analyzer=_lang_analyzer(code),
-                copy_to="name",
-                fields={
-                    "raw": fields.KeywordField(ignore_above=256),
-                    "ngram": fields.TextField(analyzer="name_ngram", search_analyzer="query_lc"),
-                    "phonetic": fields.TextField(analyzer="name_phonetic"),
-                },
-            ),
+            fields.TextField(attr=name_field, analyzer=_lang_analyzer(code), fields=_language_subfields(code)),
         )
 
         # prepare_name_{lc} to ensure no None values
         def make_prepare(attr):
             return lambda self, instance: getattr(instance, attr, "") or ""
 
+        def make_prepare_row(attr):
+            return lambda self, row: row.get(attr) or ""
+
         setattr(cls, f"prepare_{name_field}", make_prepare(name_field))
+        setattr(cls, f"prepare_{name_field}_row", make_prepare_row(name_field))
 
         # description_{lc}
         desc_field = f"description_{lc}"
         setattr(
             cls,
             desc_field,
-            fields.TextField(
-                attr=desc_field,
-                analyzer=_lang_analyzer(code),
-                copy_to="description",
-                fields={
-                    "raw": fields.KeywordField(ignore_above=256),
-                    "ngram": fields.TextField(analyzer="name_ngram", search_analyzer="query_lc"),
-                    "phonetic": fields.TextField(analyzer="name_phonetic"),
-                },
-            ),
+            fields.TextField(attr=desc_field, analyzer=_lang_analyzer(code), fields=_language_subfields(code)),
         )
         setattr(cls, f"prepare_{desc_field}", make_prepare(desc_field))
+        setattr(cls, f"prepare_{desc_field}_row", make_prepare_row(desc_field))
+
+
+def _high_water_mark_key(index: str) -> str:
+    return f"elasticsearch:high_water_mark:{index}"
+
+
+def bulk_index(
+    document, queryset=None, index: str | None = None, chunk_size: int | None = None, thread_count: int | None = None
+) -> dict:
+    """
+    Feed `queryset` (the document's indexing queryset by default) into `index` and report throughput.
+
+    Documents providing `prepare_row` are built from `.values()` rows, others from model
+    instances. Actions are sent through `streaming_bulk`, or `parallel_bulk` when more than
+    one worker thread is requested. `parallel_bulk` consumes its actions in a thread of its
+    pool, so they are read from the database here, `thread_count` chunks at a time, and the
+    workers only get lists.
+    """
+    chunk_size = chunk_size or settings.ELASTICSEARCH_BULK_CHUNK_SIZE
+    thread_count = thread_count or settings.ELASTICSEARCH_BULK_THREAD_COUNT
+    index = index or document._index._name
 
+    if isinstance(document, RowPrepareMixin):
+        actions = document.get_row_actions(queryset, index=index, chunk_size=chunk_size)
+    else:
+        queryset = document.get_indexing_queryset() if queryset is None else queryset.iterator(chunk_size=chunk_size)
+        actions = ({**action, "_index": index} for action in document.get_actions(queryset, "index"))
+
+    es = connections.get_connection()
+    started = monotonic()
+    if thread_count > 1:
+        results = (
+            result
+            for window in batched(actions, chunk_size * thread_count)
+            for result in parallel_bulk(es, list(window), thread_count=thread_count, chunk_size=chunk_size)
+        )
+    else:
+        results = streaming_bulk(es, actions, chunk_size=chunk_size)
+
+    indexed = sum(1 for ok, _info in results if ok)
+    seconds = monotonic() - started
+    stats = {
+        "index": index,
+        "indexed": indexed,
+        "seconds": round(seconds, 3),
+        "docs_per_second": round(indexed / seconds, 1) if seconds else 0.0,
+    }
+    logger.info(f"Indexed {indexed} documents into {index!r} at {stats['docs_per_second']} docs/s")
+    return stats
+
+
+def rebuild_index(doc, chunk_size: int | None = None, thread_count: int | None = None) -> dict:
+    """
+    Build a fresh versioned index for `doc` and atomically point its alias at it.
+
+    The new `<alias>-<timestamp>` index is created with refresh disabled and no replicas,
+    bulk-loaded from the document's indexing queryset, switched back to the document's own
+    settings and only then swapped in, so searches never see a partially built index.
+    Indices previously behind the alias, or a concrete index holding the alias name, are removed.
+    """
+    es = connections.get_connection()
+    alias = doc._index._name
+    new_name = f"{alias[:234]}-{timezone.now():%Y%m%d%H%M%S%f}"
+    started = timezone.now()
+
+    new_index = doc._index.clone(name=new_name)
+    new_index.settings(refresh_interval="-1", number_of_replicas=0)
+    new_index.create()
+
+    try:
+        stats = bulk_index(doc(), index=new_name, chunk_size=chunk_size, thread_count=thread_count)
+        es.indices.put_settings(
+            index=new_name,
+            settings={
+                "index": {
+                    "refresh_interval": None,
+                    "number_of_replicas": doc._index._settings.get("number_of_replicas", 1),
+                }
+            },
+        )
+        es.indices.refresh(index=new_name)
+    except Exception:
+        es.indices.delete(index=new_name, ignore_unavailable=True)
+        raise
 
-def populate_index():
+    alias_actions = [{"add": {"alias": alias, "index": new_name}}]
+    old_indices = []
+    if es.indices.exists_alias(name=alias):
+        old_indices = list(es.indices.get_alias(name=alias).keys())
+        alias_actions.append({"remove": {"alias": alias, "indices": old_indices}})
+    elif es.indices.exists(index=alias):
+        alias_actions.append({"remove_index": {"index": alias}})
+    es.indices.update_aliases(actions=alias_actions)
+
+    for old_index in old_indices:
+        es.indices.delete(index=old_index, ignore_unavailable=True)
+
+    # Changes made while the new index was loading are picked up by the next incremental run
+    cache.set(_high_water_mark_key(alias), started, timeout=None)
+
+    logger.info(f"Rebuilt {alias!r} as {new_name!r} with {stats['indexed']} documents")
+    return {**stats, "mode": "full", "deleted": 0}
+
+
+def update_index(doc, chunk_size: int | None = None, thread_count: int | None = None) -> dict | None:
+    """
+    Index the rows of `doc` modified since the stored high-water mark and delete the ones
+    that became inactive. Returns None when no high-water mark exists yet.
+    """
+    alias = doc._index._name
+    since = cache.get(_high_water_mark_key(alias))
+    if since is None:
+        return None
+
+    started = timezone.now()
+    document = doc()
+    changed = document.get_changed_queryset(since - timedelta(seconds=settings.ELASTICSEARCH_INCREMENTAL_OVERLAP))
+
+    tombstones = list(changed.filter(is_active=False).values_list("pk", flat=True))
+    queryset = document.annotate_queryset(changed.filter(is_active=True))
+
+    stats = bulk_index(document, queryset, chunk_size=chunk_size, thread_count=thread_count)
+    deleted = remove_from_index(alias, tombstones)
+    if stats["indexed"]:
+        connections.get_connection().indices.refresh(index=alias)
+
+    cache.set(_high_water_mark_key(alias), started, timeout=None)
+
+    logger.info(f"Incrementally indexed {stats['indexed']} and deleted {deleted} documents in {alias!r}")
+    return {**stats, "mode": "incremental", "deleted": deleted}
+
+
+def populate_index(mode: str = "full", chunk_size: int | None = None, thread_count: int | None = None) -> list[dict]:
+    """
+    Synchronise every registered document with the database and return per-index statistics.
+
+    * ``"full"`` rebuilds each index from scratch behind its alias (see `rebuild_index`)
+    * ``"incremental"`` only sends rows changed since the previous run (see `update_index`),
+      falling back to a full rebuild for indices that were never built this way
+    """
+    if mode not in ("full", "incremental"):
+        raise ValueError(f"Unknown indexing mode {mode!r}")
+
+    results = []
     for doc in registry.get_documents(set(registry.get_models())):
-        qs = doc().get_indexing_queryset()
-        doc().update(qs, parallel=True, refresh=True)
+        stats = update_index(doc, chunk_size, thread_count) if mode == "incremental" else None
+        if stats is None:
+            stats = rebuild_index(doc, chunk_size, thread_count)
+        results.append(stats)
+
+    if any(stats["indexed"] or stats["deleted"] for stats in results):
+        bump_index_generation()
+
+    return results
+
+
+def remove_from_index(index: str, ids) -> int:
+    """
+    Remove documents from `index` in a single bulk request, ignoring the ones that are already gone.
+    """
+    actions = [{"_op_type": "delete", "_index": index, "_id": str(pk)} for pk in ids]
+    if not actions:
+        return 0
+    success, _errors = bulk(connections.get_connection(), actions, raise_on_error=False, raise_on_exception=False)
+    return success
@@ -0,0 +1,148 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone, translation
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from core.elasticsearch import asearch_catalog, normalize_query, search_catalog, search_language
+from core.models import SearchQuery
+
+logger = logging.getLogger(__name__)
+
+SEARCH_EVENTS_STREAM = "search:analytics"
+SEARCH_EVENTS_FLUSH_LOCK_KEY = "search:analytics:flush_lock"
+
+
+def record_search(query: str, locale: str, results: dict, latency: float, tier: str | None, source: str) -> None:
+    """
+    Buffer one search event in a capped Redis stream. A single XADD keeps the request path
+    cheap; `flush_search_events` moves the events to PostgreSQL in bulk. Failures are only
+    logged, analytics must never break a search.
+    """
+    counts = {index: len(hits) for index, hits in results.items()}
+    try:
+        get_redis_connection("default").xadd(
+            SEARCH_EVENTS_STREAM,
+            {
+                "query": normalize_query(query)[:255],
+                "locale": locale or settings.LANGUAGE_CODE,
+                "source": source,
+                "tier": tier or "",
+                "results": json.dumps(counts),
+                "latency": f"{latency:.2f}",
+                "searched_at": timezone.now().isoformat(),
+            },
+            maxlen=settings.SEARCH_ANALYTICS_STREAM_MAXLEN,
+            approximate=True,
+        )
+    except RedisError as e:
+        logger.warning(f"Could not record search analytics: {e!s}")
+
+
+def tracked_search(query: str, source: str) -> dict:
+    """`search_catalog` for user-facing APIs, recording the search for analytics."""
+    started = monotonic()
+    response = search_catalog(query)
+    latency = (monotonic() - started) * 1000
+    record_search(
+        query, search_language(translation.get_language()), response["results"], latency, response["tier"], source
+    )
+    return response
+
+
+async def atracked_search(query: str, source: str) -> dict:
+    """`tracked_search` for async views, awaiting `asearch_catalog`."""
+    started = monotonic()
+    response = await asearch_catalog(query)
+    latency = (monotonic() - started) * 1000
+    await sync_to_async(record_search)(
+        query, search_language(translation.get_language()), response["results"], latency, response["tier"], source
+    )
+    return response
+
+
+def flush_search_events(batch_size: int = 1000) -> int:
+    """
+    Move buffered search events to the SearchQuery table in batches, returns the number of moved events.
+    Only one flush runs at a time, a concurrent call returns 0 instead of saving the same events twice.
+    """
+    if not cache.add(SEARCH_EVENTS_FLUSH_LOCK_KEY, 1, timeout=settings.SEARCH_ANALYTICS_FLUSH_LOCK_TIMEOUT):
+        logger.debug("Search events are already being flushed")
+        return 0
+
+    try:
+        return _flush_search_events(batch_size)
+    finally:
+        cache.delete(SEARCH_EVENTS_FLUSH_LOCK_KEY)
+
+
+def _flush_search_events(batch_size: int) -> int:
+    redis = get_redis_connection("default")
+    flushed = 0
+
+    while entries := redis.xrange(SEARCH_EVENTS_STREAM, count=batch_size):
+        queries = []
+        for _entry_id, fields in entries:
+            event = {key.decode(): value.decode() for key, value in fields.items()}
+            results = json.loads(event["results"])
+            queries.append(
+                SearchQuery(
+                    query=event["query"],
+                    locale=event["locale"],
+                    source=event["source"],
+                    tier=event["tier"] or None,
+                    results=results,
+                    total_results=sum(results.values()),
+                    latency=float(event["latency"]),
+                    searched_at=datetime.fromisoformat(event["searched_at"]),
+                )
+            )
+
+        SearchQuery.objects.bulk_create(queries, batch_size=batch_size)
+        redis.xdel(SEARCH_EVENTS_STREAM, *(entry_id for entry_id, _fields in entries))
+        flushed += len(entries)
+
+    return flushed
+
+
+def purge_search_queries() -> int:
+    """Delete recorded searches older than SEARCH_ANALYTICS_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.SEARCH_ANALYTICS_RETENTION_DAYS)
+    deleted, _rows = SearchQuery.objects.filter(searched_at__lt=cutoff).delete()
+    return deleted
+
+
+def _rollup(since, locale: str | None = None):
+    queryset = SearchQuery.objects.nocache().filter(searched_at__gte=since)
+    if locale:
+        queryset = queryset.filter(locale=locale)
+    return queryset.values("query", "locale").annotate(
+        searches=Count("uuid"),
+        average_results=Avg("total_results"),
+        average_latency=Avg("latency"),
+        last_searched=Max("searched_at"),
+    )
+
+
+def top_queries(days: int = 7, limit: int = 50, locale: str | None = None) -> list[dict]:
+    """Most frequent queries of the last `days` days, per locale."""
+    since = timezone.now() - timedelta(days=days)
+    return list(_rollup(since, locale).order_by("-searches", "query")[:limit])
+
+
+def zero_result_queries(days: int = 7, limit: int = 50, locale: str | None = None) -> list[dict]:
+    """Most frequent queries of the last `days` days that never returned anything, synonym candidates."""
+    since = timezone.now() - timedelta(days=days)
+    return list(
+        _rollup(since, locale)
+        .annotate(found=Sum("total_results"))
+        .filter(found=0)
+        .order_by("-searches", "query")[:limit]
+    )
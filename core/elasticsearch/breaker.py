@@ -0,0 +1,89 @@
+import logging
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker shared by every worker through the cache.
+
+    * closed - calls go through, failures are counted within `window` seconds
+    * open - after `failure_threshold` failures calls are refused for `cooldown` seconds
+    * half-open - once the cooldown ran out a single caller probes the service, its outcome
+      closes the breaker or opens it for another cooldown
+    """
+
+    def __init__(self, name: str, failure_threshold: int, window: int, cooldown: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+
+    @property
+    def _failures_key(self) -> str:
+        return f"circuit_breaker:{self.name}:failures"
+
+    @property
+    def _open_until_key(self) -> str:
+        return f"circuit_breaker:{self.name}:open_until"
+
+    @property
+    def _probe_key(self) -> str:
+        return f"circuit_breaker:{self.name}:probe"
+
+    @property
+    def state(self) -> str:
+        open_until = cache.get(self._open_until_key)
+        if open_until is None:
+            return "closed"
+        return "open" if open_until > time() else "half-open"
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now, in half-open state only one caller gets a yes."""
+        match self.state:
+            case "closed":
+                return True
+            case "half-open":
+                return cache.add(self._probe_key, 1, timeout=self.cooldown)
+            case _:
+                return False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info(f"Circuit breaker {self.name!r} closed")
+            cache.delete_many([self._open_until_key, self._probe_key])
+        cache.delete(self._failures_key)
+
+    def record_failure(self) -> None:
+        if self.state == "half-open":
+            self.trip()
+            return
+
+        if cache.add(self._failures_key, 1, timeout=self.window):
+            failures = 1
+        else:
+            try:
+                failures = cache.incr(self._failures_key)
+            except ValueError:
+                failures = 1
+                cache.set(self._failures_key, failures, timeout=self.window)
+
+        if failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self) -> None:
+        logger.warning(f"Circuit breaker {self.name!r} opened for {self.cooldown}s")
+        cache.set(self._open_until_key, time() + self.cooldown, timeout=None)
+        cache.delete_many([self._failures_key, self._probe_key])
+
+
+search_breaker = CircuitBreaker(
+    "elasticsearch",
+    failure_threshold=settings.ELASTICSEARCH_BREAKER_FAILURES,
+    window=settings.ELASTICSEARCH_BREAKER_WINDOW,
+    cooldown=settings.ELASTICSEARCH_BREAKER_COOLDOWN,
+)
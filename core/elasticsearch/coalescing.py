@@ -0,0 +1,144 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django_elasticsearch_dsl.registries import registry
+from django_redis import get_redis_connection
+
+from core.elasticsearch import bulk_index, remove_from_index
+
+logger = logging.getLogger(__name__)
+
+DIRTY_SET_KEY = "elasticsearch:dirty"
+FLUSH_LOCK_KEY = "elasticsearch:dirty:flush_scheduled"
+
+_suspended: ContextVar[set | None] = ContextVar("suspended_indexing", default=None)
+
+
+def _member(instance) -> str:
+    return f"{instance._meta.label_lower}:{instance.pk}"
+
+
+def _push(members) -> int:
+    """Add members to the dirty set and schedule a flush once it grows past the threshold."""
+    redis = get_redis_connection("default")
+    members = list(members)
+    pipeline = redis.pipeline(transaction=False)
+    for start in range(0, len(members), 10000):
+        pipeline.sadd(DIRTY_SET_KEY, *members[start : start + 10000])
+    pipeline.scard(DIRTY_SET_KEY)
+    size = pipeline.execute()[-1]
+
+    if size >= settings.ELASTICSEARCH_COALESCE_MAX_ITEMS and redis.set(
+        FLUSH_LOCK_KEY, 1, nx=True, ex=settings.ELASTICSEARCH_COALESCE_INTERVAL
+    ):
+        from core.tasks import flush_search_index_task
+
+        flush_search_index_task.delay()
+
+    return size
+
+
+def mark_dirty(instance) -> None:
+    """
+    Record that `instance` has to be reindexed. Repeated saves of the same object collapse into
+    a single entry of the Redis set, which is drained by `flush_dirty`.
+    """
+    if instance.pk is None:
+        return
+
+    pending = _suspended.get()
+    if pending is not None:
+        pending.add(_member(instance))
+        return
+
+    _push((_member(instance),))
+
+
+def mark_dirty_pks(model, pks) -> None:
+    """`mark_dirty` for the objects of `model` with the primary keys `pks`, in a single round trip."""
+    members = {f"{model._meta.label_lower}:{pk}" for pk in pks}
+    if not members:
+        return
+
+    pending = _suspended.get()
+    if pending is not None:
+        pending.update(members)
+        return
+
+    _push(members)
+
+
+@contextmanager
+def suspended_indexing():
+    """
+    Suspend per-object index bookkeeping for the duration of a bulk import.
+
+    Objects saved or deleted inside the block are collected in memory and pushed to the dirty
+    set with a single round trip on exit, so the import does not pay a Redis call per row.
+    """
+    if _suspended.get() is not None:
+        yield
+        return
+
+    pending = set()
+    token = _suspended.set(pending)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+        if pending:
+            _push(pending)
+
+
+def _flush_batch(pks_by_model: dict) -> None:
+    for label, pks in pks_by_model.items():
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            logger.warning(f"Dropping {len(pks)} dirty objects of unknown model {label!r}")
+            continue
+
+        for doc in registry.get_documents([model]):
+            document = doc()
+            queryset = document.get_queryset().filter(pk__in=pks)
+            indexable = {str(pk) for pk in queryset.values_list("pk", flat=True)}
+            if indexable:
+                bulk_index(document, queryset, thread_count=1)
+            remove_from_index(doc._index._name, pks - indexable)
+
+
+def flush_dirty(batch_size: int | None = None) -> int:
+    """
+    Drain the dirty set in batches: rows that still exist and are indexable are bulk-indexed,
+    the rest are removed from their indices. A batch that fails is returned to the set before
+    the error propagates. Returns the number of processed objects.
+    """
+    batch_size = batch_size or settings.ELASTICSEARCH_COALESCE_MAX_ITEMS
+    redis = get_redis_connection("default")
+    processed = 0
+
+    try:
+        while members := redis.spop(DIRTY_SET_KEY, batch_size):
+            pks_by_model = {}
+            for member in members:
+                label, _sep, pk = member.decode().rpartition(":")
+                pks_by_model.setdefault(label, set()).add(pk)
+
+            try:
+                _flush_batch(pks_by_model)
+            except Exception:
+                # Popped members are gone from the set, put the batch back for the next flush
+                redis.sadd(DIRTY_SET_KEY, *members)
+                raise
+
+            processed += len(members)
+    finally:
+        redis.delete(FLUSH_LOCK_KEY)
+
+    if processed:
+        logger.info(f"Flushed {processed} dirty objects to Elasticsearch")
+
+    return processed
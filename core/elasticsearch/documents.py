@@ -1,11 +1,24 @@
+from contextlib import suppress
+
+from django.conf import settings
+from django.db.models import Avg, Exists, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
 
-from core.elasticsearch import COMMON_ANALYSIS, ActiveOnlyMixin, _add_multilang_fields
-from core.models import Brand, Category, Product
+from core.elasticsearch import (
+    COMMON_ANALYSIS,
+    SUGGEST_CONTEXTS,
+    ActiveOnlyMixin,
+    RowPrepareMixin,
+    _add_multilang_fields,
+    build_suggestions,
+    localized_value,
+)
+from core.models import AttributeValue, Brand, Category, Feedback, Product, Stock
 
 
-class _BaseDoc(ActiveOnlyMixin, Document):
+class _BaseDoc(ActiveOnlyMixin, RowPrepareMixin, Document):
     name = fields.TextField(
         attr="name",
         analyzer="standard",
@@ -26,6 +39,8 @@ class _BaseDoc(ActiveOnlyMixin, Document):
             "auto": fields.TextField(analyzer="autocomplete", search_analyzer="autocomplete_search"),
         },
     )
+    slug = fields.KeywordField(attr="slug")
+    suggest = fields.CompletionField(analyzer="autocomplete_search", contexts=SUGGEST_CONTEXTS)
 
     class Index:
         settings = {
@@ -41,9 +56,63 @@ class _BaseDoc(ActiveOnlyMixin, Document):
     def prepare_description(self, instance):
         return getattr(instance, "description", "") or ""
 
+    def prepare_suggest(self, instance):
+        return build_suggestions(
+            {code: getattr(instance, f"name_{code.replace('-', '_').lower()}", None) for code, _ in settings.LANGUAGES}
+        )
+
+    def prepare_uuid_row(self, row):
+        return str(row["uuid"])
+
+    def prepare_name_row(self, row):
+        return localized_value(row, "name")
+
+    def prepare_description_row(self, row):
+        return localized_value(row, "description")
+
+    def prepare_suggest_row(self, row):
+        return build_suggestions(
+            {code: row.get(f"name_{code.replace('-', '_').lower()}") for code, _ in settings.LANGUAGES}
+        )
+
 
 class ProductDocument(_BaseDoc):
     rating = fields.FloatField(attr="rating")
+    price = fields.FloatField()
+    quantity = fields.IntegerField()
+    # Every stock's price and quantity, a range query on them matches any stock like ProductFilter does
+    stock_prices = fields.DoubleField(multi=True)
+    stock_quantities = fields.IntegerField(multi=True)
+    has_stocks = fields.BooleanField()
+    is_digital = fields.BooleanField(attr="is_digital")
+    created = fields.DateField(attr="created")
+    modified = fields.DateField(attr="modified")
+    category = fields.ObjectField(
+        properties={
+            "uuid": fields.KeywordField(),
+            "name": fields.KeywordField(normalizer="lowercase_ascii"),
+            "slug": fields.KeywordField(normalizer="lowercase_ascii"),
+            "is_active": fields.BooleanField(),
+        }
+    )
+    category_ancestors = fields.KeywordField(multi=True)
+    brand = fields.ObjectField(
+        properties={
+            "uuid": fields.KeywordField(),
+            "name": fields.KeywordField(normalizer="lowercase_ascii"),
+            "is_active": fields.BooleanField(),
+        }
+    )
+    tags = fields.KeywordField(multi=True, normalizer="lowercase_ascii")
+    attributes = fields.NestedField(
+        properties={
+            "name": fields.KeywordField(normalizer="lowercase_ascii"),
+            "value": fields.KeywordField(normalizer="lowercase_ascii", ignore_above=256),
+            "value_number": fields.FloatField(),
+        }
+    )
+
+    row_fields = ("category_id", "brand_id", "min_stock_price", "total_quantity", "has_stock_rows")
 
     class Index(_BaseDoc.Index):
         name = "products"
@@ -51,6 +120,209 @@ class ProductDocument(_BaseDoc):
     class Django:
         model = Product
         fields = ["uuid"]
+        related_models = [AttributeValue, Stock]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Categories and brands are kept for the lifetime of the instance, one bulk run or one signal
+        self._category_rows = {}
+        self._brand_rows = {}
+        # Relations of the current batch of rows, replaced by every load_row_relations() call
+        self._row_stocks = {}
+        self._row_tags = {}
+        self._row_attributes = {}
+
+    def annotate_queryset(self, queryset):
+        ratings = (
+            Feedback.objects.filter(order_product__product=OuterRef("pk"))
+            .values("order_product__product")
+            .annotate(avg=Avg("rating"))
+            .values("avg")
+        )
+        stocks = Stock.objects.filter(product=OuterRef("pk"))
+        return queryset.annotate(
+            rating=Coalesce(Subquery(ratings, output_field=FloatField()), Value(0.0)),
+            min_stock_price=Coalesce(
+                Subquery(stocks.order_by("price").values("price")[:1], output_field=FloatField()), Value(0.0)
+            ),
+            total_quantity=Coalesce(
+                Subquery(
+                    stocks.values("product").annotate(total=Sum("quantity")).values("total"),
+                    output_field=IntegerField(),
+                ),
+                Value(0),
+            ),
+            has_stock_rows=Exists(stocks),
+        )
+
+    def get_changed_queryset(self, since):
+        # Tag links carry no timestamp, adding or removing one marks the product dirty through m2m_changed
+        return Product.objects.filter(
+            Q(modified__gt=since)
+            | Q(stocks__modified__gt=since)
+            | Q(attributes__modified__gt=since)
+            | Q(tags__modified__gt=since)
+            | Q(category__modified__gt=since)
+            | Q(brand__modified__gt=since)
+        ).distinct()
+
+    def get_instances_from_related(self, related_instance):
+        """The product whose indexed stocks or attributes `related_instance` is part of."""
+        return related_instance.product if related_instance.product_id else None
+
+    def get_category_rows(self, category_ids) -> dict:
+        """
+        Categories with their ancestry, by primary key. Only the categories of `category_ids` and
+        their ancestors that this document instance hasn't loaded yet are read.
+        """
+        missing = {pk for pk in category_ids if pk is not None and pk not in self._category_rows}
+        while missing:
+            loaded = list(
+                Category.objects.filter(pk__in=missing).values("pk", "parent_id", "uuid", "name", "slug", "is_active")
+            )
+            self._category_rows.update((row["pk"], row) for row in loaded)
+            missing = {
+                row["parent_id"]
+                for row in loaded
+                if row["parent_id"] is not None and row["parent_id"] not in self._category_rows
+            }
+
+        for row in self._category_rows.values():
+            if "ancestors" not in row:
+                ancestors, current = [], row
+                while current is not None:
+                    ancestors.append(str(current["uuid"]))
+                    current = self._category_rows.get(current["parent_id"])
+                row["ancestors"] = ancestors
+        return self._category_rows
+
+    def get_brand_rows(self, brand_ids) -> dict:
+        """Brands by primary key, only those of `brand_ids` this document instance hasn't loaded yet are read."""
+        missing = {pk for pk in brand_ids if pk is not None and pk not in self._brand_rows}
+        if missing:
+            self._brand_rows.update(
+                (row["pk"], row)
+                for row in Brand.objects.filter(pk__in=missing).values("pk", "uuid", "name", "is_active")
+            )
+        return self._brand_rows
+
+    def load_row_relations(self, rows):
+        pks = [row["pk"] for row in rows]
+        self.get_category_rows({row["category_id"] for row in rows})
+        self.get_brand_rows({row["brand_id"] for row in rows})
+
+        self._row_stocks = {}
+        for product_id, price, quantity in Stock.objects.filter(product_id__in=pks).values_list(
+            "product_id", "price", "quantity"
+        ):
+            self._row_stocks.setdefault(product_id, []).append((price, quantity))
+
+        self._row_tags = {}
+        for product_id, tag_name in Product.tags.through.objects.filter(product_id__in=pks).values_list(
+            "product_id", "producttag__tag_name"
+        ):
+            self._row_tags.setdefault(product_id, []).append(tag_name)
+
+        self._row_attributes = {}
+        for value in AttributeValue.objects.filter(product_id__in=pks, is_active=True).values(
+            "product_id", "value", "attribute__name", "attribute__value_type"
+        ):
+            self._row_attributes.setdefault(value["product_id"], []).append(
+                self._attribute(value["attribute__name"], value["value"], value["attribute__value_type"])
+            )
+
+    @staticmethod
+    def _attribute(name, value, value_type) -> dict:
+        number = None
+        if value_type in ("integer", "float"):
+            with suppress(TypeError, ValueError):
+                number = float(value)
+        return {"name": name, "value": value, "value_number": number}
+
+    @staticmethod
+    def _category(row) -> dict | None:
+        if row is None:
+            return None
+        return {"uuid": str(row["uuid"]), "name": row["name"], "slug": row["slug"], "is_active": row["is_active"]}
+
+    @staticmethod
+    def _brand(row) -> dict | None:
+        if row is None:
+            return None
+        return {"uuid": str(row["uuid"]), "name": row["name"], "is_active": row["is_active"]}
+
+    def prepare_rating(self, instance):
+        rating = instance.__dict__.get("rating")
+        return round(rating if rating is not None else instance.rating, 2)
+
+    def prepare_rating_row(self, row):
+        return round(row["rating"], 2)
+
+    def prepare_price(self, instance):
+        price = getattr(instance, "min_stock_price", None)
+        return round(price if price is not None else instance.price, 2)
+
+    def prepare_price_row(self, row):
+        return round(row["min_stock_price"], 2)
+
+    def prepare_quantity(self, instance):
+        quantity = getattr(instance, "total_quantity", None)
+        return quantity if quantity is not None else sum(instance.stocks.values_list("quantity", flat=True))
+
+    def prepare_quantity_row(self, row):
+        return row["total_quantity"]
+
+    def prepare_stock_prices(self, instance):
+        return list(instance.stocks.values_list("price", flat=True))
+
+    def prepare_stock_prices_row(self, row):
+        return [price for price, _quantity in self._row_stocks.get(row["pk"], [])]
+
+    def prepare_stock_quantities(self, instance):
+        return list(instance.stocks.values_list("quantity", flat=True))
+
+    def prepare_stock_quantities_row(self, row):
+        return [quantity for _price, quantity in self._row_stocks.get(row["pk"], [])]
+
+    def prepare_has_stocks(self, instance):
+        has_stocks = getattr(instance, "has_stock_rows", None)
+        return has_stocks if has_stocks is not None else instance.stocks.exists()
+
+    def prepare_has_stocks_row(self, row):
+        return row["has_stock_rows"]
+
+    def prepare_category(self, instance):
+        return self._category(self.get_category_rows([instance.category_id]).get(instance.category_id))
+
+    def prepare_category_row(self, row):
+        return self._category(self._category_rows.get(row["category_id"]))
+
+    def prepare_category_ancestors(self, instance):
+        return self.get_category_rows([instance.category_id]).get(instance.category_id, {}).get("ancestors", [])
+
+    def prepare_category_ancestors_row(self, row):
+        return self._category_rows.get(row["category_id"], {}).get("ancestors", [])
+
+    def prepare_brand(self, instance):
+        return self._brand(self.get_brand_rows([instance.brand_id]).get(instance.brand_id))
+
+    def prepare_brand_row(self, row):
+        return self._brand(self._brand_rows.get(row["brand_id"]))
+
+    def prepare_tags(self, instance):
+        return [tag.tag_name for tag in instance.tags.all()]
+
+    def prepare_tags_row(self, row):
+        return self._row_tags.get(row["pk"], [])
+
+    def prepare_attributes(self, instance):
+        return [
+            self._attribute(value.attribute.name, value.value, value.attribute.value_type)
+            for value in instance.attributes.filter(is_active=True).select_related("attribute")
+        ]
+
+    def prepare_attributes_row(self, row):
+        return self._row_attributes.get(row["pk"], [])
 
 
 _add_multilang_fields(ProductDocument)
@@ -80,6 +352,7 @@ class BrandDocument(ActiveOnlyMixin, Document):
             "phonetic": fields.TextField(analyzer="name_phonetic"),
         },
     )
+    suggest = fields.CompletionField(analyzer="autocomplete_search", contexts=SUGGEST_CONTEXTS)
 
     class Index:
         name = "brands"
@@ -97,5 +370,8 @@ class BrandDocument(ActiveOnlyMixin, Document):
     def prepare_name(self, instance):
         return getattr(instance, "name", "") or ""
 
+    def prepare_suggest(self, instance):
+        return build_suggestions({settings.LANGUAGE_CODE: instance.name})
+
 
 registry.register_document(BrandDocument)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from django.utils.text import slugify
+
+from core.elasticsearch import SEARCH_INDICES, localized_value
+from core.models import Brand, Category, Product
+
+
+def _trigram_columns(model) -> list[str]:
+    # Only the fallback languages carry gin_trgm_ops indexes, see migration 0024
+    if model is Brand:
+        return ["name"]
+    return [
+        f"name_{language.replace('-', '_')}" for language in dict.fromkeys(settings.MODELTRANSLATION_FALLBACK_LANGUAGES)
+    ]
+
+
+def trigram_search(query: str, size: int = 100) -> dict:
+    """
+    Degraded search over the pg_trgm indexed names of products, categories and brands.
+
+    Matches are the rows with a name word-similar to `query` (the `%>` operator, which the
+    gin_trgm_ops indexes serve), best first, grouped like the Elasticsearch results so
+    callers don't have to tell them apart.
+    """
+    results = {alias: [] for alias in SEARCH_INDICES}
+
+    for alias, model in (("products", Product), ("categories", Category), ("brands", Brand)):
+        columns = _trigram_columns(model)
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f"{column}__trigram_word_similar": query})
+        similarities = [TrigramWordSimilarity(query, column) for column in columns]
+
+        rows = (
+            model.objects.filter(is_active=True)
+            .filter(condition)
+            .annotate(similarity=Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+            .order_by("-similarity")
+            .values("uuid", *columns, *(("slug",) if model is not Brand else ()))[:size]
+        )
+
+        for row in rows:
+            name = localized_value(row, "name") if model is not Brand else row["name"]
+            results[alias].append(
+                {
+                    "uuid": str(row["uuid"]),
+                    "name": name,
+                    "slug": row.get("slug") or slugify(name),
+                }
+            )
+
+    return results
@@ -0,0 +1,335 @@
+import json
+import logging
+
+from django.conf import settings
+from django.utils.http import urlsafe_base64_decode
+from elasticsearch.dsl import A, Q, Search
+
+from core.elasticsearch import SEARCH_ERRORS, record_search_error, search_client, search_language
+from core.elasticsearch.breaker import search_breaker
+
+logger = logging.getLogger(__name__)
+
+LISTING_INDEX = "products"
+
+FACET_SIZE = 50
+
+IGNORED_PARAMS = {"page", "page_size", "format", "first", "last", "after", "before", "offset", "fields", "expand"}
+
+
+class UnsupportedListingQueryError(ValueError):
+    """Raised when listing parameters can only be answered by the database filters."""
+
+
+def _listify(value) -> list[str]:
+    if value is None:
+        return []
+    values = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    return [str(v).strip() for v in values if str(v).strip()]
+
+
+def _escape_wildcard(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("*", "\\*").replace("?", "\\?")
+
+
+def _contains(field: str, value: str) -> Q:
+    return Q("wildcard", **{field: {"value": f"*{_escape_wildcard(value)}*", "case_insensitive": True}})
+
+
+def _boolean(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("true", "1")
+
+
+def _infer_type(value: str):
+    try:
+        parsed = json.loads(value)
+        if isinstance(parsed, list):
+            return parsed
+    except (json.JSONDecodeError, TypeError):
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _attribute_query(name: str, method: str, raw_value: str) -> Q:
+    """Translate one `name=method-value` pair of the ProductFilter attributes DSL into a nested query."""
+    value = _infer_type(raw_value)
+    match method:
+        case "iexact":
+            condition = Q("term", **{"attributes.value": str(raw_value)})
+        case "icontains":
+            condition = _contains("attributes.value", str(raw_value))
+        case "istartswith":
+            condition = Q("prefix", **{"attributes.value": {"value": str(raw_value), "case_insensitive": True}})
+        case "iendswith":
+            condition = Q("wildcard", **{"attributes.value": {"value": f"*{raw_value}", "case_insensitive": True}})
+        case "lt" | "lte" | "gt" | "gte" if isinstance(value, float):
+            condition = Q("range", **{"attributes.value_number": {method: value}})
+        case "in" if isinstance(value, list):
+            condition = Q("terms", **{"attributes.value": [str(v) for v in value]})
+        case _:
+            raise UnsupportedListingQueryError(f"attribute lookup {method!r} is not supported by the search index")
+
+    return Q("nested", path="attributes", query=Q("term", **{"attributes.name": name}) & condition)
+
+
+def _sort_fields() -> dict:
+    language = search_language().replace("-", "_")
+    return {
+        "uuid": "uuid",
+        "rating": "rating",
+        "name": f"name_{language}.raw",
+        "slug": "slug",
+        "created": "created",
+        "modified": "modified",
+        "price": "price",
+    }
+
+
+class ListingQuery:
+    """
+    ProductFilter parameters translated into a single Elasticsearch request.
+
+    The same request returns the requested window of product UUIDs, the total count, facet
+    counts for categories, brands, tags and attributes, and the price range of the matches.
+    Parameters the index cannot answer faithfully raise `UnsupportedListingQueryError`, so callers
+    can fall back to the database filters.
+    """
+
+    def __init__(self, params, visible_only: bool = False):
+        self.filters = []
+        self.sort = []
+
+        if visible_only:
+            self.filters += [
+                Q("term", **{"category.is_active": True}),
+                Q("term", **{"brand.is_active": True}),
+                Q("term", has_stocks=True),
+            ]
+
+        for key in params:
+            value = params.get(key)
+            if key in IGNORED_PARAMS or value in (None, "", []):
+                continue
+            handler = getattr(self, f"filter_{key}", None)
+            if handler is None:
+                raise UnsupportedListingQueryError(f"parameter {key!r} is not supported by the search index")
+            handler(value)
+
+        self.sort.append("uuid")
+
+    def filter_uuid(self, value):
+        self.filters.append(Q("term", uuid=str(value)))
+
+    def filter_name(self, value):
+        # icontains on the column modeltranslation reads for the active language
+        language = search_language().replace("-", "_")
+        self.filters.append(_contains(f"name_{language}.raw", str(value)))
+
+    def filter_categories(self, value):
+        self.filters.append(Q("bool", should=[_contains("category.name", v) for v in _listify(value)]))
+
+    def filter_category_uuid(self, value):
+        self.filters.append(Q("term", **{"category.uuid": str(value)}))
+
+    def filter_category_slugs(self, value):
+        self.filters.append(Q("bool", should=[_contains("category.slug", v) for v in _listify(value)]))
+
+    def filter_tags(self, value):
+        self.filters.append(Q("bool", should=[_contains("tags", v) for v in _listify(value)]))
+
+    def filter_min_price(self, value):
+        self.filters.append(Q("range", stock_prices={"gte": float(value)}))
+
+    def filter_max_price(self, value):
+        self.filters.append(Q("range", stock_prices={"lte": float(value)}))
+
+    def filter_quantity(self, value):
+        self.filters.append(Q("range", stock_quantities={"gt": float(value)}))
+
+    def filter_is_active(self, value):
+        if not _boolean(value):
+            raise UnsupportedListingQueryError("inactive products are not indexed")
+
+    def filter_brand(self, value):
+        self.filters.append(Q("term", **{"brand.name": value}))
+
+    def filter_slug(self, value):
+        self.filters.append(Q("term", slug=value))
+
+    def filter_is_digital(self, value):
+        self.filters.append(Q("term", is_digital=_boolean(value)))
+
+    def filter_attributes(self, value):
+        if str(value).startswith("b64-"):
+            value = urlsafe_base64_decode(value[4:]).decode()
+
+        for pair in (pair.strip() for pair in str(value).split(";") if "=" in pair):
+            name, filter_part = (part.strip() for part in pair.split("=", 1))
+            method, raw_value = filter_part.split("-", 1) if "-" in filter_part else ("iexact", filter_part)
+            self.filters.append(_attribute_query(name, method.lower().strip(), raw_value))
+
+    def filter_order_by(self, value):
+        sort_fields = _sort_fields()
+        for field in _listify(value):
+            descending = field.startswith("-")
+            name = sort_fields.get(field.lstrip("-"))
+            if name is None:
+                raise UnsupportedListingQueryError(f"ordering by {field!r} is not supported by the search index")
+            self.sort.append({name: {"order": "desc" if descending else "asc"}})
+
+    def build(self, start: int, size: int, with_aggregations: bool = True) -> Search:
+        if start + size > settings.ELASTICSEARCH_MAX_RESULT_WINDOW:
+            # Elasticsearch rejects windows past index.max_result_window with a 400
+            raise UnsupportedListingQueryError(f"results past {settings.ELASTICSEARCH_MAX_RESULT_WINDOW} are not paged")
+
+        search = (
+            Search(using=search_client(), index=LISTING_INDEX)
+            .query(Q("bool", filter=self.filters))
+            .sort(*self.sort)
+            .source(["uuid"])
+            .extra(from_=start, size=size, track_total_hits=True)
+        )
+        if with_aggregations:
+            search.aggs.metric("min_price", "min", field="price")
+            search.aggs.metric("max_price", "max", field="price")
+            search.aggs.bucket("categories", "terms", field="category_ancestors", size=FACET_SIZE)
+            search.aggs.bucket("brands", "terms", field="brand.name", size=FACET_SIZE)
+            search.aggs.bucket("tags", "terms", field="tags", size=FACET_SIZE)
+            search.aggs.bucket("attributes", "nested", path="attributes").bucket(
+                "names", "terms", field="attributes.name", size=FACET_SIZE
+            ).bucket("values", A("terms", field="attributes.value", size=FACET_SIZE))
+        return search
+
+    def execute(self, start: int, size: int, with_aggregations: bool = True):
+        return self.build(start, size, with_aggregations).execute()
+
+
+class ProductListing:
+    """
+    Lazy, sliceable sequence of products answered by a `ListingQuery`.
+
+    It behaves like a queryset towards Django's paginator and graphene's connection slicing:
+    the window announced at construction is fetched with one request, together with the total
+    and the aggregations; only the UUIDs of that window are hydrated from `queryset`.
+    Slices outside of the window issue an additional request without aggregations.
+    """
+
+    def __init__(self, query: ListingQuery, queryset, start: int = 0, size: int | None = None, offset: int = 0):
+        self.query = query
+        self.queryset = queryset
+        self.window = (start, size if size is not None else settings.REST_FRAMEWORK["PAGE_SIZE"])
+        self.offset = offset
+        self._state = {}
+
+    def _view(self, offset: int) -> "ProductListing":
+        view = ProductListing(self.query, self.queryset, *self.window, offset=offset)
+        view._state = self._state
+        return view
+
+    def execute(self) -> "ProductListing":
+        if "response" not in self._state:
+            start, size = self.window
+            response = self.query.execute(start, size)
+            self._state["response"] = response
+            self._state["total"] = response.hits.total.value
+            self._state["start"] = start
+            self._state["products"] = self._hydrate(response)
+        return self
+
+    def _hydrate(self, response) -> list:
+        uuids = [hit.meta.id for hit in response.hits]
+        products = {str(product.uuid): product for product in self.queryset.filter(uuid__in=uuids)}
+        return [products[uuid] for uuid in uuids if uuid in products]
+
+    def count(self) -> int:
+        self.execute()
+        return max(self._state["total"] - self.offset, 0)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[0 : len(self)])
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self[item : item + 1][0]
+
+        start = self.offset + (item.start or 0)
+        if item.stop is None:
+            return self._view(start)
+        stop = self.offset + item.stop
+
+        self.execute()
+        window_start = self._state["start"]
+        window_stop = window_start + self.window[1]
+        if window_start <= start and (stop <= window_stop or window_stop >= self._state["total"]):
+            return self._state["products"][start - window_start : stop - window_start]
+
+        return self._hydrate(self.query.execute(start, max(stop - start, 0), with_aggregations=False))
+
+    @property
+    def facets(self) -> dict:
+        aggregations = self.execute()._state["response"].aggregations
+        return {
+            "categories": [
+                {"uuid": bucket.key, "count": bucket.doc_count} for bucket in aggregations.categories.buckets
+            ],
+            "brands": [{"name": bucket.key, "count": bucket.doc_count} for bucket in aggregations.brands.buckets],
+            "tags": [{"name": bucket.key, "count": bucket.doc_count} for bucket in aggregations.tags.buckets],
+            "attributes": [
+                {
+                    "name": attribute.key,
+                    "count": attribute.doc_count,
+                    "values": [{"value": value.key, "count": value.doc_count} for value in attribute["values"].buckets],
+                }
+                for attribute in aggregations.attributes.names.buckets
+            ],
+        }
+
+    @property
+    def price_range(self) -> dict:
+        aggregations = self.execute()._state["response"].aggregations
+        return {
+            "min_price": aggregations.min_price.value or 0.0,
+            "max_price": aggregations.max_price.value or 0.0,
+        }
+
+
+def get_product_listing(params, queryset, start: int = 0, size: int | None = None, visible_only: bool = False):
+    """
+    Answer a product listing from Elasticsearch when PRODUCT_LISTING_BACKEND allows it.
+
+    Returns an executed `ProductListing`, or None when the database has to answer instead:
+    the backend is disabled, the parameters are not supported, Elasticsearch failed or the
+    search circuit breaker is open.
+    """
+    if settings.PRODUCT_LISTING_BACKEND != "elasticsearch":
+        return None
+
+    try:
+        query = ListingQuery(params, visible_only=visible_only)
+    except UnsupportedListingQueryError as e:
+        logger.debug(f"Falling back to database listing: {e!s}")
+        return None
+
+    if not search_breaker.allow():
+        return None
+
+    try:
+        listing = ProductListing(query, queryset, start, size).execute()
+    except UnsupportedListingQueryError as e:
+        logger.debug(f"Falling back to database listing: {e!s}")
+        return None
+    except SEARCH_ERRORS as e:
+        record_search_error(e)
+        logger.warning(f"Falling back to database listing after Elasticsearch error: {e!s}")
+        return None
+
+    search_breaker.record_success()
+    return listing
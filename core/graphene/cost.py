@@ -0,0 +1,189 @@
+import logging
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+from django_redis import get_redis_connection
+from graphene.utils.is_introspection_key import is_introspection_key
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    ValidationRule,
+    get_named_type,
+    get_nullable_type,
+    is_leaf_type,
+    is_list_type,
+)
+from graphql.execution.values import get_argument_values
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# Cost of fields that are heavier than fetching one object, by "Type.field". Leaf fields cost
+# nothing and other fields 1, multiplied by the page or list size of every enclosing field.
+FIELD_COSTS = {
+    "Query.products": 5,
+    "Query.categories": 2,
+    "CategoryType.children": 2,
+    "CategoryType.filterableAttributes": 10,
+    "CategoryType.minMaxPrices": 5,
+    "ProductType.attributeGroups": 2,
+    "Mutation.search": 10,
+    "Mutation.autocompleteAddress": 10,
+}
+
+# Relay plumbing, the objects behind it are paid for by the connection multiplier
+STRUCTURAL_FIELDS = {"edges", "node", "pageInfo"}
+
+
+def _is_connection(graphql_type) -> bool:
+    return isinstance(graphql_type, GraphQLObjectType) and "edges" in graphql_type.fields
+
+
+class QueryCost:
+    """
+    Static cost of a GraphQL operation, computed from its document before anything executes.
+
+    Connections multiply the cost of their nodes by the `first`/`last` requested, or by the
+    RELAY_CONNECTION_MAX_LIMIT graphene pages them by otherwise; other lists by
+    GRAPHQL_LIST_SIZE_ESTIMATE. Introspection is free and selections deeper than
+    GRAPHQL_MAX_DEPTH are not counted, the depth limit rejects them anyway.
+    """
+
+    def __init__(self, schema, fragments: dict, variables: dict | None = None):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+
+    def operation(self, node: OperationDefinitionNode) -> int:
+        return self.selections(self.schema.get_root_type(node.operation), node.selection_set, 1)
+
+    def selections(self, parent_type, selection_set, depth: int) -> int:
+        if parent_type is None or selection_set is None or depth > settings.GRAPHQL_MAX_DEPTH:
+            return 0
+
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.field(parent_type, selection, depth)
+            elif isinstance(selection, InlineFragmentNode):
+                cost += self.selections(self._condition(selection, parent_type), selection.selection_set, depth)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is not None:
+                    cost += self.selections(self._condition(fragment, parent_type), fragment.selection_set, depth)
+        return cost
+
+    def field(self, parent_type, node: FieldNode, depth: int) -> int:
+        name = node.name.value
+        field = getattr(parent_type, "fields", {}).get(name)
+        if field is None or is_introspection_key(name):
+            return 0
+
+        field_type = get_named_type(field.type)
+        if name in STRUCTURAL_FIELDS:
+            # `edges` is a list, but the page it holds is already paid for by the connection multiplier
+            return self.selections(field_type, node.selection_set, depth + 1)
+
+        cost = FIELD_COSTS.get(f"{parent_type.name}.{name}", 0 if is_leaf_type(field_type) else 1)
+        children = self.selections(field_type, node.selection_set, depth + 1)
+        if _is_connection(field_type):
+            children *= self.page_size(field, node)
+        elif is_list_type(get_nullable_type(field.type)):
+            children *= settings.GRAPHQL_LIST_SIZE_ESTIMATE
+        return cost + children
+
+    def page_size(self, field, node: FieldNode) -> int:
+        limit = settings.GRAPHENE["RELAY_CONNECTION_MAX_LIMIT"]
+        try:
+            arguments = get_argument_values(field, node, self.variables)
+        except GraphQLError:
+            return limit
+        return min(arguments.get("first") or arguments.get("last") or limit, limit)
+
+    def _condition(self, node, parent_type):
+        if node.type_condition is None:
+            return parent_type
+        return self.schema.get_type(node.type_condition.name.value)
+
+
+def charge_cost_budget(request, cost: int) -> dict:
+    """
+    Charge `cost` to the budget of the client, a user when authenticated and an IP address
+    otherwise, refilled every GRAPHQL_COST_BUDGET_WINDOW seconds.
+
+    Returns the state of the budget, with `charged` False when it could not afford the cost.
+    Budgets are enforced on a best effort basis: when Redis is unavailable nothing is charged.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        key, budget = f"graphql_cost:user:{user.pk}", settings.GRAPHQL_USER_COST_BUDGET
+    else:
+        key, budget = f"graphql_cost:ip:{BaseThrottle().get_ident(request)}", settings.GRAPHQL_IP_COST_BUDGET
+    window = settings.GRAPHQL_COST_BUDGET_WINDOW
+
+    try:
+        redis = get_redis_connection("default")
+        spent = int(redis.get(key) or 0)
+        if spent + cost > budget:
+            return {"charged": False, "budget": budget, "remaining": max(budget - spent, 0), "reset": redis.ttl(key)}
+
+        pipeline = redis.pipeline()
+        pipeline.set(key, 0, ex=window, nx=True)
+        pipeline.incrby(key, cost)
+        pipeline.ttl(key)
+        _created, spent, reset = pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Could not charge GraphQL cost budget: {e!s}")
+        return {"charged": True, "budget": budget, "remaining": budget, "reset": window}
+
+    return {"charged": True, "budget": budget, "remaining": max(budget - spent, 0), "reset": reset}
+
+
+def query_cost_validator(request, variables: dict | None = None, operation_name: str | None = None):
+    """
+    Validation rule rejecting the operation to be executed when its cost exceeds
+    GRAPHQL_MAX_QUERY_COST or the remaining budget of the client. The computed cost is kept on
+    `request.graphql_cost` for the response extensions.
+    """
+
+    class QueryCostValidator(ValidationRule):
+        def enter_operation_definition(self, node: OperationDefinitionNode, *_args):
+            if operation_name and (node.name is None or node.name.value != operation_name):
+                return
+
+            fragments = {
+                definition.name.value: definition
+                for definition in self.context.document.definitions
+                if isinstance(definition, FragmentDefinitionNode)
+            }
+            cost = QueryCost(self.context.schema, fragments, variables).operation(node)
+            request.graphql_cost = {"requested": cost, "maximum": settings.GRAPHQL_MAX_QUERY_COST}
+
+            if cost > settings.GRAPHQL_MAX_QUERY_COST:
+                self.report_error(
+                    GraphQLError(
+                        _("query cost %(cost)s exceeds the maximum of %(maximum)s")
+                        % {"cost": cost, "maximum": settings.GRAPHQL_MAX_QUERY_COST},
+                        node,
+                    )
+                )
+                return
+
+            budget = charge_cost_budget(request, cost)
+            request.graphql_cost["budget"] = budget
+            if not budget["charged"]:
+                self.report_error(
+                    GraphQLError(
+                        _("query cost budget exhausted, %(remaining)s left, retry in %(reset)s seconds")
+                        % {"remaining": budget["remaining"], "reset": budget["reset"]},
+                        node,
+                    )
+                )
+
+    return QueryCostValidator
@@ -0,0 +1,291 @@
+from collections import defaultdict
+
+from django.db.models import Count, Min, Model, Sum
+
+from core.models import (
+    Attribute,
+    AttributeGroup,
+    AttributeValue,
+    Brand,
+    Category,
+    Feedback,
+    Order,
+    OrderProduct,
+    Product,
+    ProductImage,
+    Promotion,
+    Stock,
+    Vendor,
+    Wishlist,
+)
+from core.utils.specifications import SPECIFICATION_ATTRIBUTES, SPECIFICATION_VALUES, product_specifications
+
+LOADERS = {}
+
+# Attribute the queryset optimizer prefetches the feedbacks of a product into, as order products
+PREFETCHED_FEEDBACKS = "prefetched_feedbacks"
+
+
+def loader(name: str, model, key=None, default=None, prefetched=None):
+    """
+    Register `batch_load_fn(registry, objects) -> {key: value}` as the loader `name`.
+
+    `objects` are instances of `model` seen during the request, `key` maps an object to its
+    cache key (the primary key by default) and `default` builds the value of keys the batch
+    function returned nothing for. `prefetched` reads the value of an object from what the
+    queryset optimizer prefetched, None when it prefetched nothing; such objects skip the batch.
+    """
+
+    def decorator(batch_load_fn):
+        LOADERS[name] = (
+            model,
+            batch_load_fn,
+            key or (lambda obj: obj.pk),
+            default or (lambda: None),
+            prefetched or (lambda obj: None),
+        )
+        return batch_load_fn
+
+    return decorator
+
+
+def _prefetch_cache(name: str):
+    """Read a loader value from the prefetch cache of relation `name`."""
+
+    def read(obj):
+        cache = getattr(obj, "_prefetched_objects_cache", {})
+        return list(cache[name]) if name in cache else None
+
+    return read
+
+
+class DataLoader:
+    """
+    Synchronous, per-request batching of one kind of lookup.
+
+    GraphQL executes depth first, so batching by enqueueing keys until the level completes is
+    not available to a synchronous schema. Instead, the first `load` of a missing key loads it
+    for every `model` instance the request has seen so far: the whole page of a connection,
+    or every object a previous loader returned. Each level of a nested query therefore costs
+    one statement per loader, whatever the page size.
+    """
+
+    def __init__(self, registry: "DataLoaderRegistry", model, batch_load_fn, key, default, prefetched):
+        self.registry = registry
+        self.model = model
+        self.batch_load_fn = batch_load_fn
+        self.key = key
+        self.default = default
+        self.prefetched = prefetched
+        self._cache = {}
+
+    def load(self, obj):
+        key = self.key(obj)
+        if key not in self._cache:
+            pending = {self.key(seen): seen for seen in self.registry.seen(self.model)}
+            pending = {k: seen for k, seen in pending.items() if k not in self._cache}
+            pending[key] = obj
+
+            loaded = {k: value for k, seen in pending.items() if (value := self.prefetched(seen)) is not None}
+            missing = [seen for k, seen in pending.items() if k not in loaded]
+            if missing:
+                loaded |= self.batch_load_fn(self.registry, missing)
+            for pending_key in pending:
+                value = loaded.get(pending_key)
+                self._cache[pending_key] = self.default() if value is None else value
+            self.registry.prime(loaded.values())
+
+        return self._cache[key]
+
+
+class DataLoaderRegistry:
+    """Loaders of one request, reached as attributes: `get_loaders(info).prices.load(product)`."""
+
+    def __init__(self, request):
+        self.request = request
+        self._seen = defaultdict(dict)
+        self._loaders = {}
+
+    @property
+    def user(self):
+        return self.request.user
+
+    def prime(self, values) -> None:
+        """Remember model instances, in lists too, as batch candidates of the loaders."""
+        for value in values:
+            if isinstance(value, Model):
+                self._seen[value._meta.concrete_model][id(value)] = value
+            elif isinstance(value, (list, tuple)):
+                self.prime(value)
+
+    def seen(self, model) -> list:
+        return list(self._seen[model].values())
+
+    def __getattr__(self, name: str) -> DataLoader:
+        if name.startswith("_") or name not in LOADERS:
+            raise AttributeError(name)
+        if name not in self._loaders:
+            self._loaders[name] = DataLoader(self, *LOADERS[name])
+        return self._loaders[name]
+
+
+def get_loaders(info) -> DataLoaderRegistry:
+    """Return the loader registry of the request being executed, creating it on first use."""
+    context = info.context
+    registry = getattr(context, "_dataloaders", None)
+    if registry is None:
+        registry = DataLoaderRegistry(context)
+        context._dataloaders = registry
+    return registry
+
+
+def _group(rows, key) -> dict:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[key(row)].append(row)
+    return grouped
+
+
+def _foreign_keys(objects, attname: str) -> set:
+    return {getattr(obj, attname) for obj in objects if getattr(obj, attname) is not None}
+
+
+@loader("prices", Product, default=float)
+def load_prices(registry, products):
+    rows = Stock.objects.filter(product__in=products).values("product_id").annotate(price=Min("price"))
+    return {row["product_id"]: round(row["price"] or 0.0, 2) for row in rows}
+
+
+@loader("quantities", Product, default=int)
+def load_quantities(registry, products):
+    rows = Stock.objects.filter(product__in=products).values("product_id").annotate(quantity=Sum("quantity"))
+    return {row["product_id"]: row["quantity"] or 0 for row in rows}
+
+
+@loader("feedbacks_counts", Product, default=int)
+def load_feedbacks_counts(registry, products):
+    rows = (
+        Feedback.objects.filter(order_product__product__in=products)
+        .values("order_product__product_id")
+        .annotate(count=Count("uuid"))
+    )
+    return {row["order_product__product_id"]: row["count"] for row in rows}
+
+
+def _prefetched_feedbacks(product):
+    order_products = getattr(product, PREFETCHED_FEEDBACKS, None)
+    return None if order_products is None else [order_product.feedback for order_product in order_products]
+
+
+@loader("feedbacks", Product, default=list, prefetched=_prefetched_feedbacks)
+def load_feedbacks(registry, products):
+    feedbacks = Feedback.objects.filter(order_product__product__in=products).select_related("order_product")
+    if not registry.user.has_perm("core.view_feedback"):
+        feedbacks = feedbacks.filter(is_active=True)
+    return _group(feedbacks, lambda feedback: feedback.order_product.product_id)
+
+
+@loader("images", Product, default=list, prefetched=_prefetch_cache("images"))
+def load_images(registry, products):
+    return _group(ProductImage.objects.filter(product__in=products), lambda image: image.product_id)
+
+
+@loader("product_categories", Product)
+def load_product_categories(registry, products):
+    return _load_related(products, "category", Category)
+
+
+@loader("product_brands", Product)
+def load_product_brands(registry, products):
+    return _load_related(products, "brand", Brand)
+
+
+@loader("stock_vendors", Stock)
+def load_stock_vendors(registry, stocks):
+    return _load_related(stocks, "vendor", Vendor)
+
+
+@loader("stock_products", Stock)
+def load_stock_products(registry, stocks):
+    return _load_related(stocks, "product", Product)
+
+
+def _load_related(objects, field: str, model) -> dict:
+    """Forward foreign keys of `objects`, reusing the instances `select_related` already fetched."""
+    descriptor = objects[0]._meta.get_field(field)
+    related = {obj.pk: descriptor.get_cached_value(obj) for obj in objects if descriptor.is_cached(obj)}
+    missing = [obj for obj in objects if obj.pk not in related]
+    if missing:
+        instances = model.objects.in_bulk(_foreign_keys(missing, descriptor.attname))
+        related |= {obj.pk: instances.get(getattr(obj, descriptor.attname)) for obj in missing}
+    return related
+
+
+def _specification_key(name: str):
+    """Cache key of an object that may be a node of a specification tree, whose narrowed list is its own."""
+    return lambda obj: (obj.pk, id(obj) if hasattr(obj, name) else None)
+
+
+@loader("product_attribute_groups", Product, default=list)
+def load_product_attribute_groups(registry, products):
+    """Specification trees of the products, the attributes and values below each group narrowed to its product."""
+    return product_specifications(products)
+
+
+@loader(
+    "group_attributes",
+    AttributeGroup,
+    key=_specification_key(SPECIFICATION_ATTRIBUTES),
+    default=list,
+    prefetched=lambda group: getattr(group, SPECIFICATION_ATTRIBUTES, None),
+)
+def load_group_attributes(registry, groups):
+    return _group(Attribute.objects.filter(group__in=groups), lambda attribute: (attribute.group_id, None))
+
+
+@loader(
+    "attribute_values",
+    Attribute,
+    key=_specification_key(SPECIFICATION_VALUES),
+    default=list,
+    prefetched=lambda attribute: getattr(attribute, SPECIFICATION_VALUES, None),
+)
+def load_attribute_values(registry, attributes):
+    return _group(AttributeValue.objects.filter(attribute__in=attributes), lambda value: (value.attribute_id, None))
+
+
+def _load_many_to_many(objects, field: str, queryset) -> dict:
+    """Many-to-many relation `field` of `objects`, restricted to the rows of `queryset`."""
+    m2m = objects[0]._meta.get_field(field)
+    source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+    links = list(m2m.remote_field.through.objects.filter(**{f"{source}__in": objects}).values_list(source, target))
+    related = queryset.filter(pk__in={target_id for _source_id, target_id in links}).in_bulk()
+
+    result = defaultdict(list)
+    for source_id, target_id in links:
+        if target_id in related:
+            result[source_id].append(related[target_id])
+    return result
+
+
+@loader("brand_categories", Brand, default=list, prefetched=_prefetch_cache("categories"))
+def load_brand_categories(registry, brands):
+    categories = Category.objects.all()
+    if not registry.user.has_perm("core.view_category"):
+        categories = categories.filter(is_active=True)
+    return _load_many_to_many(brands, "categories", categories)
+
+
+@loader("wishlist_products", Wishlist, default=list, prefetched=_prefetch_cache("products"))
+def load_wishlist_products(registry, wishlists):
+    return _load_many_to_many(wishlists, "products", Product.objects.all())
+
+
+@loader("promotion_products", Promotion, default=list, prefetched=_prefetch_cache("products"))
+def load_promotion_products(registry, promotions):
+    return _load_many_to_many(promotions, "products", Product.objects.all())
+
+
+@loader("order_products", Order, default=list, prefetched=_prefetch_cache("order_products"))
+def load_order_products(registry, orders):
+    return _group(OrderProduct.objects.filter(order__in=orders), lambda order_product: order_product.order_id)
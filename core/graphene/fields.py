@@ -0,0 +1,36 @@
+from graphene_django.filter import DjangoFilterConnectionField
+
+from core.elasticsearch.listing import ProductListing
+
+
+class BatchedConnectionField(DjangoFilterConnectionField):
+    """
+    Filter connection field accepting the lists DataLoaders return from its resolver.
+
+    Loaded lists are already scoped to their parent, so instead of the filterset only the exact
+    `filter_fields` lookups are applied, in memory; querysets behave as usual.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        if isinstance(iterable, list):
+            for name, value in args.items():
+                if name in filtering_args and value is not None:
+                    iterable = [obj for obj in iterable if str(getattr(obj, name)) == str(value)]
+            return iterable
+        return super().resolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
+
+
+class ProductConnectionField(DjangoFilterConnectionField):
+    """
+    Filter connection field accepting a `ProductListing` from its resolver.
+
+    Listings answered by the search index are already filtered, ordered and windowed, so they
+    bypass the filterset and are sliced lazily by the connection; querysets behave as usual.
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        if isinstance(iterable, ProductListing):
+            return iterable
+        return super().resolve_queryset(connection, iterable, info, args, filtering_args, filterset_class)
@@ -9,7 +9,7 @@ from graphene import UUID, Boolean, Field, Int, List, String
 from graphene.types.generic import GenericScalar
 from graphene_django.utils import camelize
 
-from core.elasticsearch import process_query
+from core.elasticsearch.analytics import tracked_search
 from core.graphene import BaseMutation
 from core.graphene.object_types import (
     AddressType,
@@ -624,13 +624,16 @@ class Search(BaseMutation):
         query = String(required=True)
 
     results = Field(SearchResultsType)
+    tier = String(description=_("search tier that answered the query"))
+    timings = GenericScalar(description=_("latency of every executed search tier, in milliseconds"))
 
     class Meta:
         description = _("elasticsearch - works like a charm")
 
     @staticmethod
     def mutate(_parent, info, query):
-        data = process_query(query)
+        response = tracked_search(query, source="graphql")
+        data = response["results"]
 
         return Search(
             results=SearchResultsType(
@@ -638,5 +641,7 @@ class Search(BaseMutation):
                 categories=data["categories"],
                 brands=data["brands"],
                 posts=data["posts"],
-            )
+            ),
+            tier=response["tier"],
+            timings=response["timings"],
         )
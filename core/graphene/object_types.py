@@ -1,14 +1,15 @@
 from django.core.cache import cache
-from django.db.models import Max, Min, QuerySet
+from django.db.models import Max, Min
 from django.db.models.functions import Length
 from django.utils.translation import gettext_lazy as _
 from graphene import UUID, Field, Float, InputObjectType, Int, List, NonNull, ObjectType, String, relay
 from graphene.types.generic import GenericScalar
 from graphene_django import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
 from graphene_django.utils import camelize
 from mptt.querysets import TreeQuerySet
 
+from core.graphene.dataloaders import get_loaders
+from core.graphene.fields import BatchedConnectionField
 from core.models import (
     Address,
     Attribute,
@@ -42,13 +43,7 @@ class AttributeType(DjangoObjectType):
         description = _("attributes")
 
     def resolve_values(self, info):
-        base_qs = AttributeValue.objects.filter(attribute=self)
-        product_uuid = getattr(info.context, "_product_uuid", None)
-
-        if product_uuid:
-            base_qs = base_qs.filter(product__uuid=product_uuid)
-
-        return base_qs
+        return get_loaders(info).attribute_values.load(self)
 
 
 class AttributeGroupType(DjangoObjectType):
@@ -62,13 +57,7 @@ class AttributeGroupType(DjangoObjectType):
         description = _("groups of attributes")
 
     def resolve_attributes(self, info):
-        product_uuid = getattr(info.context, "_product_uuid", None)
-        qs = self.attributes.all()
-
-        if product_uuid:
-            qs = qs.filter(values__product__uuid=product_uuid).distinct()
-
-        return qs
+        return get_loaders(info).group_attributes.load(self)
 
 
 class BrandType(DjangoObjectType):
@@ -82,9 +71,7 @@ class BrandType(DjangoObjectType):
         description = _("brands")
 
     def resolve_categories(self, info):
-        if info.context.user.has_perm("core.view_category"):
-            return self.categories.all()
-        return self.categories.filter(is_active=True)
+        return get_loaders(info).brand_categories.load(self)
 
 
 class FilterableAttributeType(ObjectType):
@@ -280,9 +267,7 @@ class OrderProductType(DjangoObjectType):
 
 
 class OrderType(DjangoObjectType):
-    order_products = DjangoFilterConnectionField(
-        OrderProductType, description=_("a list of order products in this order")
-    )
+    order_products = BatchedConnectionField(OrderProductType, description=_("a list of order products in this order"))
     billing_address = Field(AddressType, description=_("billing address"))
     shipping_address = Field(
         AddressType,
@@ -312,11 +297,14 @@ class OrderType(DjangoObjectType):
         )
         description = _("orders")
 
-    def resolve_total_price(self, _info):
-        return self.total_price
+    def resolve_order_products(self, info, **kwargs) -> list[OrderProduct]:
+        return get_loaders(info).order_products.load(self)
+
+    def resolve_total_price(self, info):
+        return Order.get_total_price(get_loaders(info).order_products.load(self))
 
-    def resolve_total_quantity(self, _info):
-        return self.total_quantity
+    def resolve_total_quantity(self, info):
+        return Order.get_total_quantity(get_loaders(info).order_products.load(self))
 
     def resolve_notifications(self, info):
         return camelize(self.notifications)
@@ -339,12 +327,28 @@ class ProductImageType(DjangoObjectType):
         return info.context.build_absolute_uri(self.image.url) if self.image else ""
 
 
+class ProductConnection(relay.Connection):
+    facets = GenericScalar(description=_("facet counts of the matching products, if answered by the search index"))
+    price_range = Field(MinMaxPriceType, description=_("price range of the matching products, if available"))
+
+    class Meta:
+        abstract = True
+
+    def resolve_facets(self, _info):
+        listing = getattr(self, "iterable", None)
+        return camelize(listing.facets) if hasattr(listing, "facets") else None
+
+    def resolve_price_range(self, _info):
+        listing = getattr(self, "iterable", None)
+        return MinMaxPriceType(**listing.price_range) if hasattr(listing, "price_range") else None
+
+
 class ProductType(DjangoObjectType):
     category = Field(CategoryType, description=_("category"))
-    images = DjangoFilterConnectionField(ProductImageType, description=_("images"))
-    feedbacks = DjangoFilterConnectionField(FeedbackType, description=_("feedbacks"))
+    images = BatchedConnectionField(ProductImageType, description=_("images"))
+    feedbacks = BatchedConnectionField(FeedbackType, description=_("feedbacks"))
     brand = Field(BrandType, description=_("brand"))
-    attribute_groups = DjangoFilterConnectionField(AttributeGroupType, description=_("attribute groups"))
+    attribute_groups = BatchedConnectionField(AttributeGroupType, description=_("attribute groups"))
     price = Float(description=_("price"))
     quantity = Float(description=_("quantity"))
     feedbacks_count = Int(description=_("number of feedbacks"))
@@ -365,26 +369,32 @@ class ProductType(DjangoObjectType):
             "price",
         )
         filter_fields = ["uuid", "name"]
+        connection_class = ProductConnection
         description = _("products")
 
-    def resolve_price(self, _info) -> float:
-        return self.price or 0.0
+    def resolve_category(self, info) -> Category:
+        return get_loaders(info).product_categories.load(self)
+
+    def resolve_brand(self, info) -> Brand | None:
+        return get_loaders(info).product_brands.load(self)
+
+    def resolve_price(self, info) -> float:
+        return get_loaders(info).prices.load(self)
 
-    def resolve_feedbacks(self, _info) -> QuerySet[Feedback]:
-        if _info.context.user.has_perm("core.view_feedback"):
-            return Feedback.objects.filter(order_product__product=self)
-        return Feedback.objects.filter(order_product__product=self, is_active=True)
+    def resolve_images(self, info, **kwargs) -> list[ProductImage]:
+        return get_loaders(info).images.load(self)
 
-    def resolve_feedbacks_count(self, _info) -> int:
-        return self.feedbacks_count or 0
+    def resolve_feedbacks(self, info, **kwargs) -> list[Feedback]:
+        return get_loaders(info).feedbacks.load(self)
 
-    def resolve_attribute_groups(self, info):
-        info.context._product_uuid = self.uuid
+    def resolve_feedbacks_count(self, info) -> int:
+        return get_loaders(info).feedbacks_counts.load(self)
 
-        return AttributeGroup.objects.filter(attributes__values__product=self).distinct()
+    def resolve_attribute_groups(self, info, **kwargs) -> list[AttributeGroup]:
+        return get_loaders(info).product_attribute_groups.load(self)
 
-    def resolve_quantity(self, _info) -> int:
-        return self.quantity or 0
+    def resolve_quantity(self, info) -> int:
+        return get_loaders(info).quantities.load(self)
 
 
 class AttributeValueType(DjangoObjectType):
@@ -423,7 +433,7 @@ class PromoCodeType(DjangoObjectType):
 
 
 class PromotionType(DjangoObjectType):
-    products = DjangoFilterConnectionField(ProductType, description=_("products on sale"))
+    products = BatchedConnectionField(ProductType, description=_("products on sale"))
 
     class Meta:
         model = Promotion
@@ -432,6 +442,9 @@ class PromotionType(DjangoObjectType):
         filter_fields = ["uuid"]
         description = _("promotions")
 
+    def resolve_products(self, info, **kwargs) -> list[Product]:
+        return get_loaders(info).promotion_products.load(self)
+
 
 class StockType(DjangoObjectType):
     vendor = Field(VendorType, description=_("vendor"))
@@ -444,9 +457,15 @@ class StockType(DjangoObjectType):
         filter_fields = ["uuid"]
         description = _("stocks")
 
+    def resolve_vendor(self, info) -> Vendor:
+        return get_loaders(info).stock_vendors.load(self)
+
+    def resolve_product(self, info) -> Product:
+        return get_loaders(info).stock_products.load(self)
+
 
 class WishlistType(DjangoObjectType):
-    products = DjangoFilterConnectionField(ProductType, description=_("wishlisted products"))
+    products = BatchedConnectionField(ProductType, description=_("wishlisted products"))
 
     class Meta:
         model = Wishlist
@@ -454,6 +473,9 @@ class WishlistType(DjangoObjectType):
         fields = ("uuid", "products", "user")
         description = _("wishlists")
 
+    def resolve_products(self, info, **kwargs) -> list[Product]:
+        return get_loaders(info).wishlist_products.load(self)
+
 
 class ConfigType(ObjectType):
     project_name = String(description=_("project name"))
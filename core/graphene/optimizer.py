@@ -0,0 +1,235 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from graphene.utils.str_converters import to_snake_case
+from graphql import FragmentSpreadNode, GraphQLObjectType, InlineFragmentNode, get_named_type
+
+from core.graphene.dataloaders import PREFETCHED_FEEDBACKS
+from core.models import (
+    Attribute,
+    AttributeGroup,
+    Brand,
+    Category,
+    Feedback,
+    Order,
+    OrderProduct,
+    Product,
+    ProductImage,
+    Promotion,
+    Stock,
+    Wishlist,
+)
+from core.utils.db import localized_columns, required_columns
+
+
+def _prefetch_feedbacks(optimizer: "QuerysetOptimizer", lookup: str, node_type, nodes) -> Prefetch:
+    # Feedbacks hang off order products, the loader reads them from the prefetched order products
+    nested = QuerysetOptimizer(optimizer.info)
+    columns = nested.walk(Feedback, node_type, nodes, prefix="feedback__")
+    queryset = OrderProduct.objects.filter(feedback__isnull=False).select_related("feedback")
+    if not optimizer.user.has_perm("core.view_feedback"):
+        queryset = queryset.filter(feedback__is_active=True)
+    queryset = nested.apply(
+        queryset,
+        None if columns is None else ["product", "feedback", *(f"feedback__{column}" for column in columns)],
+    )
+    return Prefetch(f"{lookup}orderproduct_set", queryset=queryset, to_attr=PREFETCHED_FEEDBACKS)
+
+
+# Fields answered by custom resolvers, by model: the model field the resolver reads, None when it
+# reads no column of its own (DataLoader aggregates), or a function building its Prefetch.
+# Unlisted fields with custom resolvers keep all columns of their model.
+HINTS = {
+    AttributeGroup: {"attributes": None},
+    Attribute: {"values": None},
+    Brand: {"categories": "categories"},
+    Category: {
+        "children": None,
+        "filterable_attributes": None,
+        "image": "image",
+        "markup_percent": "markup_percent",
+        "min_max_prices": "name",
+    },
+    Order: {
+        "attributes": "attributes",
+        "notifications": "notifications",
+        "order_products": "order_products",
+        "total_price": "order_products",
+        "total_quantity": "order_products",
+    },
+    OrderProduct: {"attributes": "attributes", "notifications": "notifications"},
+    Product: {
+        "attribute_groups": None,
+        "brand": "brand",
+        "category": "category",
+        "feedbacks": _prefetch_feedbacks,
+        "feedbacks_count": None,
+        "images": "images",
+        "price": None,
+        "quantity": None,
+    },
+    ProductImage: {"image": "image"},
+    Promotion: {"products": "products"},
+    Stock: {"product": "product", "vendor": "vendor"},
+    Wishlist: {"products": "products"},
+}
+
+# Prefetched relations narrowed to active rows unless the user holds the permission
+PERMISSIONS = {
+    (Brand, "categories"): "core.view_category",
+}
+
+
+def _selected(info, nodes) -> dict[str, list]:
+    """Sub-fields selected on `nodes` by GraphQL name, with fragments expanded and aliases merged."""
+    selected = defaultdict(list)
+
+    def collect(selection_set):
+        for selection in selection_set.selections:
+            if isinstance(selection, FragmentSpreadNode):
+                collect(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                collect(selection.selection_set)
+            else:
+                selected[selection.name.value].append(selection)
+
+    for node in nodes:
+        if node.selection_set is not None:
+            collect(node.selection_set)
+    return selected
+
+
+def _unwrap(info, graphql_type, nodes):
+    """Object type and field nodes of the objects behind `nodes`, looking through relay connections."""
+    graphql_type = get_named_type(graphql_type)
+    if isinstance(graphql_type, GraphQLObjectType) and "edges" in graphql_type.fields:
+        edges_type = get_named_type(graphql_type.fields["edges"].type)
+        graphql_type = get_named_type(edges_type.fields["node"].type)
+        nodes = _selected(info, _selected(info, nodes)["edges"])["node"]
+    return graphql_type, nodes
+
+
+def _is_connection(graphql_type) -> bool:
+    graphql_type = get_named_type(graphql_type)
+    return isinstance(graphql_type, GraphQLObjectType) and "edges" in graphql_type.fields
+
+
+class QuerysetOptimizer:
+    """
+    Shape a queryset after the GraphQL selection that will read it.
+
+    Selected columns end up in `only()`, forward relations in `select_related()` and the other
+    relations in `Prefetch` objects narrowed the same way. Relations behind DataLoaders are
+    prefetched with the same filtering as their loader, which then reads the prefetched rows
+    instead of querying. A level keeps all of its columns as soon as a selected field has a
+    resolver the optimizer cannot see through, so the optimization never adds queries.
+    """
+
+    def __init__(self, info):
+        self.info = info
+        self.user = info.context.user
+        self.select_related = set()
+        self.prefetch_related = []
+
+    def optimize(self, queryset: QuerySet) -> QuerySet:
+        """Optimize `queryset` for the field being resolved, a connection or list of its model."""
+        node_type, nodes = _unwrap(self.info, self.info.return_type, self.info.field_nodes)
+        return self.apply(queryset, self.walk(queryset.model, node_type, nodes))
+
+    def apply(self, queryset: QuerySet, columns) -> QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if columns is not None:
+            queryset = queryset.only(*sorted(columns))
+        return queryset
+
+    def walk(self, model, graphql_type, nodes, prefix: str = "") -> set[str] | None:
+        """
+        Record the relations `nodes` select on `model` below the lookup `prefix` and return the
+        columns they read, or None when all of them are needed.
+        """
+        graphene_type = getattr(graphql_type, "graphene_type", None)
+        hints = HINTS.get(model, {})
+        columns = required_columns(model)
+        narrow = True
+        relations = defaultdict(list)
+
+        for name, field_nodes in _selected(self.info, nodes).items():
+            if name.startswith("__") or name == "id":
+                continue
+            field_type = graphql_type.fields[name].type
+            field_name = to_snake_case(name)
+
+            if field_name in hints:
+                target = hints[field_name]
+                if target is None:
+                    continue
+                if callable(target):
+                    self.prefetch_related.append(target(self, prefix, *_unwrap(self.info, field_type, field_nodes)))
+                    continue
+            elif getattr(graphene_type, f"resolve_{field_name}", None) is not None:
+                narrow = False
+                continue
+            else:
+                target = field_name
+
+            try:
+                field = model._meta.get_field(target)
+            except FieldDoesNotExist:
+                narrow = False
+                continue
+
+            if field.is_relation:
+                relations[field].append((field_type, field_nodes, field_name in hints))
+            else:
+                columns.update(localized_columns(model, field.name))
+
+        for field, selections in relations.items():
+            related = self._relation(model, field, selections, prefix)
+            if related is not None:
+                columns.update(related)
+
+        return columns if narrow else None
+
+    def _relation(self, model, field, selections, prefix: str) -> set[str] | None:
+        """Record one relation and return the columns it needs on `model`."""
+        lookup = f"{prefix}{field.name}"
+        nodes = []
+        node_type = None
+        narrow = True
+        for field_type, field_nodes, _hinted in selections:
+            if isinstance(get_named_type(field_type), GraphQLObjectType):
+                node_type, unwrapped = _unwrap(self.info, field_type, field_nodes)
+                nodes += unwrapped
+            else:
+                narrow = False
+
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            self.select_related.add(lookup)
+            related = self.walk(field.related_model, node_type, nodes, prefix=f"{lookup}__") if node_type else None
+            if not narrow or related is None:
+                return {field.name}
+            return {field.name, *(f"{field.name}__{column}" for column in related)}
+
+        # Connections filter the querysets of their resolvers, only lists can use what we prefetch
+        if not any(hinted or not _is_connection(field_type) for field_type, _nodes, hinted in selections):
+            return None
+
+        nested = QuerysetOptimizer(self.info)
+        related = nested.walk(field.related_model, node_type, nodes) if node_type else None
+        queryset = field.related_model._default_manager.all()
+        permission = PERMISSIONS.get((model, field.name))
+        if permission and not self.user.has_perm(permission):
+            queryset = queryset.filter(is_active=True)
+        if narrow and related is not None and not field.many_to_many:
+            related.add(field.remote_field.name)
+        self.prefetch_related.append(Prefetch(lookup, queryset=nested.apply(queryset, related if narrow else None)))
+        return None
+
+
+def optimize_queryset(queryset: QuerySet, info) -> QuerySet:
+    """Apply the `only()`, `select_related()` and `Prefetch` objects the current GraphQL selection needs."""
+    return QuerysetOptimizer(info).optimize(queryset)
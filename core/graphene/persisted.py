@@ -0,0 +1,88 @@
+import json
+import re
+from functools import lru_cache
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from graphene.validation import depth_limit_validator
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError, parse, specified_rules, validate
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class PersistedQueryError(Exception):
+    """Automatic persisted query failure, reported with the messages and codes APQ clients expect."""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.code = code
+
+    @property
+    def formatted(self) -> dict:
+        return {"message": str(self), "extensions": {"code": self.code}}
+
+
+def _param(request, data, name: str):
+    return request.GET.get(name) or data.get(name)
+
+
+def persisted_query(request, data) -> str | None:
+    """
+    Resolve the automatic persisted query of a request, None when it doesn't use one.
+
+    A request carrying only the sha256 hash of its query in `extensions.persistedQuery` gets
+    the text registered for that hash, or `PersistedQueryNotFound`, upon which the client
+    repeats the request with the query text to register it.
+    """
+    extensions = _param(request, data, "extensions")
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            return None
+    persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+    if not persisted:
+        return None
+
+    if persisted.get("version") != 1:
+        raise PersistedQueryError("PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED")
+    query_hash = str(persisted.get("sha256Hash", "")).lower()
+    if not SHA256_PATTERN.match(query_hash):
+        raise PersistedQueryError("provided sha is not a sha256 hash", "PERSISTED_QUERY_INVALID_HASH")
+
+    key = f"persisted_query:{query_hash}"
+    query = _param(request, data, "query")
+    if query:
+        if sha256(query.encode()).hexdigest() != query_hash:
+            raise PersistedQueryError("provided sha does not match query", "PERSISTED_QUERY_INVALID_HASH")
+        cache.set(key, query, timeout=settings.GRAPHQL_PERSISTED_QUERY_TIMEOUT)
+    else:
+        query = cache.get(key)
+        if query is None:
+            raise PersistedQueryError("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+
+    request.graphql_persisted_query = query_hash
+    return query
+
+
+@lru_cache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+def validated_document(schema, query: str) -> tuple:
+    """
+    Parse `query` and validate it against `schema` with the rules that only depend on the
+    document, memoized per process. Returns the document, None when it can't be parsed, and
+    the validation errors.
+    """
+    try:
+        document = parse(query)
+    except GraphQLError as e:
+        return None, (e,)
+
+    errors = validate(
+        schema.graphql_schema,
+        document,
+        (*specified_rules, depth_limit_validator(settings.GRAPHQL_MAX_DEPTH)),
+        graphene_settings.MAX_VALIDATION_ERRORS,
+    )
+    return document, tuple(errors)
@@ -0,0 +1,57 @@
+import json
+from hashlib import sha256
+
+from django.conf import settings
+from django.utils.translation import get_language
+from graphql import FieldNode, OperationType, get_operation_ast
+
+from core.graphene.persisted import validated_document
+from core.graphene.schema import CACHEABLE_QUERY_FIELDS
+from core.utils.caching import CATALOG_MODELS, model_versions
+
+
+def _digest(value) -> str:
+    return sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _permission_class(user) -> str | None:
+    # Only anonymous responses are shared, everybody else may see more than the public catalog
+    return None if user.is_authenticated else "anonymous"
+
+
+def response_cache_key(request, schema, query: str, variables, operation_name) -> str | None:
+    """
+    Response cache key of a GraphQL request, None when it has to execute.
+
+    Only anonymous queries whose root fields are all in CACHEABLE_QUERY_FIELDS are cached. The
+    key holds the versions of the catalog models, so any change to the catalog misses the
+    responses cached before it.
+    """
+    permission_class = _permission_class(request.user)
+    if permission_class is None or not query:
+        return None
+
+    document, errors = validated_document(schema, query)
+    if document is None or errors:
+        return None
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+
+    selections = operation.selection_set.selections
+    if not all(isinstance(selection, FieldNode) for selection in selections):
+        return None
+    fields = {selection.name.value for selection in selections} - {"__typename"}
+    if not fields or not fields <= CACHEABLE_QUERY_FIELDS:
+        return None
+
+    return ":".join(
+        (
+            "graphql_response",
+            sha256(query.encode()).hexdigest(),
+            _digest([variables or {}, operation_name]),
+            get_language() or settings.LANGUAGE_CODE,
+            permission_class,
+            _digest(model_versions(CATALOG_MODELS)),
+        )
+    )
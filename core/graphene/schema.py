@@ -3,10 +3,14 @@ import logging
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from graphene import Field, List, ObjectType, Schema
+from graphene.utils.str_converters import to_snake_case
 from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.settings import graphene_settings
+from graphql_relay import cursor_to_offset
 
 from blog.filters import PostFilter
 from blog.graphene.object_types import PostType
+from core.elasticsearch.listing import get_product_listing
 from core.filters import (
     BrandFilter,
     CategoryFilter,
@@ -15,6 +19,7 @@ from core.filters import (
     ProductFilter,
     WishlistFilter,
 )
+from core.graphene.fields import ProductConnectionField
 from core.graphene.mutations import (
     AddOrderProduct,
     AddWishlistProduct,
@@ -55,6 +60,7 @@ from core.graphene.object_types import (
     VendorType,
     WishlistType,
 )
+from core.graphene.optimizer import optimize_queryset
 from core.models import (
     AttributeGroup,
     Brand,
@@ -93,11 +99,14 @@ from vibes_auth.models import User
 
 logger = logging.getLogger(__name__)
 
+# Public catalog fields: anonymous queries selecting nothing else are served from the response cache
+CACHEABLE_QUERY_FIELDS = {"products", "categories", "brands", "languages", "parameters"}
+
 
 class Query(ObjectType):
     parameters = Field(ConfigType)
     languages = List(LanguageType)
-    products = DjangoFilterConnectionField(ProductType, filterset_class=ProductFilter)
+    products = ProductConnectionField(ProductType, filterset_class=ProductFilter)
     orders = DjangoFilterConnectionField(OrderType, filterset_class=OrderFilter)
     users = DjangoFilterConnectionField(UserType, filterset_class=UserFilter)
     attribute_groups = DjangoFilterConnectionField(AttributeGroupType)
@@ -135,16 +144,30 @@ class Query(ObjectType):
             product = Product.objects.get(uuid=kwargs["uuid"])
             if product.is_active and product.brand.is_active and product.category.is_active:
                 info.context.user.add_to_recently_viewed(product.uuid)
-        return (
-            Product.objects.all().select_related("brand", "category").prefetch_related("images", "stocks")
-            if info.context.user.has_perm("core.view_product")
-            else Product.objects.filter(
+        if info.context.user.has_perm("core.view_product"):
+            return optimize_queryset(Product.objects.all(), info)
+
+        products = optimize_queryset(
+            Product.objects.filter(
                 is_active=True, brand__is_active=True, category__is_active=True, stocks__isnull=False
-            )
-            .select_related("brand", "category")
-            .prefetch_related("images", "stocks")
+            ),
+            info,
         )
 
+        start = (cursor_to_offset(kwargs["after"]) + 1 if kwargs.get("after") else 0) + (kwargs.get("offset") or 0)
+        params = dict(kwargs)
+        if params.get("order_by"):
+            params["order_by"] = to_snake_case(params["order_by"])
+        listing = get_product_listing(
+            params,
+            products.distinct(),
+            start=start,
+            size=kwargs.get("first") or graphene_settings.RELAY_CONNECTION_MAX_LIMIT,
+            visible_only=True,
+        )
+
+        return products if listing is None else listing
+
     @staticmethod
     def resolve_orders(_parent, info, **kwargs):
         orders = Order.objects
@@ -167,7 +190,7 @@ class Query(ObjectType):
                 filters["uuid"] = kwargs["uuid"]
             orders = orders.filter(**filters)
 
-        return orders
+        return optimize_queryset(orders, info)
 
     @staticmethod
     def resolve_users(_parent, info, **kwargs):
@@ -198,14 +221,14 @@ class Query(ObjectType):
     @staticmethod
     def resolve_brands(_parent, info):
         if not info.context.user.has_perm("core.view_brand"):
-            return Brand.objects.filter(is_active=True)
-        return Brand.objects.all()
+            return optimize_queryset(Brand.objects.filter(is_active=True), info)
+        return optimize_queryset(Brand.objects.all(), info)
 
     @staticmethod
     def resolve_feedbacks(_parent, info, **kwargs):
         if info.context.user.has_perm("core.view_feedback"):
-            return Feedback.objects.all()
-        return Feedback.objects.filter(is_active=True)
+            return optimize_queryset(Feedback.objects.all(), info)
+        return optimize_queryset(Feedback.objects.filter(is_active=True), info)
 
     @staticmethod
     def resolve_order_products(_parent, info, **kwargs):
@@ -227,19 +250,19 @@ class Query(ObjectType):
                 filters["uuid"] = kwargs["uuid"]
             order_products = order_products.filter(**filters)
 
-        return order_products
+        return optimize_queryset(order_products, info)
 
     @staticmethod
     def resolve_product_images(_parent, info, **kwargs):
         if info.context.user.has_perm("core.view_productimage"):
-            return ProductImage.objects.all()
-        return ProductImage.objects.filter(is_active=True)
+            return optimize_queryset(ProductImage.objects.all(), info)
+        return optimize_queryset(ProductImage.objects.filter(is_active=True), info)
 
     @staticmethod
     def resolve_stocks(_parent, info):
         if not info.context.user.has_perm("core.view_stock"):
             raise PermissionDenied(permission_denied_message)
-        return Stock.objects.all()
+        return optimize_queryset(Stock.objects.all(), info)
 
     @staticmethod
     def resolve_wishlists(_parent, info, **kwargs):
@@ -264,14 +287,14 @@ class Query(ObjectType):
                 filters["uuid"] = kwargs["uuid"]
             wishlists = wishlists.filter(**filters)
 
-        return wishlists
+        return optimize_queryset(wishlists, info)
 
     @staticmethod
     def resolve_promotions(_parent, info, **kwargs):
         promotions = Promotion.objects
         if info.context.user.has_perm("core.view_promotion"):
-            return promotions.all()
-        return promotions.filter(is_active=True)
+            return optimize_queryset(promotions.all(), info)
+        return optimize_queryset(promotions.filter(is_active=True), info)
 
     @staticmethod
     def resolve_promocodes(_parent, info, **kwargs):
@@ -0,0 +1,134 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, median
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.graphene.schema import schema
+from evibes.middleware import GrapheneJWTAuthorizationMiddleware
+from vibes_auth.models import User
+
+DEFAULT_QUERY = """
+query Benchmark($first: Int) {
+  products(first: $first) {
+    edges {
+      node {
+        uuid
+        name
+        slug
+        description
+        price
+        quantity
+        feedbacksCount
+        category { uuid name slug }
+        brand { uuid name }
+      }
+    }
+  }
+}
+"""
+
+
+class PerFieldJWTAuthorizationMiddleware(GrapheneJWTAuthorizationMiddleware):
+    """The previous behaviour: the token is decoded and the user loaded for every resolved field."""
+
+    def resolve(self, next, root, info, **args):
+        info.context.user = self.get_jwt_user(info.context)
+        return next(root, info, **args)
+
+
+class CountingMiddleware:
+    def __init__(self):
+        self.count = 0
+
+    def resolve(self, next, root, info, **args):
+        self.count += 1
+        return next(root, info, **args)
+
+
+class Command(BaseCommand):
+    help = (
+        "Execute the same GraphQL query with per-field and with request-scoped JWT authentication "
+        "and report the per-request overhead of each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", default=None, help="Authenticate as this user, anonymous by default")
+        parser.add_argument("--requests", type=int, default=50, help="Requests executed per variant")
+        parser.add_argument("--first", type=int, default=30, help="Products requested per query")
+        parser.add_argument("--query-file", default=None, help="Benchmark this GraphQL document instead")
+        parser.add_argument(
+            "-o",
+            "--output",
+            default=None,
+            help="Where to save the JSON report, defaults to graphql_auth_benchmark_<timestamp>.json",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be positive.")
+
+        headers = {}
+        if options["email"]:
+            try:
+                user = User.objects.get(email=options["email"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['email']!r}.")
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+
+        query = Path(options["query_file"]).read_text() if options["query_file"] else DEFAULT_QUERY
+        variables = {"first": options["first"]}
+
+        variants = {}
+        for name, middleware in (
+            ("per_field", PerFieldJWTAuthorizationMiddleware),
+            ("request_scoped", GrapheneJWTAuthorizationMiddleware),
+        ):
+            variants[name] = self.run(query, variables, headers, middleware(), options["requests"])
+            self.stdout.write(
+                f"{name}: {variants[name]['median_ms']:.2f} ms/request median, "
+                f"{variants[name]['resolved_fields']} resolved fields"
+            )
+
+        report = {
+            "evibes_version": settings.EVIBES_VERSION,
+            "created": datetime.now().isoformat(),
+            "authenticated": bool(headers),
+            "requests": options["requests"],
+            "variables": variables,
+            "variants": variants,
+            "overhead_saved_ms": round(variants["per_field"]["median_ms"] - variants["request_scoped"]["median_ms"], 3),
+        }
+
+        output = Path(options["output"] or f"graphql_auth_benchmark_{datetime.now():%Y%m%d%H%M%S}.json")
+        output.write_text(json.dumps(report, indent=2))
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmark report saved to {output}"))
+
+    @staticmethod
+    def run(query: str, variables: dict, headers: dict, auth_middleware, requests: int) -> dict:
+        factory = RequestFactory()
+        durations = []
+        counter = CountingMiddleware()
+
+        for _ in range(requests):
+            request = factory.post("/graphql/", **headers)
+            counter.count = 0
+            started = perf_counter()
+            result = schema.execute(
+                query, variable_values=variables, context_value=request, middleware=[auth_middleware, counter]
+            )
+            durations.append((perf_counter() - started) * 1000)
+            if result.errors:
+                raise CommandError(f"Query failed: {result.errors[0]}")
+
+        return {
+            "mean_ms": round(mean(durations), 3),
+            "median_ms": round(median(durations), 3),
+            "resolved_fields": counter.count,
+        }
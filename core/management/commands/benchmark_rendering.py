@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, median
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.renderers import EvibesJSONRenderer
+from core.viewsets import ProductViewSet
+
+RENDERERS = {
+    "camel_case": CamelCaseJSONRenderer,
+    "evibes": EvibesJSONRenderer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the response data of /core/products/ with the CamelCaseJSONRenderer and with the "
+        "EvibesJSONRenderer, check that both produce the same bytes and report the time of each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100, help="Products on the rendered page")
+        parser.add_argument("--repeat", type=int, default=200, help="Renders per renderer")
+        parser.add_argument(
+            "-o",
+            "--output",
+            default=None,
+            help="Where to save the JSON report, defaults to rendering_benchmark_<timestamp>.json",
+        )
+
+    def handle(self, *args, **options):
+        if options["page_size"] < 1 or options["repeat"] < 1:
+            raise CommandError("--page-size and --repeat must be positive.")
+
+        request = APIRequestFactory().get("/core/products/", {"page_size": options["page_size"]})
+        response = ProductViewSet.as_view({"get": "list"})(request)
+        if response.status_code != 200:
+            raise CommandError(f"/core/products/ answered {response.status_code}.")
+        data = response.data
+
+        results = {}
+        rendered = {}
+        for name, renderer_class in RENDERERS.items():
+            renderer = renderer_class()
+            timings = []
+            for _ in range(options["repeat"]):
+                started = perf_counter()
+                rendered[name] = renderer.render(data, "application/json", {})
+                timings.append((perf_counter() - started) * 1000)
+            results[name] = {
+                "mean_ms": round(mean(timings), 3),
+                "median_ms": round(median(timings), 3),
+                "bytes": len(rendered[name]),
+            }
+            self.stdout.write(f"{name}: {results[name]['median_ms']:.3f} ms median, {results[name]['bytes']} bytes")
+
+        identical = len(set(rendered.values())) == 1
+        if not identical:
+            self.stdout.write(self.style.ERROR("The renderers produced different bytes."))
+
+        report = {
+            "evibes_version": settings.EVIBES_VERSION,
+            "created": datetime.now().isoformat(),
+            "parameters": {
+                "path": "/core/products/",
+                "page_size": options["page_size"],
+                "repeat": options["repeat"],
+            },
+            "identical": identical,
+            "results": results,
+        }
+
+        output = Path(options["output"] or f"rendering_benchmark_{datetime.now():%Y%m%d%H%M%S}.json")
+        output.write_text(json.dumps(report, indent=2))
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmark report saved to {output}"))
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, quantiles
+from time import perf_counter
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Endpoints waiting on Elasticsearch and Nominatim. `{n}` is replaced by the request number, so
+# searches miss the search cache and every request reaches the upstream service.
+DEFAULT_PATHS = (
+    "/search/?q=benchmark{n}",
+    "/core/addresses/autocomplete/?q=Berlin+{n}&limit=5",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running servers, e.g. the WSGI and the ASGI mode side by side, with concurrent "
+        "requests to the I/O-bound endpoints and report throughput and latency of each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="NAME=URL of a server to load, repeat to compare, e.g. wsgi=http://localhost:8000",
+        )
+        parser.add_argument("--path", action="append", default=None, help="Request this path, repeatable")
+        parser.add_argument("--host", default="api.localhost", help="Host header, routes the requests to the API")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests sent to every target")
+        parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at once")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Seconds before a request counts as failed")
+        parser.add_argument(
+            "-o",
+            "--output",
+            default=None,
+            help="Where to save the JSON report, defaults to serving_benchmark_<timestamp>.json",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        targets = {}
+        for target in options["target"]:
+            name, _sep, url = target.partition("=")
+            if not url:
+                raise CommandError(f"--target {target!r} is not NAME=URL.")
+            targets[name] = url.rstrip("/")
+        paths = options["path"] or list(DEFAULT_PATHS)
+
+        results = {}
+        for name, url in targets.items():
+            results[name] = asyncio.run(self.run(url, paths, options))
+            self.stdout.write(
+                f"{name}: {results[name]['requests_per_second']:.1f} requests/s, "
+                f"p50 {results[name]['p50_ms']:.1f} ms, p99 {results[name]['p99_ms']:.1f} ms, "
+                f"{results[name]['errors']} errors"
+            )
+
+        report = {
+            "evibes_version": settings.EVIBES_VERSION,
+            "created": datetime.now().isoformat(),
+            "parameters": {
+                "paths": paths,
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "timeout": options["timeout"],
+            },
+            "targets": targets,
+            "results": results,
+        }
+
+        output = Path(options["output"] or f"serving_benchmark_{datetime.now():%Y%m%d%H%M%S}.json")
+        output.write_text(json.dumps(report, indent=2))
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmark report saved to {output}"))
+
+    @staticmethod
+    async def run(url: str, paths: list[str], options: dict) -> dict:
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        durations = []
+        statuses = {}
+        errors = 0
+
+        async with httpx.AsyncClient(
+            base_url=url,
+            headers={"Host": options["host"]},
+            timeout=options["timeout"],
+            limits=httpx.Limits(max_connections=options["concurrency"]),
+        ) as client:
+
+            async def request(number: int):
+                nonlocal errors
+                async with semaphore:
+                    started = perf_counter()
+                    try:
+                        response = await client.get(paths[number % len(paths)].format(n=number))
+                    except httpx.HTTPError:
+                        errors += 1
+                        return
+                    durations.append((perf_counter() - started) * 1000)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    if response.status_code >= 500:
+                        errors += 1
+
+            started = perf_counter()
+            await asyncio.gather(*(request(number) for number in range(options["requests"])))
+            duration = perf_counter() - started
+
+        # quantiles() needs two samples
+        samples = durations * 2 if len(durations) == 1 else durations or [0.0, 0.0]
+        percentiles = quantiles(samples, n=100)
+        return {
+            "duration": round(duration, 3),
+            "requests_per_second": options["requests"] / duration if duration else 0.0,
+            "mean_ms": round(mean(durations), 3) if durations else 0.0,
+            "p50_ms": round(percentiles[49], 3),
+            "p95_ms": round(percentiles[94], 3),
+            "p99_ms": round(percentiles[98], 3),
+            "errors": errors,
+            "statuses": statuses,
+        }
@@ -0,0 +1,144 @@
+import json
+import resource
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.models import AttributeGroup, Brand, Category, Product, Vendor
+from core.vendors import delete_products
+from core.vendors.synthetic import PRICE_DISTRIBUTIONS, SyntheticVendor, generate_feed
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic vendor feed, run it through the reference vendor implementation "
+        "against the local database and report ingestion throughput, query counts, peak RSS "
+        "and time spent in ES resolution vs DB writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1000, help="Number of products in the feed")
+        parser.add_argument("--attributes", type=int, default=10, help="Attributes per product")
+        parser.add_argument("--categories", type=int, default=50, help="Number of distinct category names")
+        parser.add_argument("--brands", type=int, default=20, help="Number of distinct brand names")
+        parser.add_argument(
+            "--price-distribution",
+            choices=PRICE_DISTRIBUTIONS,
+            default="lognormal",
+            help="Distribution purchase prices are drawn from",
+        )
+        parser.add_argument("--min-price", type=float, default=1.0)
+        parser.add_argument("--max-price", type=float, default=5000.0)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, keeps feeds comparable between runs")
+        parser.add_argument("--runs", type=int, default=1, help="Sync the same feed this many times")
+        parser.add_argument("--prefix", default="bench", help="Prefix of every generated name")
+        parser.add_argument(
+            "-o",
+            "--output",
+            default=None,
+            help="Where to save the JSON report, defaults to vendor_sync_benchmark_<timestamp>.json",
+        )
+        parser.add_argument("--keep", action="store_true", help="Do not delete the generated data afterwards")
+
+    def handle(self, *args, **options):
+        if options["products"] < 1:
+            raise CommandError("--products must be positive.")
+        if options["min_price"] <= 0 or options["min_price"] >= options["max_price"]:
+            raise CommandError("--min-price must be positive and lower than --max-price.")
+
+        prefix = options["prefix"]
+        vendor_name = f"{prefix} synthetic vendor"
+
+        if Vendor.objects.filter(name=vendor_name).exists():
+            raise CommandError(f"Vendor {vendor_name!r} exists, clean up or pick another --prefix.")
+
+        feed = generate_feed(
+            products=options["products"],
+            attributes=options["attributes"],
+            categories=options["categories"],
+            brands=options["brands"],
+            price_distribution=options["price_distribution"],
+            min_price=options["min_price"],
+            max_price=options["max_price"],
+            seed=options["seed"],
+            prefix=prefix,
+        )
+        Vendor.objects.create(name=vendor_name, is_active=True)
+
+        runs = []
+        try:
+            for number in range(1, options["runs"] + 1):
+                runs.append(self.run(feed, vendor_name))
+                self.stdout.write(
+                    f"Run {number}: {runs[-1]['rows_per_second']:.1f} rows/s, "
+                    f"{runs[-1]['queries_per_product']:.1f} queries/product"
+                )
+        finally:
+            if not options["keep"]:
+                self.cleanup(vendor_name, prefix)
+
+        report = {
+            "evibes_version": settings.EVIBES_VERSION,
+            "created": datetime.now().isoformat(),
+            "database": connection.vendor,
+            "parameters": {
+                key: options[key]
+                for key in (
+                    "products",
+                    "attributes",
+                    "categories",
+                    "brands",
+                    "price_distribution",
+                    "min_price",
+                    "max_price",
+                    "seed",
+                )
+            },
+            "runs": runs,
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+        output = Path(options["output"] or f"vendor_sync_benchmark_{datetime.now():%Y%m%d%H%M%S}.json")
+        output.write_text(json.dumps(report, indent=2))
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmark report saved to {output}"))
+
+    @staticmethod
+    def run(feed: list[dict], vendor_name: str) -> dict:
+        vendor = SyntheticVendor(feed, vendor_name=vendor_name)
+        counter = QueryCounter()
+
+        started = perf_counter()
+        with connection.execute_wrapper(counter):
+            vendor.update_stock()
+        duration = perf_counter() - started
+
+        return {
+            "duration": round(duration, 3),
+            "rows_per_second": len(feed) / duration if duration else 0.0,
+            "queries_total": counter.count,
+            "queries_per_product": counter.count / len(feed),
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "timings": {section: round(seconds, 3) for section, seconds in vendor.timings.items()},
+        }
+
+    @staticmethod
+    def cleanup(vendor_name: str, prefix: str):
+        delete_products(Product.objects.filter(partnumber__startswith=f"{prefix}-pn-"), pause=0)
+        Vendor.objects.filter(name=vendor_name).delete()
+        AttributeGroup.objects.filter(name=f"{vendor_name} specifications").delete()
+        Category.objects.filter(name__startswith=f"{prefix} category ").delete()
+        Brand.objects.filter(name__startswith=f"{prefix} brand ").delete()
@@ -3,6 +3,7 @@ from collections import defaultdict
 from django.core.management.base import BaseCommand
 
 from core.models import Category, Product, Stock
+from core.utils.caching import bump_model_version
 
 
 class Command(BaseCommand):
@@ -64,6 +65,9 @@ class Command(BaseCommand):
                 total_product_updates += Product.objects.filter(category=duplicate).update(category=keep_category)
                 categories_to_delete.append(duplicate.id)
 
+        if total_product_updates:
+            bump_model_version(Product._meta.label)
+
         if categories_to_delete:
             Category.objects.filter(id__in=categories_to_delete).delete()
             self.stdout.write(
@@ -78,6 +82,7 @@ class Command(BaseCommand):
         count_inactive = inactive_products.count()
         if count_inactive:
             inactive_products.update(is_active=False)
+            bump_model_version(Product._meta.label)
             self.stdout.write(self.style.SUCCESS(f"Set {count_inactive} product(s) as inactive due to missing stocks."))
 
         # 4. Delete stocks without an associated product.
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from core.elasticsearch import populate_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Synchronise Elasticsearch indices with the database. Incremental mode sends only the rows "
+        "changed since the previous run, full mode rebuilds every index behind its alias."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-m",
+            "--mode",
+            choices=("incremental", "full"),
+            default="incremental",
+            help="Indexing mode, defaults to incremental",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Documents per bulk request, defaults to ELASTICSEARCH_BULK_CHUNK_SIZE",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=None,
+            help="Bulk worker threads, defaults to ELASTICSEARCH_BULK_THREAD_COUNT",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Populating indices in {options['mode']} mode...")
+
+        for stats in populate_index(
+            mode=options["mode"], chunk_size=options["chunk_size"], thread_count=options["threads"]
+        ):
+            self.stdout.write(
+                f"{stats['index']} ({stats['mode']}): {stats['indexed']} indexed, {stats['deleted']} deleted "
+                f"in {stats['seconds']}s, {stats['docs_per_second']} docs/s"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Indices populated!"))
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.elasticsearch.analytics import flush_search_events, top_queries, zero_result_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the most frequent search queries and the queries that returned nothing, "
+        "the candidates for synonyms and search cache warm-up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Look back this many days, defaults to 7")
+        parser.add_argument("--limit", type=int, default=50, help="Queries per report, defaults to 50")
+        parser.add_argument("--locale", default=None, help="Only report searches made in this language")
+        parser.add_argument("--json", action="store_true", help="Print both reports as JSON")
+
+    def handle(self, *args, **options):
+        flush_search_events()
+
+        reports = {
+            "top_queries": top_queries(options["days"], options["limit"], options["locale"]),
+            "zero_result_queries": zero_result_queries(options["days"], options["limit"], options["locale"]),
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(reports, indent=2, default=str))
+            return
+
+        for title, rows in reports.items():
+            self.stdout.write(self.style.SUCCESS(f"{title.replace('_', ' ').capitalize()} ({options['days']} days)"))
+            for row in rows:
+                self.stdout.write(
+                    f"{row['searches']:>8}  {row['locale']:<8} {row['query']!r}, "
+                    f"{row['average_results']:.1f} results, {row['average_latency']:.1f} ms"
+                )
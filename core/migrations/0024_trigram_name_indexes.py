@@ -0,0 +1,32 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ("core_product", "name_en_gb"),
+    ("core_product", "name_en_us"),
+    ("core_product", "name_de_de"),
+    ("core_category", "name_en_gb"),
+    ("core_category", "name_en_us"),
+    ("core_category", "name_de_de"),
+    ("core_brand", "name"),
+)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0023_address_address_line'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        *(
+            migrations.RunSQL(
+                sql=f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)",
+                reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {table}_{column}_trgm",
+            )
+            for table, column in TRIGRAM_INDEXES
+        ),
+    ]
@@ -0,0 +1,58 @@
+import uuid
+
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0024_trigram_name_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQuery',
+            fields=[
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False,
+                                          help_text='unique id is used to surely identify any database object',
+                                          primary_key=True, serialize=False, verbose_name='unique id')),
+                ('is_active', models.BooleanField(default=True,
+                                                  help_text="if set to false, this object can't be seen by users "
+                                                            "without needed permission",
+                                                  verbose_name='is active')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True,
+                                                                              help_text='when the object first '
+                                                                                        'appeared on the database',
+                                                                              verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True,
+                                                                                   help_text='when the object was '
+                                                                                             'last modified',
+                                                                                   verbose_name='modified')),
+                ('query', models.CharField(help_text='normalized search term as typed by the user', max_length=255,
+                                           verbose_name='query')),
+                ('locale', models.CharField(help_text='language the search was performed in', max_length=7,
+                                            verbose_name='locale')),
+                ('source', models.CharField(help_text='API the search came through', max_length=16,
+                                            verbose_name='source')),
+                ('tier', models.CharField(blank=True, help_text='search tier that answered the query', max_length=16,
+                                          null=True, verbose_name='tier')),
+                ('results', models.JSONField(default=dict, help_text='number of results per index',
+                                             verbose_name='results')),
+                ('total_results', models.PositiveIntegerField(default=0,
+                                                              help_text='number of results across all indices',
+                                                              verbose_name='total results')),
+                ('latency', models.FloatField(help_text='time the search took, in milliseconds',
+                                              verbose_name='latency')),
+                ('searched_at', models.DateTimeField(help_text='when the search was performed',
+                                                     verbose_name='searched at')),
+            ],
+            options={
+                'verbose_name': 'search query',
+                'verbose_name_plural': 'search queries',
+                'indexes': [
+                    models.Index(fields=['searched_at', 'query'], name='core_search_query_idx'),
+                    models.Index(fields=['searched_at', 'total_results'], name='core_search_results_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,208 @@
+import json
+from hashlib import sha256
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.utils.caching import model_versions, models_modified
+
+CONDITIONAL_METHODS = ("GET", "HEAD")
+
+# Validators are computed for every request, replaying the stored ones would describe another state
+UNCACHED_HEADERS = {"etag", "last-modified"}
+
+
+def _answer(view, request, response):
+    # dispatch() looks the handler up after initial(), answer in its place
+    setattr(view, request.method.lower(), lambda *_args, **_kwargs: response)
+
+
+def _replay(entry: dict) -> HttpResponse:
+    if "headers" not in entry:
+        return HttpResponse(entry["content"], content_type=entry["content_type"])
+    return HttpResponse(entry["content"], headers=entry["headers"])
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for APIViews and viewsets.
+
+    Reads of `conditional_actions` carry an ETag, and a Last-Modified header where one is known,
+    computed before the view runs, so a request whose If-None-Match or If-Modified-Since still
+    matches is answered with a 304 without serializing anything. With `conditional_models` the
+    validators are the version counters of these models, otherwise the latest `modified` and the
+    row count of the filtered queryset.
+    """
+
+    conditional_actions = ("list", "retrieve")
+    conditional_models = ()
+
+    def is_conditional(self, request) -> bool:
+        if request.method not in CONDITIONAL_METHODS:
+            return False
+        return not hasattr(self, "action") or self.action in self.conditional_actions
+
+    def get_conditional_validators(self, request) -> tuple[list, int | None]:
+        """Values the response changes with and the Unix time of its last change, if known."""
+        if self.conditional_models:
+            return [model_versions(self.conditional_models)], models_modified(self.conditional_models)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        aggregate = queryset.order_by().aggregate(modified=Max("modified"), count=Count("pk"))
+        modified = aggregate["modified"]
+        return [modified, aggregate["count"]], int(modified.timestamp()) if modified else None
+
+    def get_conditional_etag(self, request, validators: list) -> str:
+        user = request.user
+        variant = [
+            request.get_full_path(),
+            get_language() or settings.LANGUAGE_CODE,
+            request.accepted_media_type,
+            user.pk if user.is_authenticated else None,
+        ]
+        digest = sha256(json.dumps([variant, validators], sort_keys=True, default=str).encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self.conditional_headers = {}
+        self.conditional_response = None
+        if not self.is_conditional(request):
+            return
+
+        validators, last_modified = self.get_conditional_validators(request)
+        etag = self.get_conditional_etag(request, validators)
+        self.conditional_headers["ETag"] = etag
+        if last_modified is not None:
+            self.conditional_headers["Last-Modified"] = http_date(last_modified)
+
+        self.conditional_response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if self.conditional_response is not None:
+            _answer(self, request, self.conditional_response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        headers = getattr(self, "conditional_headers", None)
+        if headers and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            for header, value in headers.items():
+                response.headers.setdefault(header, value)
+            patch_vary_headers(response, ("Accept-Language", "Authorization"))
+        return response
+
+
+class ResponseCacheMixin:
+    """
+    Cache of the rendered responses to anonymous reads of `conditional_actions`.
+
+    Responses are keyed by host, path, normalized query string, language, renderer and permission
+    class and stored as bytes and headers together with the versions of `conditional_models` they
+    were rendered at. A changed version makes the entry stale: one request re-renders it while the
+    others keep getting the stale bytes, so a catalog change never makes every reader serialize at
+    once. Without an entry the others wait up to REST_RESPONSE_CACHE_WAIT seconds for it to appear.
+    List it before ConditionalGetMixin in the bases, requests answered with a 304 never reach it.
+    """
+
+    def is_response_cacheable(self, request) -> bool:
+        return (
+            request.method == "GET"
+            and not request.user.is_authenticated
+            and bool(self.conditional_models)
+            and self.action in self.conditional_actions
+        )
+
+    def get_response_cache_key(self, request) -> str:
+        query = sorted(request.query_params.lists())
+        variant = [
+            request.get_host(),
+            request.path,
+            query,
+            get_language() or settings.LANGUAGE_CODE,
+            request.accepted_renderer.format,
+            request.accepted_media_type,
+            "anonymous",
+        ]
+        return f"rest_response:{sha256(json.dumps(variant).encode()).hexdigest()}"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self.response_cache_key = None
+        if getattr(self, "conditional_response", None) is not None or not self.is_response_cacheable(request):
+            return
+
+        key = self.get_response_cache_key(request)
+        versions = sha256(json.dumps(model_versions(self.conditional_models), sort_keys=True).encode()).hexdigest()
+        entry = cache.get(key)
+        if entry is not None and entry["versions"] == versions:
+            _answer(self, request, _replay(entry))
+            return
+
+        self.response_cache_locked = cache.add(f"{key}:lock", 1, timeout=settings.REST_RESPONSE_CACHE_LOCK_TIMEOUT)
+        if entry is not None and not self.response_cache_locked:
+            # Another request is re-rendering it, the validators describe the new state, not these bytes
+            self.conditional_headers = {}
+            _answer(self, request, _replay(entry))
+            return
+
+        if not self.response_cache_locked:
+            entry = self._wait_for_response(key, versions)
+            if entry is not None:
+                _answer(self, request, _replay(entry))
+                return
+
+        self.response_cache_key = key
+        self.response_cache_versions = versions
+
+    def _wait_for_response(self, key: str, versions: str) -> dict | None:
+        """The entry another request is rendering, None once this one holds the lock or gave up waiting."""
+        deadline = monotonic() + settings.REST_RESPONSE_CACHE_WAIT
+        while monotonic() < deadline:
+            sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None and entry["versions"] == versions:
+                return entry
+            self.response_cache_locked = cache.add(f"{key}:lock", 1, timeout=settings.REST_RESPONSE_CACHE_LOCK_TIMEOUT)
+            if self.response_cache_locked:
+                return None
+        return None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "response_cache_key", None)
+        if key is None:
+            return response
+
+        if response.status_code == status.HTTP_200_OK and isinstance(response, Response):
+            response.add_post_render_callback(self._store_response)
+        elif self.response_cache_locked:
+            cache.delete(f"{key}:lock")
+        return response
+
+    def _store_response(self, response):
+        cache.set(
+            self.response_cache_key,
+            {
+                "versions": self.response_cache_versions,
+                "content": response.content,
+                "headers": {
+                    header: value
+                    for header, value in response.headers.items()
+                    if header.lower() not in UNCACHED_HEADERS
+                },
+            },
+            timeout=settings.REST_RESPONSE_CACHE_TIMEOUT,
+        )
+        if self.response_cache_locked:
+            cache.delete(f"{self.response_cache_key}:lock")
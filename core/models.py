@@ -529,22 +529,31 @@ class Order(NiceModel):
 
     @property
     def total_price(self) -> float:
-        return (
-                round(
-                    sum(
-                        order_product.buy_price * order_product.quantity
-                        if order_product.status not in FAILED_STATUSES and order_product.buy_price is not None
-                        else 0.0
-                        for order_product in self.order_products.all()
-                    ),
-                    2,
-                )
-                or 0.0
-        )
+        return self.get_total_price(self.order_products.all())
 
     @property
     def total_quantity(self) -> int:
-        return sum([op.quantity for op in self.order_products.all()])
+        return self.get_total_quantity(self.order_products.all())
+
+    @staticmethod
+    def get_total_price(order_products) -> float:
+        """Price of `order_products` as an order total, for callers that already hold them."""
+        return (
+            round(
+                sum(
+                    order_product.buy_price * order_product.quantity
+                    if order_product.status not in FAILED_STATUSES and order_product.buy_price is not None
+                    else 0.0
+                    for order_product in order_products
+                ),
+                2,
+            )
+            or 0.0
+        )
+
+    @staticmethod
+    def get_total_quantity(order_products) -> int:
+        return sum([op.quantity for op in order_products])
 
     def add_product(self, product_uuid: str | None = None, attributes: list = list, update_quantity: bool = True):
         if self.status not in ["PENDING", "MOMENTAL"]:
@@ -1294,3 +1303,59 @@ class Address(NiceModel):
     def __str__(self):
         base = f"{self.street}, {self.city}, {self.country}"
         return f"{base} for {self.user.email}" if self.user else base
+
+
+class SearchQuery(NiceModel):
+    is_publicly_visible = False
+
+    query = CharField(
+        max_length=255,
+        help_text=_("normalized search term as typed by the user"),
+        verbose_name=_("query"),
+    )
+    locale = CharField(
+        max_length=7,
+        help_text=_("language the search was performed in"),
+        verbose_name=_("locale"),
+    )
+    source = CharField(
+        max_length=16,
+        help_text=_("API the search came through"),
+        verbose_name=_("source"),
+    )
+    tier = CharField(  # noqa: DJ001
+        max_length=16,
+        blank=True,
+        null=True,
+        help_text=_("search tier that answered the query"),
+        verbose_name=_("tier"),
+    )
+    results = JSONField(
+        default=dict,
+        help_text=_("number of results per index"),
+        verbose_name=_("results"),
+    )
+    total_results = PositiveIntegerField(
+        default=0,
+        help_text=_("number of results across all indices"),
+        verbose_name=_("total results"),
+    )
+    latency = FloatField(
+        help_text=_("time the search took, in milliseconds"),
+        verbose_name=_("latency"),
+    )
+    searched_at = DateTimeField(
+        help_text=_("when the search was performed"),
+        verbose_name=_("searched at"),
+    )
+
+    def __str__(self):
+        return f"{self.query} ({self.locale}): {self.total_results}"
+
+    class Meta:
+        verbose_name = _("search query")
+        verbose_name_plural = _("search queries")
+        indexes = [
+            Index(fields=["searched_at", "query"], name="core_search_query_idx"),
+            Index(fields=["searched_at", "total_results"], name="core_search_results_idx"),
+        ]
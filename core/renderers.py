@@ -0,0 +1,96 @@
+from decimal import Decimal
+from functools import lru_cache
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.util import camelize_re, underscore_to_camel
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class _IncompatibleError(Exception):
+    """Raised for data orjson would render differently from the stdlib json module."""
+
+
+@lru_cache(maxsize=4096)
+def camelize_key(key: str) -> str:
+    return camelize_re.sub(underscore_to_camel, key) if "_" in key else key
+
+
+def _check_float(value: float):
+    # repr() and orjson only agree on the positional notation, nor do they render nan and infinity alike
+    if value and not 1e-4 <= abs(value) < 1e16:
+        raise _IncompatibleError
+
+
+def _camelize(data, ignore_keys):
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        camelized = {}
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            if not isinstance(key, str):
+                raise _IncompatibleError
+            key = str(key)
+            new_key = camelize_key(key)
+            camelized[key if key in ignore_keys or new_key in ignore_keys else new_key] = _camelize(value, ignore_keys)
+        return camelized
+    if data is None or isinstance(data, bool):
+        return data
+    if isinstance(data, int):
+        if not -(2**63) <= data < 2**64:
+            raise _IncompatibleError
+        return data
+    if isinstance(data, float):
+        _check_float(data)
+        return data
+    if isinstance(data, Decimal):
+        # The encoder renders decimals as floats
+        _check_float(float(data))
+        return data
+    if isinstance(data, Promise):
+        return force_str(data)
+    if isinstance(data, (list, tuple)):
+        return [_camelize(item, ignore_keys) for item in data]
+    try:
+        iterator = iter(data)
+    except TypeError:
+        return data
+    return [_camelize(item, ignore_keys) for item in iterator]
+
+
+class EvibesJSONRenderer(CamelCaseJSONRenderer):
+    """
+    CamelCaseJSONRenderer producing the same bytes in one pass over the data.
+
+    Keys are camelized while the data is copied, with the conversion of every key cached, and the
+    copy is encoded straight to bytes by orjson. Data orjson would render differently, such as
+    floats in exponent notation, as well as indented or ASCII-only output goes through the
+    CamelCaseJSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.json_underscoreize.get("ignore_fields")
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            rendered = orjson.dumps(
+                _camelize(data, self.json_underscoreize.get("ignore_keys") or ()),
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except (_IncompatibleError, orjson.JSONEncodeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        return rendered.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
@@ -4,6 +4,7 @@ from typing import Optional
 
 from django.core.cache import cache
 from django.db.models.functions import Length
+from drf_spectacular.utils import extend_schema_field
 from rest_framework.fields import SerializerMethodField
 from rest_framework.serializers import ModelSerializer
 from rest_framework_recursive.fields import RecursiveField
@@ -26,7 +27,12 @@ from core.models import (
     Vendor,
     Wishlist,
 )
-from core.serializers.simple import CategorySimpleSerializer, ProductSimpleSerializer
+from core.serializers.simple import (
+    AttributeGroupReferenceSerializer,
+    CategoryReferenceSerializer,
+    ProductSimpleSerializer,
+)
+from core.utils.specifications import SPECIFICATION_ATTRIBUTES, SPECIFICATION_VALUES, specification_trees
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +129,7 @@ class CategoryDetailSerializer(ModelSerializer):
 
 
 class BrandDetailSerializer(ModelSerializer):
-    categories = CategoryDetailSerializer(many=True)
+    categories = CategoryReferenceSerializer(many=True)
     small_logo = SerializerMethodField()
     big_logo = SerializerMethodField()
 
@@ -207,8 +213,8 @@ class ProductImageDetailSerializer(ModelSerializer):
 
 
 class AttributeDetailSerializer(ModelSerializer):
-    categories = CategoryDetailSerializer(many=True)
-    group = AttributeGroupDetailSerializer()
+    categories = CategoryReferenceSerializer(many=True)
+    group = AttributeGroupReferenceSerializer()
 
     class Meta:
         model = Attribute
@@ -224,7 +230,7 @@ class AttributeDetailSerializer(ModelSerializer):
 
 
 class AttributeInnerSerializer(ModelSerializer):
-    group = AttributeGroupDetailSerializer()
+    group = AttributeGroupReferenceSerializer()
 
     class Meta:
         model = Attribute
@@ -252,6 +258,40 @@ class AttributeValueDetailSerializer(ModelSerializer):
         ]
 
 
+class SpecificationValueSerializer(ModelSerializer):
+    class Meta:
+        model = AttributeValue
+        fields = [
+            "uuid",
+            "value",
+        ]
+
+
+class SpecificationAttributeSerializer(ModelSerializer):
+    values = SpecificationValueSerializer(source=SPECIFICATION_VALUES, many=True)
+
+    class Meta:
+        model = Attribute
+        fields = [
+            "uuid",
+            "name",
+            "value_type",
+            "values",
+        ]
+
+
+class SpecificationGroupSerializer(ModelSerializer):
+    attributes = SpecificationAttributeSerializer(source=SPECIFICATION_ATTRIBUTES, many=True)
+
+    class Meta:
+        model = AttributeGroup
+        fields = [
+            "uuid",
+            "name",
+            "attributes",
+        ]
+
+
 class VendorDetailSerializer(ModelSerializer):
     class Meta:
         model = Vendor
@@ -301,7 +341,7 @@ class PromoCodeDetailSerializer(ModelSerializer):
 
 class ProductDetailSerializer(ModelSerializer):
     brand = BrandProductDetailSerializer()
-    category = CategorySimpleSerializer()
+    category = CategoryReferenceSerializer()
     tags = ProductTagDetailSerializer(
         many=True,
     )
@@ -311,6 +351,7 @@ class ProductDetailSerializer(ModelSerializer):
     attributes = AttributeValueDetailSerializer(
         many=True,
     )
+    attribute_groups = SerializerMethodField()
 
     rating = SerializerMethodField()
     price = SerializerMethodField()
@@ -333,12 +374,23 @@ class ProductDetailSerializer(ModelSerializer):
             "slug",
             "images",
             "attributes",
+            "attribute_groups",
             "rating",
             "price",
             "created",
             "modified",
         ]
 
+    @extend_schema_field(SpecificationGroupSerializer(many=True))
+    def get_attribute_groups(self, obj: Product) -> list:
+        # Built from the values prefetched with their attribute and group, no extra queries
+        values = sorted(
+            obj.attributes.all(),
+            key=lambda value: (value.attribute.group.name or "", value.attribute.name or "", value.created),
+        )
+        specifications = specification_trees(values)
+        return SpecificationGroupSerializer(specifications.get(obj.pk, []), many=True, context=self.context).data
+
     def get_rating(self, obj: Product) -> float:
         return obj.rating
 
@@ -39,6 +39,37 @@ class AttributeGroupSimpleSerializer(ModelSerializer):
         ]
 
 
+class AttributeGroupReferenceSerializer(ModelSerializer):
+    """An attribute group embedded in another object, its tree is served by the attribute groups endpoint."""
+
+    class Meta:
+        model = AttributeGroup
+        fields = [
+            "uuid",
+            "name",
+        ]
+
+
+class CategoryReferenceSerializer(ModelSerializer):
+    """A category embedded in another object, its tree is served by the categories endpoint."""
+
+    image = SerializerMethodField()
+
+    class Meta:
+        model = Category
+        fields = [
+            "uuid",
+            "name",
+            "slug",
+            "image",
+        ]
+
+    def get_image(self, obj: Category) -> Optional[str]:
+        with suppress(ValueError):
+            return obj.image.url
+        return None
+
+
 class CategorySimpleSerializer(ModelSerializer):
     children = SerializerMethodField()
     image = SerializerMethodField()
@@ -124,7 +155,7 @@ class ProductImageSimpleSerializer(ModelSerializer):
 
 
 class AttributeSimpleSerializer(ModelSerializer):
-    group = AttributeGroupSimpleSerializer(read_only=True)
+    group = AttributeGroupReferenceSerializer(read_only=True)
 
     class Meta:
         model = Attribute
@@ -152,7 +183,7 @@ class AttributeValueSimpleSerializer(ModelSerializer):
 
 class ProductSimpleSerializer(ModelSerializer):
     brand = BrandSimpleSerializer(read_only=True)
-    category = CategorySimpleSerializer(read_only=True)
+    category = CategoryReferenceSerializer(read_only=True)
     tags = ProductTagSimpleSerializer(many=True, read_only=True)
     images = ProductImageSimpleSerializer(many=True, read_only=True)
 
@@ -2,7 +2,7 @@ import logging
 from datetime import timedelta
 
 from django.db import IntegrityError
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils.crypto import get_random_string
 from django.utils.http import urlsafe_base64_decode
@@ -12,6 +12,7 @@ from sentry_sdk import capture_exception
 
 from core.models import Category, Order, Product, PromoCode, Wishlist
 from core.utils import generate_human_readable_id, resolve_translations_for_elasticsearch
+from core.utils.caching import CATALOG_MODELS, bump_model_version
 from core.utils.emailing import send_order_created_email, send_order_finished_email
 from evibes.utils.misc import create_object
 from vibes_auth.models import User
@@ -118,3 +119,23 @@ def update_product_name_lang(instance, created, **kwargs):
 def update_category_name_lang(instance, created, **kwargs):
     resolve_translations_for_elasticsearch(instance, "name")
     resolve_translations_for_elasticsearch(instance, "description")
+
+
+def bump_catalog_version_signal(sender, **kwargs):
+    bump_model_version(sender._meta.label)
+
+
+for catalog_model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version_signal, sender=catalog_model, dispatch_uid=f"{catalog_model}_version_save")
+    post_delete.connect(
+        bump_catalog_version_signal, sender=catalog_model, dispatch_uid=f"{catalog_model}_version_delete"
+    )
+
+
+@receiver(m2m_changed)
+def bump_catalog_version_on_m2m_change_signal(sender, instance, model, action, **kwargs):
+    # Only relations declared on a catalog model, a product added to a wishlist changes no catalog response
+    owner = sender._meta.auto_created
+    if action.startswith("post_") and owner and owner._meta.label in CATALOG_MODELS:
+        for label in {type(instance)._meta.label, model._meta.label} & set(CATALOG_MODELS):
+            bump_model_version(label)
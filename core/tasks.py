@@ -12,8 +12,10 @@ from constance import config
 from django.core.cache import cache
 
 from core.elasticsearch import populate_index
+from core.elasticsearch.analytics import flush_search_events, purge_search_queries
+from core.elasticsearch.coalescing import flush_dirty, suspended_indexing
 from core.models import Product, Promotion
-from core.utils.caching import set_default_cache
+from core.utils.caching import bump_model_version, set_default_cache
 from core.vendors import delete_stale
 from evibes.settings import MEDIA_ROOT
 
@@ -39,24 +41,53 @@ def update_products_task():
 
     if not update_products_task_running:
         cache.set("update_products_task_running", True, 86400)
-        populate_index()
+        populate_index(mode="incremental")
         vendors_classes = []
 
         for vendor_class in vendors_classes:
             vendor = vendor_class()
             try:
-                vendor.update_stock()
+                with suspended_indexing():
+                    vendor.update_stock()
             except Exception as e:
                 logger.warning(f"Skipping {vendor_class} due to error: {e!s}")
 
         delete_stale()
-        populate_index()
+        populate_index(mode="incremental")
 
         cache.delete("update_products_task_running")
 
     return True, "Success"
 
 
+@shared_task
+def flush_search_index_task():
+    """
+    Bulk-index the objects recorded as changed by the coalescing signal processor.
+
+    :return: A tuple consisting of a status boolean and a message string
+    :rtype: tuple[bool, str]
+    """
+    processed = flush_dirty()
+
+    return True, f"Flushed {processed} objects to the search index"
+
+
+@shared_task
+def flush_search_analytics_task():
+    """
+    Move the search events buffered in Redis to the database and drop the recorded
+    searches older than the retention period.
+
+    :return: A tuple consisting of a status boolean and a message string
+    :rtype: tuple[bool, str]
+    """
+    flushed = flush_search_events()
+    purged = purge_search_queries()
+
+    return True, f"Flushed {flushed} search events, purged {purged} old searches"
+
+
 @shared_task
 def update_orderproducts_task():
     """
@@ -166,6 +197,7 @@ def process_promotions() -> tuple[bool, str]:
         return False, "Abstract features disabled."
 
     Promotion.objects.all().update(is_active=False)
+    bump_model_version(Promotion._meta.label)
 
     holiday_data = None
 
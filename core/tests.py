@@ -1,3 +1,1863 @@
-from django.test import TestCase  # noqa: F401
+import asyncio
+import json
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from hashlib import sha256
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone, translation
+from django.utils.translation import gettext_lazy
+from django_redis import get_redis_connection
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from elasticsearch import ApiError, BadRequestError
+from elasticsearch import ConnectionError as ElasticsearchConnectionError
+from graphql import parse
+from redis.exceptions import RedisError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.elasticsearch import (
+    SMART_FIELDS,
+    _guarded_search,
+    _high_water_mark_key,
+    _search,
+    _search_cache_key,
+    _search_cache_timeout,
+    autocomplete,
+    build_suggestions,
+    bulk_index,
+    bump_index_generation,
+    populate_index,
+    rebuild_index,
+    record_search_error,
+    search_catalog,
+    search_fields,
+    search_language,
+    update_index,
+)
+from core.elasticsearch.analytics import (
+    SEARCH_EVENTS_FLUSH_LOCK_KEY,
+    SEARCH_EVENTS_STREAM,
+    flush_search_events,
+    purge_search_queries,
+    record_search,
+    top_queries,
+    tracked_search,
+    zero_result_queries,
+)
+from core.elasticsearch.breaker import CircuitBreaker, search_breaker
+from core.elasticsearch.coalescing import (
+    DIRTY_SET_KEY,
+    FLUSH_LOCK_KEY,
+    flush_dirty,
+    mark_dirty,
+    mark_dirty_pks,
+    suspended_indexing,
+)
+from core.elasticsearch.documents import BrandDocument, ProductDocument
+from core.elasticsearch.fallback import trigram_search
+from core.elasticsearch.listing import (
+    ListingQuery,
+    ProductListing,
+    UnsupportedListingQueryError,
+    get_product_listing,
+)
+from core.graphene.cost import QueryCost
+from core.graphene.dataloaders import DataLoaderRegistry
+from core.graphene.persisted import validated_document
+from core.graphene.response_cache import response_cache_key
+from core.graphene.schema import schema
+from core.models import (
+    Attribute,
+    AttributeGroup,
+    AttributeValue,
+    Brand,
+    Category,
+    Feedback,
+    Order,
+    OrderProduct,
+    Product,
+    ProductTag,
+    SearchQuery,
+    Stock,
+    Vendor,
+    Wishlist,
+)
+from core.renderers import EvibesJSONRenderer, camelize_key
+from core.serializers.detail import AttributeDetailSerializer, BrandDetailSerializer, ProductDetailSerializer
+from core.serializers.simple import ProductSimpleSerializer
+from core.utils.caching import bump_model_version, model_versions
+from core.utils.db import chunked_delete
+from core.utils.http import async_http_client, call_upstream
+from core.utils.sparse import parse_field_paths, shape_serializer, sparse_queryset
+from core.utils.specifications import SPECIFICATION_ATTRIBUTES, SPECIFICATION_VALUES, product_specifications
+from core.vendors import PRODUCT_CASCADES, AbstractVendor, delete_products
+from core.vendors.synthetic import SyntheticVendor, generate_feed
+from core.views import AutocompleteView, CustomGraphQLView, SupportedLanguagesView
+from core.viewsets import AddressViewSet, FeedbackViewSet, ProductViewSet, VendorViewSet
+from vibes_auth.models import User
+
+
+class ProductDocumentRowActionsTests(TestCase):
+    def test_row_actions_prepare_stock_annotations(self):
+        """
+        The row path reads price, quantity and stock presence from the annotations of
+        annotate_queryset, so they have to survive the .values() of get_values_queryset.
+        """
+        category = Category.objects.create(name="Row actions")
+        product = Product.objects.create(category=category, name="Row product")
+
+        document = ProductDocument()
+        actions = list(document.get_row_actions(document.get_queryset().filter(pk=product.pk)))
+
+        self.assertEqual(len(actions), 1)
+        self.assertEqual(actions[0]["_id"], str(product.pk))
+        source = actions[0]["_source"]
+        self.assertEqual(source["price"], 0.0)
+        self.assertEqual(source["quantity"], 0)
+        self.assertFalse(source["has_stocks"])
+
+
+class ChunkedDeleteTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Chunked delete")
+        self.vendor = Vendor.objects.create(name="Chunked vendor")
+        self.group = AttributeGroup.objects.create(name="Chunked group")
+        self.attribute = Attribute.objects.create(group=self.group, name="Chunked attribute", value_type="string")
+        self.tag = ProductTag.objects.create(tag_name="chunked", name="Chunked tag")
+
+    def create_product(self, name):
+        product = Product.objects.create(category=self.category, name=name)
+        Stock.objects.create(vendor=self.vendor, product=product, price=10.0, quantity=1, sku=name)
+        AttributeValue.objects.create(attribute=self.attribute, product=product, value=name)
+        product.tags.add(self.tag)
+        return product
+
+    def test_chunked_delete_removes_rows_and_cascades_in_chunks(self):
+        products = [self.create_product(f"Chunked {index}") for index in range(5)]
+        chunks = []
+
+        deleted = chunked_delete(
+            Product.objects.filter(category=self.category),
+            cascades=PRODUCT_CASCADES,
+            chunk_size=2,
+            pause=0,
+            on_chunk=chunks.append,
+        )
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual({pk for chunk in chunks for pk in chunk}, {product.pk for product in products})
+        self.assertFalse(Product.objects.filter(category=self.category).exists())
+        self.assertFalse(Stock.objects.filter(vendor=self.vendor).exists())
+        self.assertFalse(AttributeValue.objects.filter(attribute=self.attribute).exists())
+        self.assertFalse(Product.tags.through.objects.filter(producttag=self.tag).exists())
+
+    def test_chunked_delete_survives_failing_hook(self):
+        self.create_product("Chunked hook")
+
+        def failing_hook(pks):
+            raise RuntimeError("index unavailable")
+
+        deleted = chunked_delete(
+            Product.objects.filter(category=self.category), cascades=PRODUCT_CASCADES, pause=0, on_chunk=failing_hook
+        )
+
+        self.assertEqual(deleted, 1)
+
+    @patch("core.vendors.remove_from_index")
+    def test_delete_products_keeps_ordered_products(self, remove_from_index):
+        ordered = self.create_product("Chunked ordered")
+        unordered = self.create_product("Chunked unordered")
+        OrderProduct.objects.create(order=Order.objects.create(), product=ordered, quantity=1)
+
+        deleted = delete_products(Product.objects.filter(category=self.category), pause=0)
+
+        self.assertEqual(deleted, 1)
+        self.assertTrue(Product.objects.filter(pk=ordered.pk).exists())
+        self.assertFalse(Product.objects.filter(pk=unordered.pk).exists())
+        remove_from_index.assert_called_once_with("products", [unordered.pk])
+
+    @patch("core.vendors.remove_from_index")
+    def test_delete_belongings_deactivates_ordered_products(self, remove_from_index):
+        ordered = self.create_product("Chunked ordered")
+        unordered = self.create_product("Chunked unordered")
+        OrderProduct.objects.create(order=Order.objects.create(), product=ordered, quantity=1)
+
+        AbstractVendor(vendor_name=self.vendor.name).delete_belongings()
+
+        ordered.refresh_from_db()
+        self.assertFalse(ordered.is_active)
+        self.assertFalse(Product.objects.filter(pk=unordered.pk).exists())
+        self.assertFalse(Stock.objects.filter(vendor=self.vendor).exists())
+        remove_from_index.assert_any_call("products", [unordered.pk])
+        remove_from_index.assert_any_call("products", [ordered.pk])
+
+
+class SyntheticVendorTests(TestCase):
+    def test_generate_feed_is_reproducible_and_bounded(self):
+        options = {"products": 20, "attributes": 4, "min_price": 5.0, "max_price": 50.0, "seed": 7, "prefix": "feed"}
+        feed = generate_feed(**options)
+
+        self.assertEqual(feed, generate_feed(**options))
+        self.assertEqual(len(feed), 20)
+        self.assertEqual(len({item["sku"] for item in feed}), 20)
+        for item in feed:
+            self.assertTrue(5.0 <= item["price"] <= 50.0)
+            self.assertEqual(len(item["attributes"]), 4)
+
+    def test_generate_feed_keeps_one_value_type_per_attribute(self):
+        feed = generate_feed(products=30, attributes=4, seed=1, prefix="typed")
+
+        for key in feed[0]["attributes"]:
+            self.assertEqual(len({type(item["attributes"][key]) for item in feed}), 1)
+
+    def test_generate_feed_rejects_unknown_distribution(self):
+        with self.assertRaises(ValueError):
+            generate_feed(price_distribution="pareto")
+
+    @patch("core.vendors.remove_from_index")
+    @patch("core.vendors.process_query", return_value={})
+    def test_update_stock_ingests_feed_and_drops_missing_products(self, process_query, remove_from_index):
+        Vendor.objects.create(name="Synthetic")
+        feed = generate_feed(products=3, attributes=2, categories=2, brands=2, seed=3, prefix="sync")
+
+        vendor = SyntheticVendor(feed)
+        vendor.update_stock()
+
+        self.assertEqual(Product.objects.filter(partnumber__startswith="sync-pn-", is_active=True).count(), 3)
+        self.assertEqual(Stock.objects.filter(vendor__name="Synthetic").count(), 3)
+        self.assertEqual(set(vendor.timings), {"db_writes", "es_resolution", "attributes"})
+
+        SyntheticVendor(feed[:2]).update_stock()
+
+        self.assertEqual(
+            set(Product.objects.filter(partnumber__startswith="sync-pn-").values_list("partnumber", flat=True)),
+            {feed[0]["partnumber"], feed[1]["partnumber"]},
+        )
+
+    @patch("core.vendors.remove_from_index")
+    @patch("core.vendors.process_query", return_value={})
+    def test_benchmark_vendor_sync_reports_and_cleans_up(self, process_query, remove_from_index):
+        with TemporaryDirectory() as directory:
+            output = Path(directory) / "report.json"
+            call_command(
+                "benchmark_vendor_sync",
+                products=3,
+                attributes=1,
+                runs=2,
+                prefix="bench-test",
+                output=str(output),
+                stdout=StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+        self.assertEqual(report["parameters"]["products"], 3)
+        self.assertEqual(len(report["runs"]), 2)
+        self.assertGreater(report["runs"][0]["queries_total"], 0)
+        self.assertFalse(Vendor.objects.filter(name="bench-test synthetic vendor").exists())
+        self.assertFalse(Product.objects.filter(partnumber__startswith="bench-test-pn-").exists())
+
+
+SEARCH_RESPONSE = {
+    "results": {"products": [], "categories": [], "brands": [], "posts": []},
+    "tier": "prefix",
+    "timings": {},
+}
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        # Entries cached by earlier runs belong to older generations
+        bump_index_generation()
+
+    @patch("core.elasticsearch._guarded_search", return_value=SEARCH_RESPONSE)
+    def test_equivalent_queries_share_a_cache_entry(self, guarded_search):
+        self.assertEqual(search_catalog("  Cached   PHONE "), SEARCH_RESPONSE)
+        self.assertEqual(search_catalog("cached phone"), SEARCH_RESPONSE)
+
+        guarded_search.assert_called_once_with("cached phone")
+
+    @patch("core.elasticsearch._guarded_search", return_value=SEARCH_RESPONSE)
+    def test_new_index_generation_invalidates_cached_results(self, guarded_search):
+        search_catalog("generation phone")
+        bump_index_generation()
+        search_catalog("generation phone")
+
+        self.assertEqual(guarded_search.call_count, 2)
+
+    def test_blank_query_is_rejected(self):
+        with self.assertRaises(ValueError):
+            search_catalog("   ")
+
+    @patch("core.elasticsearch._guarded_search", return_value=SEARCH_RESPONSE)
+    def test_owner_releases_the_lock(self, guarded_search):
+        search_catalog("owned phone")
+
+        self.assertIsNone(cache.get(f"{_search_cache_key('owned phone')}:lock"))
+
+    @patch("core.elasticsearch._guarded_search", side_effect=RuntimeError)
+    def test_lock_is_released_when_the_search_fails(self, guarded_search):
+        with self.assertRaises(RuntimeError):
+            search_catalog("failing phone")
+
+        self.assertIsNone(cache.get(f"{_search_cache_key('failing phone')}:lock"))
+
+    @override_settings(ELASTICSEARCH_SEARCH_CACHE_LOCK_TIMEOUT=1)
+    @patch("core.elasticsearch._guarded_search", return_value=SEARCH_RESPONSE)
+    def test_waiter_that_gives_up_keeps_the_owners_lock(self, guarded_search):
+        lock_key = f"{_search_cache_key('contended phone')}:lock"
+        cache.set(lock_key, 1, timeout=60)
+        self.addCleanup(cache.delete, lock_key)
+
+        self.assertEqual(search_catalog("contended phone"), SEARCH_RESPONSE)
+
+        guarded_search.assert_called_once_with("contended phone")
+        self.assertEqual(cache.get(lock_key), 1)
+
+    def test_database_answers_expire_with_the_breaker_cooldown(self):
+        self.assertEqual(
+            _search_cache_timeout({**SEARCH_RESPONSE, "tier": "database"}), settings.ELASTICSEARCH_BREAKER_COOLDOWN
+        )
+        self.assertEqual(_search_cache_timeout(SEARCH_RESPONSE), settings.ELASTICSEARCH_SEARCH_CACHE_TIMEOUT)
+
+
+class IndexSyncTests(TestCase):
+    def make_document(self, alias):
+        document = MagicMock()
+        document._index._name = alias
+        document._index._settings = {"number_of_replicas": 2}
+        self.addCleanup(cache.delete, _high_water_mark_key(alias))
+        return document
+
+    @patch("core.elasticsearch.bulk_index", return_value={"index": "", "indexed": 3})
+    @patch("core.elasticsearch.connections")
+    def test_rebuild_swaps_the_alias_and_drops_old_indices(self, connections, bulk_index):
+        document = self.make_document("rebuild-test")
+        es = connections.get_connection.return_value
+        es.indices.exists_alias.return_value = True
+        es.indices.get_alias.return_value = {"rebuild-test-old": {}}
+
+        stats = rebuild_index(document)
+
+        new_name = document._index.clone.call_args.kwargs["name"]
+        self.assertTrue(new_name.startswith("rebuild-test-"))
+        self.assertEqual(bulk_index.call_args.kwargs["index"], new_name)
+        es.indices.update_aliases.assert_called_once_with(
+            actions=[
+                {"add": {"alias": "rebuild-test", "index": new_name}},
+                {"remove": {"alias": "rebuild-test", "indices": ["rebuild-test-old"]}},
+            ]
+        )
+        es.indices.delete.assert_called_once_with(index="rebuild-test-old", ignore_unavailable=True)
+        self.assertIsNotNone(cache.get(_high_water_mark_key("rebuild-test")))
+        self.assertEqual(stats["mode"], "full")
+
+    @patch("core.elasticsearch.bulk_index", return_value={"index": "", "indexed": 0})
+    @patch("core.elasticsearch.connections")
+    def test_rebuild_replaces_a_concrete_index_holding_the_alias_name(self, connections, bulk_index):
+        document = self.make_document("concrete-test")
+        es = connections.get_connection.return_value
+        es.indices.exists_alias.return_value = False
+        es.indices.exists.return_value = True
+
+        rebuild_index(document)
+
+        actions = es.indices.update_aliases.call_args.kwargs["actions"]
+        self.assertEqual(actions[1], {"remove_index": {"index": "concrete-test"}})
+
+    @patch("core.elasticsearch.bulk_index", side_effect=RuntimeError)
+    @patch("core.elasticsearch.connections")
+    def test_failed_rebuild_keeps_the_alias(self, connections, bulk_index):
+        document = self.make_document("failed-test")
+        es = connections.get_connection.return_value
+
+        with self.assertRaises(RuntimeError):
+            rebuild_index(document)
+
+        new_name = document._index.clone.call_args.kwargs["name"]
+        es.indices.delete.assert_called_once_with(index=new_name, ignore_unavailable=True)
+        es.indices.update_aliases.assert_not_called()
+        self.assertIsNone(cache.get(_high_water_mark_key("failed-test")))
+
+    def test_update_needs_a_high_water_mark(self):
+        self.assertIsNone(update_index(self.make_document("unbuilt-test")))
+
+    @patch("core.elasticsearch.remove_from_index", return_value=1)
+    @patch("core.elasticsearch.bulk_index", return_value={"index": "products", "indexed": 1})
+    @patch("core.elasticsearch.connections")
+    def test_update_indexes_changed_rows_and_deletes_deactivated_ones(self, connections, bulk_index, remove_from_index):
+        self.addCleanup(cache.delete, _high_water_mark_key("products"))
+        mark = timezone.now() - timedelta(minutes=5)
+        cache.set(_high_water_mark_key("products"), mark, timeout=None)
+        category = Category.objects.create(name="Incremental")
+        active = Product.objects.create(category=category, name="Incremental active")
+        inactive = Product.objects.create(category=category, name="Incremental inactive", is_active=False)
+
+        stats = update_index(ProductDocument)
+
+        self.assertEqual(list(bulk_index.call_args.args[1].values_list("pk", flat=True)), [active.pk])
+        remove_from_index.assert_called_once_with("products", [inactive.pk])
+        self.assertEqual(stats["mode"], "incremental")
+        self.assertEqual(stats["deleted"], 1)
+        self.assertGreater(cache.get(_high_water_mark_key("products")), mark)
+
+    def test_populate_rejects_unknown_modes(self):
+        with self.assertRaises(ValueError):
+            populate_index("partial")
+
+    @patch("core.elasticsearch.bump_index_generation")
+    @patch("core.elasticsearch.rebuild_index", return_value={"indexed": 1, "deleted": 0})
+    @patch("core.elasticsearch.update_index", return_value=None)
+    def test_incremental_populate_rebuilds_unbuilt_indices(self, update_index, rebuild_index, bump_index_generation):
+        results = populate_index("incremental")
+
+        self.assertEqual(rebuild_index.call_count, update_index.call_count)
+        self.assertEqual(len(results), update_index.call_count)
+        bump_index_generation.assert_called_once_with()
+
+    @patch("core.elasticsearch.bump_index_generation")
+    @patch("core.elasticsearch.update_index", return_value={"indexed": 0, "deleted": 0})
+    def test_unchanged_populate_keeps_the_generation(self, update_index, bump_index_generation):
+        populate_index("incremental")
+
+        bump_index_generation.assert_not_called()
+
+
+class ProductChangeTrackingTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Change tracking")
+        self.vendor = Vendor.objects.create(name="Change tracking vendor")
+        self.group = AttributeGroup.objects.create(name="Change tracking group")
+        self.attribute = Attribute.objects.create(group=self.group, name="Change tracking", value_type="string")
+        self.product = Product.objects.create(category=self.category, name="Tracked")
+        self.untouched = Product.objects.create(category=self.category, name="Untouched")
+        self.since = timezone.now()
+
+    def changed(self):
+        return set(ProductDocument().get_changed_queryset(self.since).values_list("pk", flat=True))
+
+    def test_stock_change_marks_the_product_changed(self):
+        Stock.objects.create(vendor=self.vendor, product=self.product, sku="tracked")
+
+        self.assertEqual(self.changed(), {self.product.pk})
+
+    def test_attribute_change_marks_the_product_changed(self):
+        AttributeValue.objects.create(attribute=self.attribute, product=self.product, value="tracked")
+
+        self.assertEqual(self.changed(), {self.product.pk})
+
+    def test_tag_change_marks_its_products_changed(self):
+        tag = ProductTag.objects.create(tag_name="tracked", name="Tracked tag")
+        Product.tags.through.objects.create(product=self.product, producttag=tag)
+
+        self.assertEqual(self.changed(), {self.product.pk})
+
+    def test_related_rows_resolve_to_their_product(self):
+        document = ProductDocument()
+        stock = Stock.objects.create(vendor=self.vendor, product=self.product, sku="tracked")
+
+        self.assertEqual(document.get_instances_from_related(stock), self.product)
+        self.assertIsNone(document.get_instances_from_related(Stock(vendor=self.vendor, sku="orphan")))
+
+
+def acknowledge(es, actions, **kwargs):
+    return [(True, action) for action in actions]
+
+
+class RowIndexingTests(TestCase):
+    FIELDS = (
+        "name",
+        "slug",
+        "price",
+        "quantity",
+        "stock_prices",
+        "stock_quantities",
+        "has_stocks",
+        "category",
+        "category_ancestors",
+        "brand",
+        "tags",
+        "attributes",
+    )
+
+    def setUp(self):
+        parent = Category.objects.create(name="Row parent")
+        self.category = Category.objects.create(name="Row child", parent=parent)
+        self.brand = Brand.objects.create(name="Row brand")
+        self.vendor = Vendor.objects.create(name="Row vendor")
+        group = AttributeGroup.objects.create(name="Row group")
+        self.attribute = Attribute.objects.create(group=group, name="Row weight", value_type="float")
+        self.tag = ProductTag.objects.create(tag_name="row", name="Row tag")
+
+    def create_product(self, name):
+        product = Product.objects.create(category=self.category, brand=self.brand, name=name)
+        Stock.objects.create(vendor=self.vendor, product=product, price=20.0, quantity=2, sku=f"{name} a")
+        Stock.objects.create(vendor=self.vendor, product=product, price=15.5, quantity=3, sku=f"{name} b")
+        AttributeValue.objects.create(attribute=self.attribute, product=product, value="1.5")
+        product.tags.add(self.tag)
+        return product
+
+    def test_row_documents_match_instance_documents(self):
+        product = self.create_product("Row parity")
+        document = ProductDocument()
+        queryset = document.get_queryset().filter(pk=product.pk)
+
+        row_source = next(document.get_row_actions(queryset))["_source"]
+        instance_source = ProductDocument().prepare(queryset.get())
+
+        for field in self.FIELDS:
+            self.assertEqual(row_source[field], instance_source[field], field)
+        self.assertEqual(row_source["price"], 15.5)
+        self.assertEqual(row_source["quantity"], 5)
+        self.assertEqual(len(row_source["category_ancestors"]), 2)
+        self.assertEqual(row_source["attributes"][0]["value_number"], 1.5)
+
+    def test_row_actions_use_a_constant_number_of_queries(self):
+        document = ProductDocument()
+        self.create_product("Row constant 0")
+
+        with CaptureQueriesContext(connection) as single:
+            list(document.get_row_actions(document.get_queryset()))
+
+        for index in range(1, 5):
+            self.create_product(f"Row constant {index}")
+
+        with CaptureQueriesContext(connection) as several:
+            list(ProductDocument().get_row_actions(ProductDocument().get_queryset()))
+
+        self.assertEqual(len(several), len(single))
+
+    @patch("core.elasticsearch.streaming_bulk")
+    @patch("core.elasticsearch.connections")
+    def test_bulk_index_streams_row_actions(self, connections, streaming_bulk):
+        products = [self.create_product(f"Row bulk {index}") for index in range(2)]
+        document = ProductDocument()
+
+        sent = []
+
+        def send(es, actions, **kwargs):
+            sent.extend(actions)
+            return acknowledge(es, sent)
+
+        streaming_bulk.side_effect = send
+
+        stats = bulk_index(document, document.get_queryset(), index="products-test", thread_count=1)
+
+        self.assertEqual(stats["index"], "products-test")
+        self.assertEqual(stats["indexed"], 2)
+        self.assertEqual({action["_id"] for action in sent}, {str(product.pk) for product in products})
+        self.assertEqual({action["_index"] for action in sent}, {"products-test"})
+
+    @patch("core.elasticsearch.parallel_bulk", side_effect=acknowledge)
+    @patch("core.elasticsearch.connections")
+    def test_parallel_bulk_index_gets_materialized_windows(self, connections, parallel_bulk):
+        products = [self.create_product(f"Row parallel {index}") for index in range(3)]
+        document = ProductDocument()
+
+        stats = bulk_index(document, document.get_queryset(), index="products-test", chunk_size=1, thread_count=2)
+
+        self.assertEqual(stats["indexed"], 3)
+        self.assertEqual(parallel_bulk.call_count, 2)
+        windows = [call.args[1] for call in parallel_bulk.call_args_list]
+        self.assertTrue(all(isinstance(window, list) for window in windows))
+        self.assertEqual(
+            {action["_id"] for window in windows for action in window}, {str(product.pk) for product in products}
+        )
+
+    @patch("core.elasticsearch.streaming_bulk", side_effect=acknowledge)
+    @patch("core.elasticsearch.connections")
+    def test_bulk_index_retargets_instance_actions(self, connections, streaming_bulk):
+        brand_document = BrandDocument()
+
+        stats = bulk_index(brand_document, Brand.objects.filter(pk=self.brand.pk), index="brands-test", thread_count=1)
+
+        self.assertEqual(stats["indexed"], 1)
+
+
+class CoalescedIndexingTests(TestCase):
+    def setUp(self):
+        self.redis = get_redis_connection("default")
+        self.redis.delete(DIRTY_SET_KEY)
+        self.addCleanup(self.redis.delete, DIRTY_SET_KEY)
+        self.category = Category.objects.create(name="Coalesced")
+        self.product = Product.objects.create(category=self.category, name="Coalesced product")
+
+    def dirty(self) -> set[str]:
+        return {member.decode() for member in self.redis.smembers(DIRTY_SET_KEY)}
+
+    @staticmethod
+    def member(instance) -> str:
+        return f"{instance._meta.label_lower}:{instance.pk}"
+
+    def test_repeated_saves_collapse_into_one_entry(self):
+        self.redis.delete(DIRTY_SET_KEY)
+
+        for _ in range(3):
+            self.product.save()
+
+        self.assertEqual(self.dirty(), {self.member(self.product)})
+
+    def test_suspended_indexing_pushes_once_on_exit(self):
+        self.redis.delete(DIRTY_SET_KEY)
+
+        with suspended_indexing():
+            other = Product.objects.create(category=self.category, name="Coalesced other")
+            self.product.save()
+            self.assertEqual(self.dirty(), set())
+
+        self.assertEqual(self.dirty(), {self.member(self.product), self.member(other)})
+
+    def test_stock_change_marks_its_product(self):
+        vendor = Vendor.objects.create(name="Coalesced vendor")
+        self.redis.delete(DIRTY_SET_KEY)
+
+        Stock.objects.create(vendor=vendor, product=self.product, sku="coalesced")
+
+        self.assertIn(self.member(self.product), self.dirty())
+
+    def test_m2m_change_marks_the_indexed_side(self):
+        tag = ProductTag.objects.create(tag_name="coalesced", name="Coalesced tag")
+        wishlist = Wishlist.objects.create()
+        self.redis.delete(DIRTY_SET_KEY)
+
+        self.product.tags.add(tag)
+        self.assertEqual(self.dirty(), {self.member(self.product)})
+
+        self.redis.delete(DIRTY_SET_KEY)
+        wishlist.products.add(self.product)
+        self.assertEqual(self.dirty(), {self.member(self.product)})
+
+        self.redis.delete(DIRTY_SET_KEY)
+        wishlist.products.clear()
+        self.assertEqual(self.dirty(), {self.member(self.product)})
+
+    def test_m2m_change_between_indexed_models_marks_both_sides(self):
+        brand = Brand.objects.create(name="Coalesced brand")
+        self.redis.delete(DIRTY_SET_KEY)
+
+        brand.categories.add(self.category)
+
+        self.assertEqual(self.dirty(), {self.member(brand), self.member(self.category)})
+
+    @patch("core.elasticsearch.coalescing.remove_from_index")
+    @patch("core.elasticsearch.coalescing.bulk_index")
+    def test_flush_indexes_live_rows_and_removes_the_rest(self, bulk_index, remove_from_index):
+        inactive = Product.objects.create(category=self.category, name="Coalesced inactive", is_active=False)
+        deleted = Product.objects.create(category=self.category, name="Coalesced deleted")
+        deleted_pk = deleted.pk
+        deleted.delete()
+        self.redis.delete(DIRTY_SET_KEY)
+        mark_dirty_pks(Product, [self.product.pk, inactive.pk, deleted_pk])
+
+        self.assertEqual(flush_dirty(), 3)
+
+        document, queryset = bulk_index.call_args.args
+        self.assertIsInstance(document, ProductDocument)
+        self.assertEqual(list(queryset.values_list("pk", flat=True)), [self.product.pk])
+        remove_from_index.assert_called_once_with("products", {str(inactive.pk), str(deleted_pk)})
+        self.assertEqual(self.dirty(), set())
+
+    @patch("core.elasticsearch.coalescing.bulk_index", side_effect=RuntimeError)
+    def test_failed_batch_returns_to_the_dirty_set(self, bulk_index):
+        self.redis.delete(DIRTY_SET_KEY)
+        mark_dirty(self.product)
+
+        with self.assertRaises(RuntimeError):
+            flush_dirty()
+
+        self.assertEqual(self.dirty(), {self.member(self.product)})
+        self.assertFalse(self.redis.exists(FLUSH_LOCK_KEY))
+
+
+class ListingQueryTests(TestCase):
+    def test_name_matches_a_substring_of_the_active_language_name(self):
+        query = ListingQuery({"name": "a*b?"})
+
+        language = search_language().replace("-", "_")
+        self.assertEqual(
+            query.filters[0].to_dict(),
+            {"wildcard": {f"name_{language}.raw": {"value": "*a\\*b\\?*", "case_insensitive": True}}},
+        )
+
+    def test_price_and_quantity_match_any_stock(self):
+        query = ListingQuery({"min_price": "10", "max_price": "20", "quantity": "0"})
+
+        self.assertEqual(
+            [condition.to_dict() for condition in query.filters],
+            [
+                {"range": {"stock_prices": {"gte": 10.0}}},
+                {"range": {"stock_prices": {"lte": 20.0}}},
+                {"range": {"stock_quantities": {"gt": 0.0}}},
+            ],
+        )
+
+    def test_attribute_ranges_use_the_numeric_value(self):
+        query = ListingQuery({"attributes": "weight=gte-5"})
+
+        self.assertEqual(
+            query.filters[0].to_dict(),
+            {
+                "nested": {
+                    "path": "attributes",
+                    "query": {
+                        "bool": {
+                            "must": [
+                                {"term": {"attributes.name": "weight"}},
+                                {"range": {"attributes.value_number": {"gte": 5.0}}},
+                            ]
+                        }
+                    },
+                }
+            },
+        )
+
+    def test_ordering_keeps_uuid_as_tie_breaker(self):
+        self.assertEqual(ListingQuery({"order_by": "-price"}).sort, [{"price": {"order": "desc"}}, "uuid"])
+
+    def test_ignored_and_empty_parameters_add_no_filters(self):
+        self.assertEqual(ListingQuery({"page": "2", "page_size": "10", "name": ""}).filters, [])
+
+    def test_unsupported_parameters_are_rejected(self):
+        for params in (
+            {"unknown": "1"},
+            {"is_active": "false"},
+            {"attributes": "weight=regex-5"},
+            {"order_by": "popularity"},
+        ):
+            with self.subTest(params=params), self.assertRaises(UnsupportedListingQueryError):
+                ListingQuery(params)
+
+    def test_windows_past_max_result_window_are_rejected(self):
+        with self.assertRaises(UnsupportedListingQueryError):
+            ListingQuery({}).build(settings.ELASTICSEARCH_MAX_RESULT_WINDOW - 5, 10)
+
+
+class FakeHits(list):
+    def __init__(self, ids, total):
+        super().__init__(SimpleNamespace(meta=SimpleNamespace(id=str(pk))) for pk in ids)
+        self.total = SimpleNamespace(value=total)
+
+
+class ProductListingTests(TestCase):
+    def setUp(self):
+        search_breaker.record_success()
+        category = Category.objects.create(name="Listing")
+        self.products = [Product.objects.create(category=category, name=f"Listing {index}") for index in range(3)]
+        self.query = MagicMock()
+        self.query.execute.side_effect = lambda start, size, with_aggregations=True: SimpleNamespace(
+            hits=FakeHits([product.pk for product in self.products[start : start + size]], len(self.products))
+        )
+
+    def test_window_is_fetched_once_and_hydrated_in_order(self):
+        listing = ProductListing(self.query, Product.objects.all(), 0, 2).execute()
+
+        self.assertEqual(listing.count(), 3)
+        self.assertEqual(listing[0:2], self.products[:2])
+        self.query.execute.assert_called_once_with(0, 2)
+
+    def test_slices_outside_the_window_skip_aggregations(self):
+        listing = ProductListing(self.query, Product.objects.all(), 0, 2).execute()
+
+        self.assertEqual(listing[2:3], self.products[2:])
+        self.query.execute.assert_called_with(2, 1, with_aggregations=False)
+
+    @override_settings(PRODUCT_LISTING_BACKEND="database")
+    def test_database_backend_skips_the_index(self):
+        self.assertIsNone(get_product_listing({}, Product.objects.all()))
+
+    @override_settings(PRODUCT_LISTING_BACKEND="elasticsearch")
+    def test_unsupported_parameters_fall_back_to_the_database(self):
+        self.assertIsNone(get_product_listing({"unknown": "1"}, Product.objects.all()))
+
+    @override_settings(PRODUCT_LISTING_BACKEND="elasticsearch")
+    @patch("core.elasticsearch.listing.record_search_error")
+    @patch("core.elasticsearch.listing.ProductListing.execute", side_effect=ElasticsearchConnectionError("down"))
+    def test_search_errors_fall_back_to_the_database(self, execute, record_search_error):
+        self.assertIsNone(get_product_listing({}, Product.objects.all()))
+
+        record_search_error.assert_called_once_with(execute.side_effect)
+
+
+def search_response(*names, index="products-20260101000000000000"):
+    return SimpleNamespace(
+        hits=[
+            SimpleNamespace(uuid=f"uuid-{name}", name=name, slug=name, meta=SimpleNamespace(index=index, id=name))
+            for name in names
+        ]
+    )
+
+
+@override_settings(ELASTICSEARCH_SEARCH_MIN_HITS=2)
+@patch("core.elasticsearch.search_client")
+@patch("core.elasticsearch.Search")
+class TieredSearchTests(TestCase):
+    def execute(self, search):
+        return search.return_value.query.return_value.extra.return_value.execute
+
+    def test_cheap_tier_answers_when_it_finds_enough(self, search, search_client):
+        self.execute(search).side_effect = [search_response("phone", "phone case")]
+
+        response = _search("phone")
+
+        self.assertEqual(response["tier"], "prefix")
+        self.assertEqual(list(response["timings"]), ["prefix"])
+        self.assertEqual([hit["name"] for hit in response["results"]["products"]], ["phone", "phone case"])
+
+    def test_lenient_tiers_run_only_when_needed(self, search, search_client):
+        self.execute(search).side_effect = [
+            search_response(),
+            search_response("phone"),
+            search_response("fone", "phone"),
+        ]
+
+        response = _search("fone")
+
+        self.assertEqual(response["tier"], "phonetic")
+        self.assertEqual(list(response["timings"]), ["prefix", "fuzzy", "phonetic"])
+        self.assertEqual(len(response["results"]["products"]), 2)
+
+    def test_hits_of_versioned_indices_are_grouped_by_alias(self, search, search_client):
+        self.execute(search).side_effect = [search_response("audio", "video", index="categories-20260101000000000000")]
+
+        response = _search("audio")
+
+        self.assertEqual(len(response["results"]["categories"]), 2)
+        self.assertEqual(response["results"]["products"], [])
+
+
+SUGGESTIONS = {"products": [], "categories": [], "brands": [], "posts": []}
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        search_breaker.record_success()
+        bump_index_generation()
+        self.factory = APIRequestFactory()
+
+    def test_languages_without_text_suggest_the_fallback_text(self):
+        suggestions = build_suggestions({"en-gb": "Phone", "de-de": "Telefon"})
+
+        locales = {suggestion["input"][0]: suggestion["contexts"]["locale"] for suggestion in suggestions}
+        self.assertEqual(set(locales), {"Phone", "Telefon"})
+        self.assertEqual(locales["Telefon"], ["de-de"])
+        self.assertEqual(len(locales["Phone"]), len(settings.LANGUAGES) - 1)
+
+    @patch("core.elasticsearch._suggest", return_value=SUGGESTIONS)
+    def test_size_is_clamped_and_results_are_cached(self, suggest):
+        self.assertEqual(autocomplete("  pho ", 50), SUGGESTIONS)
+        self.assertEqual(autocomplete("PHO", 50), SUGGESTIONS)
+
+        suggest.assert_called_once_with("pho", 20, search_language())
+
+    @patch("core.elasticsearch._suggest", return_value=SUGGESTIONS)
+    def test_default_size(self, suggest):
+        autocomplete("default")
+
+        self.assertEqual(suggest.call_args.args[1], settings.ELASTICSEARCH_AUTOCOMPLETE_SIZE)
+
+    @patch("core.elasticsearch.fallback.trigram_search", return_value=SUGGESTIONS)
+    @patch("core.elasticsearch._suggest", side_effect=ElasticsearchConnectionError("down"))
+    def test_search_errors_are_answered_from_the_database(self, suggest, trigram_search):
+        self.assertEqual(autocomplete("down", 5), SUGGESTIONS)
+
+        trigram_search.assert_called_once_with("down", 5)
+
+    @patch("core.views.autocomplete", return_value=SUGGESTIONS)
+    def test_view_returns_suggestions(self, autocomplete_mock):
+        response = AutocompleteView.as_view()(self.factory.get("/search/autocomplete/", {"q": "pho", "size": "3"}))
+
+        self.assertEqual(response.status_code, 200)
+        autocomplete_mock.assert_called_once_with("pho", 3)
+
+    def test_view_rejects_invalid_requests(self):
+        for params in ({"q": "pho", "size": "-1"}, {"q": "pho", "size": "many"}, {"q": " "}):
+            with self.subTest(params=params):
+                response = AutocompleteView.as_view()(self.factory.get("/search/autocomplete/", params))
+                self.assertEqual(response.status_code, 400)
+
+
+class SearchLanguageTests(TestCase):
+    def test_language_falls_back_to_the_default(self):
+        self.assertEqual(search_language("DE-DE"), "de-de")
+        self.assertEqual(search_language("xx-xx"), settings.LANGUAGE_CODE)
+        with translation.override("de-de"):
+            self.assertEqual(search_language(), "de-de")
+
+    def test_translated_fields_are_searched_in_one_language(self):
+        fields = search_fields("de-de")
+
+        self.assertIn("name_de_de^4", fields)
+        self.assertIn("name_de_de.phonetic", fields)
+        self.assertIn("description_de_de.auto^2", fields)
+        self.assertFalse(any(field.startswith(("name_en_gb", "name_ru_ru")) for field in fields))
+        self.assertEqual(fields[-len(SMART_FIELDS) :], SMART_FIELDS)
+
+    def test_only_the_indexed_subfields_of_a_language_are_searched(self):
+        fields = search_fields("ja-jp")
+
+        self.assertIn("name_ja_jp.auto^4", fields)
+        self.assertNotIn("name_ja_jp.ngram^3", fields)
+        self.assertNotIn("name_ja_jp.phonetic", fields)
+
+    def test_listing_name_filter_follows_the_request_language(self):
+        with translation.override("de-de"):
+            query = ListingQuery({"name": "tisch", "order_by": "name"})
+
+        self.assertIn("name_de_de.raw", query.filters[0].to_dict()["wildcard"])
+        self.assertEqual(query.sort[0], {"name_de_de.raw": {"order": "asc"}})
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("tests", failure_threshold=2, window=30, cooldown=30)
+        self.addCleanup(cache.delete_many, [self.breaker._failures_key, self.breaker._open_until_key])
+        self.addCleanup(cache.delete, self.breaker._probe_key)
+
+    def test_breaker_opens_after_the_failure_threshold(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_breaker_lets_a_single_probe_through(self):
+        self.breaker.trip()
+
+        with patch("core.elasticsearch.breaker.time", return_value=time() + 60):
+            self.assertEqual(self.breaker.state, "half-open")
+            self.assertTrue(self.breaker.allow())
+            self.assertFalse(self.breaker.allow())
+
+            self.breaker.record_success()
+            self.assertEqual(self.breaker.state, "closed")
+
+    def test_failed_probe_opens_the_breaker_again(self):
+        self.breaker.trip()
+
+        with patch("core.elasticsearch.breaker.time", return_value=time() + 60):
+            self.breaker.allow()
+            self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, "open")
+
+
+@patch("core.elasticsearch.search_breaker")
+class SearchFallbackTests(TestCase):
+    def test_client_errors_do_not_count_against_the_breaker(self, breaker):
+        record_search_error(BadRequestError("bad query", meta=SimpleNamespace(status=400), body={}))
+
+        breaker.record_success.assert_called_once_with()
+        breaker.record_failure.assert_not_called()
+
+    def test_cluster_errors_count_against_the_breaker(self, breaker):
+        record_search_error(ElasticsearchConnectionError("down"))
+        record_search_error(ApiError("unavailable", meta=SimpleNamespace(status=503), body={}))
+
+        self.assertEqual(breaker.record_failure.call_count, 2)
+
+    @patch("core.elasticsearch._fallback_search", return_value={**SEARCH_RESPONSE, "tier": "database"})
+    @patch("core.elasticsearch._search", side_effect=ElasticsearchConnectionError("down"))
+    def test_failed_search_is_answered_from_the_database(self, search, fallback_search, breaker):
+        breaker.allow.return_value = True
+
+        self.assertEqual(_guarded_search("phone")["tier"], "database")
+        breaker.record_failure.assert_called_once_with()
+
+    @patch("core.elasticsearch._fallback_search", return_value={**SEARCH_RESPONSE, "tier": "database"})
+    @patch("core.elasticsearch._search")
+    def test_open_breaker_skips_elasticsearch(self, search, fallback_search, breaker):
+        breaker.allow.return_value = False
+
+        self.assertEqual(_guarded_search("phone")["tier"], "database")
+        search.assert_not_called()
+
+    def test_trigram_search_matches_misspelled_names(self, breaker):
+        category = Category.objects.create(name="Audio")
+        product = Product.objects.create(category=category, name="Wireless headphones")
+        Product.objects.create(category=category, name="Garden hose")
+
+        results = trigram_search("headphnes")
+
+        self.assertEqual([hit["uuid"] for hit in results["products"]], [str(product.uuid)])
+        self.assertEqual(results["posts"], [])
+
+
+class SearchAnalyticsTests(TestCase):
+    def setUp(self):
+        self.redis = get_redis_connection("default")
+        self.redis.delete(SEARCH_EVENTS_STREAM)
+        self.addCleanup(self.redis.delete, SEARCH_EVENTS_STREAM)
+
+    @staticmethod
+    def create_query(query, total_results, **kwargs):
+        return SearchQuery.objects.create(
+            query=query,
+            locale="en-gb",
+            source="rest",
+            total_results=total_results,
+            latency=1.0,
+            searched_at=kwargs.pop("searched_at", timezone.now()),
+            **kwargs,
+        )
+
+    @patch(
+        "core.elasticsearch.analytics.search_catalog",
+        return_value={**SEARCH_RESPONSE, "results": {**SEARCH_RESPONSE["results"], "products": [{}, {}]}},
+    )
+    def test_tracked_searches_are_flushed_in_batches(self, search_catalog):
+        for query in ("Phone", "phone  case", "laptop"):
+            tracked_search(query, source="graphql")
+
+        self.assertEqual(flush_search_events(batch_size=2), 3)
+
+        self.assertEqual(self.redis.xlen(SEARCH_EVENTS_STREAM), 0)
+        self.assertEqual(set(SearchQuery.objects.values_list("query", flat=True)), {"phone", "phone case", "laptop"})
+        recorded = SearchQuery.objects.get(query="laptop")
+        self.assertEqual(recorded.total_results, 2)
+        self.assertEqual(recorded.results["products"], 2)
+        self.assertEqual(recorded.source, "graphql")
+        self.assertEqual(recorded.tier, "prefix")
+
+    def test_concurrent_flush_leaves_the_events_alone(self):
+        record_search("phone", "en-gb", SEARCH_RESPONSE["results"], 1.0, "prefix", "rest")
+        cache.add(SEARCH_EVENTS_FLUSH_LOCK_KEY, 1)
+        self.addCleanup(cache.delete, SEARCH_EVENTS_FLUSH_LOCK_KEY)
+
+        self.assertEqual(flush_search_events(), 0)
+        self.assertEqual(self.redis.xlen(SEARCH_EVENTS_STREAM), 1)
+
+    @patch("core.elasticsearch.analytics.get_redis_connection")
+    def test_recording_failures_do_not_break_searches(self, get_redis_connection_mock):
+        get_redis_connection_mock.return_value.xadd.side_effect = RedisError("down")
+
+        record_search("phone", "en-gb", SEARCH_RESPONSE["results"], 1.0, "prefix", "rest")
+
+    def test_reports_rank_queries_by_frequency(self):
+        for _ in range(3):
+            self.create_query("phone", 4)
+        self.create_query("fone", 0)
+        self.create_query("fone", 0)
+        self.create_query("tablet", 1)
+        self.create_query("tablet", 0)
+        self.create_query("phone", 4, searched_at=timezone.now() - timedelta(days=30))
+
+        top = top_queries(days=7)
+        self.assertEqual([row["query"] for row in top], ["phone", "fone", "tablet"])
+        self.assertEqual(top[0]["searches"], 3)
+        self.assertEqual([row["query"] for row in zero_result_queries(days=7)], ["fone"])
+
+    @override_settings(SEARCH_ANALYTICS_RETENTION_DAYS=10)
+    def test_purge_keeps_recent_searches(self):
+        recent = self.create_query("recent", 1)
+        self.create_query("old", 1, searched_at=timezone.now() - timedelta(days=11))
+
+        self.assertEqual(purge_search_queries(), 1)
+        self.assertEqual(list(SearchQuery.objects.all()), [recent])
+
+
+def graphql_request(query: str, variables: dict | None = None, user=None, method: str = "post", **data):
+    """Build a request to the GraphQL endpoint, authenticated with a JWT when `user` is given."""
+    headers = {"HTTP_X_EVIBES_AUTH": f"Bearer {RefreshToken.for_user(user).access_token}"} if user else {}
+    if method == "get":
+        return RequestFactory().get("/graphql/", data, **headers)
+    body = {"query": query, "variables": variables or {}, **data}
+    return RequestFactory().post("/graphql/", json.dumps(body), content_type="application/json", **headers)
+
+
+def execute_graphql(query: str, variables: dict | None = None, user=None, request=None) -> dict:
+    request = request or graphql_request(query, variables, user)
+    return json.loads(CustomGraphQLView.as_view(schema=schema)(request).content)
+
+
+class CatalogFixtureMixin:
+    def create_catalog(self, count: int, prefix: str = "Catalog"):
+        category = Category.objects.create(name=f"{prefix} category")
+        brand = Brand.objects.create(name=f"{prefix} brand")
+        vendor = Vendor.objects.create(name=f"{prefix} vendor")
+        products = []
+        for index in range(count):
+            product = Product.objects.create(category=category, brand=brand, name=f"{prefix} {index}")
+            Stock.objects.create(vendor=vendor, product=product, price=10.0 + index, quantity=index, sku=f"{index}")
+            products.append(product)
+        return products
+
+
+PRODUCTS_QUERY = """
+query {
+  products {
+    edges {
+      node {
+        name
+        price
+        quantity
+        feedbacksCount
+        category { name }
+        brand { name }
+      }
+    }
+  }
+}
+"""
+
+
+@patch("core.views.response_cache_key", return_value=None)
+class DataLoaderTests(CatalogFixtureMixin, TestCase):
+    def test_first_load_batches_every_seen_object(self, response_cache_key):
+        products = self.create_catalog(3)
+        products.append(Product.objects.create(category=products[0].category, name="Without stocks"))
+        loaders = DataLoaderRegistry(RequestFactory().get("/graphql/"))
+        loaders.prime(products)
+
+        with self.assertNumQueries(1):
+            prices = [loaders.prices.load(product) for product in products]
+
+        self.assertEqual(prices, [10.0, 11.0, 12.0, 0.0])
+
+    def test_product_page_costs_the_same_whatever_its_size(self, response_cache_key):
+        self.create_catalog(2, "Small")
+        # Warm the caches a first request fills
+        execute_graphql(PRODUCTS_QUERY)
+        with CaptureQueriesContext(connection) as small:
+            result = execute_graphql(PRODUCTS_QUERY)
+        self.assertNotIn("errors", result)
+        self.assertEqual(len(result["data"]["products"]["edges"]), 2)
+
+        self.create_catalog(6, "Large")
+        with CaptureQueriesContext(connection) as large:
+            result = execute_graphql(PRODUCTS_QUERY)
+        self.assertEqual(len(result["data"]["products"]["edges"]), 8)
+
+        self.assertEqual(len(large), len(small))
+
+    def test_order_totals_follow_the_order_pricing_rules(self, response_cache_key):
+        user = User.objects.create_user(email="loaders@example.com", password="password", is_active=True)
+        products = self.create_catalog(2)
+        order = Order.objects.create(user=user, status="CREATED")
+        OrderProduct.objects.create(order=order, product=products[0], buy_price=10.0, quantity=2)
+        OrderProduct.objects.create(order=order, product=products[1], buy_price=5.0, quantity=1, status="FAILED")
+
+        result = execute_graphql(
+            "query($uuid: UUID) { orders(uuid: $uuid) { edges { node { totalPrice totalQuantity } } } }",
+            {"uuid": str(order.uuid)},
+            user=user,
+        )
+
+        node = result["data"]["orders"]["edges"][0]["node"]
+        self.assertEqual(node["totalPrice"], order.total_price)
+        self.assertEqual(node["totalPrice"], 20.0)
+        self.assertEqual(node["totalQuantity"], order.total_quantity)
+
+
+@patch("core.views.response_cache_key", return_value=None)
+class QuerysetOptimizerTests(CatalogFixtureMixin, TestCase):
+    def count_queries(self, query: str, user=None) -> tuple[int, dict]:
+        with CaptureQueriesContext(connection) as queries:
+            result = execute_graphql(query, user=user)
+        self.assertNotIn("errors", result)
+        return len(queries), result["data"]
+
+    def test_products_select_only_the_requested_columns(self, response_cache_key):
+        self.create_catalog(2)
+
+        with CaptureQueriesContext(connection) as queries:
+            execute_graphql("query { products { edges { node { name } } } }")
+
+        selects = [query["sql"] for query in queries if query["sql"].startswith('SELECT "core_product"."uuid"')]
+        self.assertTrue(selects)
+        self.assertIn('"core_product"."name', selects[-1])
+        self.assertNotIn('"core_product"."description', selects[-1])
+
+    def test_forward_relations_are_joined(self, response_cache_key):
+        self.create_catalog(3)
+        execute_graphql("query { products { edges { node { name } } } }")
+
+        plain, _data = self.count_queries("query { products { edges { node { name } } } }")
+        joined, data = self.count_queries(
+            "query { products { edges { node { name category { name } brand { name } } } } }"
+        )
+
+        self.assertEqual(joined, plain)
+        self.assertEqual(data["products"]["edges"][0]["node"]["brand"]["name"], "Catalog brand")
+
+    def test_prefetched_feedbacks_cost_the_same_whatever_the_page_size(self, response_cache_key):
+        query = "query { products { edges { node { name feedbacks { edges { node { comment rating } } } } } } }"
+
+        def add_feedbacks(products):
+            order = Order.objects.create()
+            for product in products:
+                order_product = OrderProduct.objects.create(order=order, product=product, buy_price=1.0)
+                Feedback.objects.create(order_product=order_product, comment=product.name, rating=5)
+
+        add_feedbacks(self.create_catalog(2, "Small"))
+        execute_graphql(query)
+        small, _data = self.count_queries(query)
+
+        add_feedbacks(self.create_catalog(5, "Large"))
+        large, data = self.count_queries(query)
+
+        self.assertEqual(large, small)
+        self.assertEqual(sorted(len(edge["node"]["feedbacks"]["edges"]) for edge in data["products"]["edges"]), [1] * 7)
+
+    def test_prefetched_brand_categories_hide_inactive_ones(self, response_cache_key):
+        brand = Brand.objects.create(name="Optimizer brand")
+        brand.categories.add(
+            Category.objects.create(name="Optimizer active"),
+            Category.objects.create(name="Optimizer inactive", is_active=False),
+        )
+
+        _count, data = self.count_queries("query { brands { edges { node { name categories { name } } } } }")
+
+        node = next(edge["node"] for edge in data["brands"]["edges"] if edge["node"]["name"] == "Optimizer brand")
+        self.assertEqual(node["categories"], [{"name": "Optimizer active"}])
+
+
+@patch("core.views.response_cache_key", return_value=None)
+class QueryCostTests(TestCase):
+    def cost(self, query: str, variables: dict | None = None) -> int:
+        document = parse(query)
+        return QueryCost(schema.graphql_schema, {}, variables).operation(document.definitions[0])
+
+    def test_connection_cost_is_multiplied_by_the_page_size(self, response_cache_key):
+        self.assertEqual(self.cost("query { products(first: 10) { edges { node { name category { name } } } } }"), 15)
+        self.assertEqual(
+            self.cost(
+                "query($first: Int) { products(first: $first) { edges { node { category { name } } } } }",
+                {"first": 4},
+            ),
+            9,
+        )
+
+    def test_unpaged_connections_cost_the_maximum_page(self, response_cache_key):
+        limit = settings.GRAPHENE["RELAY_CONNECTION_MAX_LIMIT"]
+
+        self.assertEqual(self.cost("query { products { edges { node { category { name } } } } }"), 5 + limit)
+
+    def test_introspection_is_free(self, response_cache_key):
+        self.assertEqual(self.cost("query { __schema { types { name fields { name } } } }"), 0)
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=10)
+    def test_expensive_queries_are_rejected_before_execution(self, response_cache_key):
+        result = execute_graphql("query { products(first: 10) { edges { node { category { name } } } } }")
+
+        self.assertIsNone(result.get("data"))
+        self.assertIn("exceeds the maximum of 10", result["errors"][0]["message"])
+        self.assertEqual(result["extensions"]["cost"]["requested"], 15)
+
+    @override_settings(GRAPHQL_IP_COST_BUDGET=20)
+    def test_budget_is_charged_per_client(self, response_cache_key):
+        ip = "203.0.113.41"
+        self.addCleanup(get_redis_connection("default").delete, f"graphql_cost:ip:{ip}")
+        query = "query { products(first: 10) { edges { node { category { name } } } } }"
+
+        def request():
+            graphql = graphql_request(query)
+            graphql.META["REMOTE_ADDR"] = ip
+            return execute_graphql(query, request=graphql)
+
+        first = request()
+        self.assertNotIn("errors", first)
+        self.assertEqual(first["extensions"]["cost"]["budget"]["remaining"], 5)
+
+        second = request()
+        self.assertIn("budget exhausted", second["errors"][0]["message"])
+
+    def test_deep_queries_are_rejected(self, response_cache_key):
+        nested = "children { " * 12 + "name" + " }" * 12
+        result = execute_graphql(f"query {{ categories {{ edges {{ node {{ {nested} }} }} }} }}")
+
+        self.assertIn("exceeds maximum operation depth", result["errors"][0]["message"])
+
+
+class PersistedQueryTests(TestCase):
+    QUERY = "query PersistedLanguages { languages { code } }"
+
+    def setUp(self):
+        self.hash = sha256(self.QUERY.encode()).hexdigest()
+        cache.delete(f"persisted_query:{self.hash}")
+        self.addCleanup(cache.delete, f"persisted_query:{self.hash}")
+
+    def extensions(self, query_hash: str | None = None, version: int = 1) -> dict:
+        return {"persistedQuery": {"version": version, "sha256Hash": query_hash or self.hash}}
+
+    def post(self, query: str = "", **extensions) -> dict:
+        body = {"extensions": self.extensions(**extensions)}
+        return execute_graphql(query, request=graphql_request(query, **body))
+
+    def get(self, query: str = "", **extensions):
+        params = {"extensions": json.dumps(self.extensions(**extensions))}
+        if query:
+            params["query"] = query
+        return CustomGraphQLView.as_view(schema=schema)(graphql_request(query, method="get", **params))
+
+    def test_hash_mismatch_is_rejected(self):
+        result = self.post(self.QUERY, query_hash=sha256(b"query { languages { name } }").hexdigest())
+
+        self.assertEqual(result["errors"][0]["message"], "provided sha does not match query")
+        self.assertEqual(result["errors"][0]["extensions"]["code"], "PERSISTED_QUERY_INVALID_HASH")
+        self.assertIsNone(cache.get(f"persisted_query:{self.hash}"))
+
+    def test_malformed_hash_and_unknown_versions_are_rejected(self):
+        self.assertEqual(
+            self.post(self.QUERY, query_hash="abc")["errors"][0]["extensions"]["code"], "PERSISTED_QUERY_INVALID_HASH"
+        )
+        self.assertEqual(
+            self.post(self.QUERY, version=2)["errors"][0]["extensions"]["code"], "PERSISTED_QUERY_NOT_SUPPORTED"
+        )
+
+    def test_unknown_hash_is_registered_by_the_retry(self):
+        self.assertEqual(self.post()["errors"][0]["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+        registered = self.post(self.QUERY)
+        answered = self.post()
+
+        self.assertNotIn("errors", registered)
+        self.assertEqual(answered["data"], registered["data"])
+
+    def test_anonymous_get_requests_are_publicly_cacheable(self):
+        self.post(self.QUERY)
+
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn(f"max-age={settings.GRAPHQL_PERSISTED_QUERY_MAX_AGE}", response["Cache-Control"])
+        self.assertIn("Accept-Language", response["Vary"])
+        self.assertIn("Authorization", response["Vary"])
+        self.assertNotIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        self.assertNotIn("budget", json.loads(response.content)["extensions"]["cost"])
+
+    def test_mutations_are_not_accepted_over_get(self):
+        mutation = "mutation PersistedMutation { deposit(amount: 1) { __typename } }"
+        cache.set(f"persisted_query:{sha256(mutation.encode()).hexdigest()}", mutation)
+
+        response = self.get(mutation, query_hash=sha256(mutation.encode()).hexdigest())
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_documents_are_parsed_and_validated_once(self):
+        document, errors = validated_document(schema, self.QUERY)
+
+        self.assertIs(validated_document(schema, self.QUERY)[0], document)
+        self.assertEqual(errors, ())
+        self.assertIsNone(validated_document(schema, "query {")[0])
+
+
+class ResponseCacheTests(CatalogFixtureMixin, TestCase):
+    QUERY = "query { products { edges { node { name } } } }"
+
+    def cache_key(self, query: str = QUERY, user=None):
+        request = RequestFactory().post("/graphql/")
+        request.user = user or AnonymousUser()
+        return response_cache_key(request, schema, query, {}, None)
+
+    def test_only_anonymous_catalog_queries_are_cached(self):
+        user = User.objects.create_user(email="cached@example.com", password="Str0ng!pass", is_active=True)
+
+        self.assertIsNotNone(self.cache_key())
+        self.assertIsNone(self.cache_key(user=user))
+        self.assertIsNone(self.cache_key("query { orders { edges { node { uuid } } } }"))
+        self.assertIsNone(self.cache_key("query { products { edges { node { name } } } orders { totalCount } }"))
+        self.assertIsNone(self.cache_key("mutation { deposit(amount: 1) { __typename } }"))
+        self.assertIsNone(self.cache_key("query {"))
+
+    def test_key_follows_catalog_versions_and_language(self):
+        key = self.cache_key()
+
+        self.assertEqual(self.cache_key(), key)
+        with translation.override("de-de"):
+            self.assertNotEqual(self.cache_key(), key)
+        bump_model_version("core.Brand")
+        self.assertNotEqual(self.cache_key(), key)
+
+    def test_catalog_relations_bump_versions_but_wishlists_do_not(self):
+        product = self.create_catalog(1)[0]
+        user = User.objects.create_user(email="wishlist@example.com", password="Str0ng!pass", is_active=True)
+        wishlist = user.user_related_wishlist
+        versions = model_versions(["core.Product"])
+
+        wishlist.products.add(product)
+        self.assertEqual(model_versions(["core.Product"]), versions)
+
+        product.tags.add(ProductTag.objects.create(tag_name="versioned", name="Versioned tag"))
+        self.assertNotEqual(model_versions(["core.Product"]), versions)
+
+    def test_cached_response_is_served_until_the_catalog_changes(self):
+        product = self.create_catalog(1)[0]
+        first = execute_graphql(self.QUERY)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(execute_graphql(self.QUERY), first)
+
+        product.name = "Renamed product"
+        product.save()
+        renamed = execute_graphql(self.QUERY)
+
+        self.assertEqual(renamed["data"]["products"]["edges"][0]["node"]["name"], "Renamed product")
+
+
+SPECIFICATIONS_QUERY = """
+query {
+  products {
+    edges {
+      node {
+        name
+        attributeGroups { edges { node { name attributes { name values { value } } } } }
+      }
+    }
+  }
+}
+"""
+
+
+@patch("core.views.response_cache_key", return_value=None)
+class SpecificationTests(CatalogFixtureMixin, TestCase):
+    def add_specifications(self, products, groups: int, prefix: str = "Spec"):
+        for group_index in range(groups):
+            group = AttributeGroup.objects.create(name=f"{prefix} group {group_index}")
+            for attribute_index in range(2):
+                attribute = Attribute.objects.create(
+                    group=group, name=f"{prefix} attribute {attribute_index}", value_type="string"
+                )
+                for product in products:
+                    AttributeValue.objects.create(attribute=attribute, product=product, value=product.name)
+
+    def retrieve(self, product):
+        request = APIRequestFactory().get(f"/products/{product.uuid}/")
+        with patch.object(ProductViewSet, "is_response_cacheable", return_value=False):
+            return ProductViewSet.as_view({"get": "retrieve"})(request, lookup=str(product.uuid))
+
+    def test_trees_are_narrowed_to_each_product(self, response_cache_key):
+        first, second = self.create_catalog(2)
+        self.add_specifications([first, second], 2)
+
+        with self.assertNumQueries(1):
+            specifications = product_specifications([first, second])
+
+        self.assertEqual([group.name for group in specifications[first.pk]], ["Spec group 0", "Spec group 1"])
+        for product in (first, second):
+            for group in specifications[product.pk]:
+                attributes = getattr(group, SPECIFICATION_ATTRIBUTES)
+                self.assertEqual(len(attributes), 2)
+                for attribute in attributes:
+                    values = getattr(attribute, SPECIFICATION_VALUES)
+                    self.assertEqual([value.value for value in values], [product.name])
+        self.assertIsNot(specifications[first.pk][0], specifications[second.pk][0])
+
+    def test_graphql_trees_cost_the_same_whatever_their_size(self, response_cache_key):
+        small = self.create_catalog(1, "Small")
+        self.add_specifications(small, 1, "Small")
+        execute_graphql(SPECIFICATIONS_QUERY)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            execute_graphql(SPECIFICATIONS_QUERY)
+        large = self.create_catalog(3, "Large")
+        self.add_specifications(large, 3, "Large")
+        with CaptureQueriesContext(connection) as large_queries:
+            result = execute_graphql(SPECIFICATIONS_QUERY)
+
+        self.assertNotIn("errors", result)
+        self.assertEqual(len(large_queries), len(small_queries))
+        nodes = {edge["node"]["name"]: edge["node"] for edge in result["data"]["products"]["edges"]}
+        groups = [edge["node"] for edge in nodes["Large 0"]["attributeGroups"]["edges"]]
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(groups[0]["attributes"][0]["values"], [{"value": "Large 0"}])
+
+    def test_rest_attribute_groups_come_from_the_prefetch(self, response_cache_key):
+        plain, small, large = self.create_catalog(3)
+        self.add_specifications([small], 1, "Small")
+        self.add_specifications([large], 3, "Large")
+        self.retrieve(plain)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.retrieve(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            response = self.retrieve(large)
+
+        self.assertEqual(len(large_queries), len(small_queries))
+        self.assertEqual(len(response.data["attributes"]), 6)
+        groups = response.data["attribute_groups"]
+        self.assertEqual([group["name"] for group in groups], ["Large group 0", "Large group 1", "Large group 2"])
+        self.assertEqual([value["value"] for value in groups[0]["attributes"][0]["values"]], ["Catalog 2"])
+
+
+class UpstreamCallTests(TestCase):
+    SUGGESTION = {"display_name": "Main street 1", "lat": "1.0", "lon": "2.0", "address": {"road": "Main street"}}
+
+    def autocomplete(self, **params):
+        request = APIRequestFactory().get("/addresses/autocomplete/", params)
+        return AddressViewSet.as_view({"get": "autocomplete"})(request)
+
+    @override_settings(SERVER_MODE="wsgi")
+    def test_wsgi_makes_the_blocking_call(self):
+        function, coroutine_function = MagicMock(return_value="sync"), AsyncMock(return_value="async")
+
+        self.assertEqual(call_upstream(function, coroutine_function, "query", limit=3), "sync")
+        function.assert_called_once_with("query", limit=3)
+        coroutine_function.assert_not_called()
+
+    @override_settings(SERVER_MODE="asgi")
+    def test_asgi_awaits_the_async_variant(self):
+        function, coroutine_function = MagicMock(return_value="sync"), AsyncMock(return_value="async")
+
+        self.assertEqual(call_upstream(function, coroutine_function, "query", limit=3), "async")
+        coroutine_function.assert_awaited_once_with("query", limit=3)
+        function.assert_not_called()
+
+    def test_event_loops_get_their_own_client(self):
+        async def clients():
+            return async_http_client(), async_http_client()
+
+        first, same = asyncio.run(clients())
+        other, _same = asyncio.run(clients())
+
+        self.assertIs(first, same)
+        self.assertIsNot(first, other)
+
+    @override_settings(SERVER_MODE="wsgi")
+    def test_address_autocomplete_is_open_to_anonymous_users(self):
+        with patch("core.viewsets.fetch_address_suggestions", return_value=[self.SUGGESTION]) as fetch:
+            response = self.autocomplete(q="Main street", limit=3)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [self.SUGGESTION])
+        fetch.assert_called_once_with(query="Main street", limit=3)
+
+    @override_settings(SERVER_MODE="wsgi")
+    def test_address_autocomplete_reports_upstream_and_input_errors(self):
+        with patch("core.viewsets.fetch_address_suggestions", side_effect=ConnectionError("unreachable")):
+            self.assertEqual(self.autocomplete(q="Main street").status_code, 502)
+        self.assertEqual(self.autocomplete(q="Main street", limit=50).status_code, 400)
+
+
+class ReferenceSerializerTests(CatalogFixtureMixin, TestCase):
+    def retrieve(self, product):
+        request = APIRequestFactory().get(f"/products/{product.uuid}/")
+        with patch.object(ProductViewSet, "is_response_cacheable", return_value=False):
+            return ProductViewSet.as_view({"get": "retrieve"})(request, lookup=str(product.uuid))
+
+    def nest_category(self, category, depth: int):
+        for level in range(depth):
+            category = Category.objects.create(name=f"{category.name} {level}", parent=category)
+        return category
+
+    def test_categories_are_embedded_without_their_tree(self):
+        product = self.create_catalog(1)[0]
+        self.nest_category(product.category, 3)
+
+        data = ProductSimpleSerializer(product).data
+
+        self.assertEqual(set(data["category"]), {"uuid", "name", "slug", "image"})
+        self.assertEqual(data["category"]["name"], "Catalog category")
+        self.assertIsNone(data["category"]["image"])
+
+    def test_attribute_groups_are_embedded_as_references(self):
+        group = AttributeGroup.objects.create(name="Reference group")
+        AttributeGroup.objects.create(name="Reference child", parent=group)
+        attribute = Attribute.objects.create(group=group, name="Reference attribute", value_type="string")
+
+        data = AttributeDetailSerializer(attribute).data
+
+        self.assertEqual(data["group"], {"uuid": str(group.uuid), "name": "Reference group"})
+        self.assertEqual(data["categories"], [])
+
+    def test_product_queries_do_not_depend_on_the_category_depth(self):
+        shallow, deep = self.create_catalog(2)
+        deep.category = self.nest_category(Category.objects.create(name="Deep"), 4)
+        deep.save()
+        self.retrieve(shallow)
+
+        with CaptureQueriesContext(connection) as shallow_queries:
+            self.retrieve(shallow)
+        with CaptureQueriesContext(connection) as deep_queries:
+            response = self.retrieve(deep)
+
+        self.assertEqual(len(deep_queries), len(shallow_queries))
+        self.assertEqual(response.data["category"]["name"], "Deep 0 1 2 3")
+
+
+class SparseFieldsetTests(CatalogFixtureMixin, TestCase):
+    def retrieve(self, product, **params):
+        request = APIRequestFactory().get(f"/products/{product.uuid}/", params)
+        with patch.object(ProductViewSet, "is_response_cacheable", return_value=False):
+            return ProductViewSet.as_view({"get": "retrieve"})(request, lookup=str(product.uuid))
+
+    def test_paths_are_parsed_into_a_tree(self):
+        self.assertEqual(
+            parse_field_paths("name, category.slug,feedbacksCount,category.name,brand."),
+            {"name": {}, "category": {"slug": {}, "name": {}}, "feedbacks_count": {}, "brand": {}},
+        )
+        self.assertIsNone(parse_field_paths(""))
+        self.assertIsNone(parse_field_paths(None))
+
+    def test_serializer_is_narrowed_and_expanded(self):
+        product = self.create_catalog(1)[0]
+        serializer = ProductDetailSerializer(product)
+
+        shape_serializer(
+            serializer, {"name": {}, "category": {"slug": {}}}, {"brand": {}}, {"brand": BrandDetailSerializer}
+        )
+
+        self.assertEqual(set(serializer.fields), {"name", "category", "brand"})
+        self.assertIsInstance(serializer.fields["brand"], BrandDetailSerializer)
+        self.assertEqual(serializer.data["category"], {"slug": product.category.slug})
+        self.assertIn("categories", serializer.data["brand"])
+
+    def test_queryset_is_pruned_to_the_rendered_fields(self):
+        serializer = shape_serializer(ProductDetailSerializer(), {"name": {}, "category": {"name": {}}})
+
+        queryset = sparse_queryset(ProductViewSet.queryset, serializer, ProductViewSet.field_sources)
+
+        self.assertEqual(queryset.query.select_related, {"category": {}})
+        self.assertEqual(queryset._prefetch_related_lookups, ())
+        deferred, only = queryset.query.deferred_loading
+        self.assertFalse(deferred)
+        self.assertIn("category", only)
+        self.assertNotIn("description", only)
+
+    def test_method_fields_keep_the_lookups_they_read(self):
+        serializer = shape_serializer(ProductDetailSerializer(), {"attribute_groups": {}})
+
+        queryset = sparse_queryset(ProductViewSet.queryset, serializer, ProductViewSet.field_sources)
+
+        self.assertEqual([lookup.prefetch_to for lookup in queryset._prefetch_related_lookups], ["attributes"])
+
+    def test_retrieve_renders_only_the_requested_fields(self):
+        product = self.create_catalog(1)[0]
+        self.retrieve(product)
+
+        with CaptureQueriesContext(connection) as full_queries:
+            self.retrieve(product)
+        with CaptureQueriesContext(connection) as sparse_queries:
+            response = self.retrieve(product, fields="name,category.slug")
+
+        self.assertEqual(response.data, {"name": product.name, "category": {"slug": product.category.slug}})
+        self.assertLess(len(sparse_queries), len(full_queries))
+
+    def test_listing_ignores_fieldset_parameters(self):
+        self.assertEqual(ListingQuery({"fields": "name", "expand": "brand"}).filters, [])
+
+
+class RendererTests(TestCase):
+    CASES = {
+        "nested": {"first_name": "Ada", "order_products": [{"product_uuid": "1", "is_active": True}], "_meta": None},
+        "numbers": {"small_price": 0.00001, "large_count": 2**70, "price": Decimal("19.99"), "rating": 4.5},
+        "values": {
+            "created_at": datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=UTC),
+            "day": date(2025, 1, 2),
+            "uuid": UUID("12345678-1234-5678-1234-567812345678"),
+            "label": gettext_lazy("Products"),
+            "tags": ("a", "b"),
+        },
+        "text": {"line_separator": "before\u2028after\u2029", "unicode_text": "Größe 💡", "empty": ""},
+        "list": [{"snake_case": 1}, [2, {"inner_key": 3}]],
+        "keys": {1: "integer key", "number_2_key": "digit"},
+    }
+
+    def test_output_equals_the_camel_case_renderer(self):
+        for name, data in self.CASES.items():
+            with self.subTest(name):
+                self.assertEqual(EvibesJSONRenderer().render(data), CamelCaseJSONRenderer().render(data))
+
+    def test_indented_output_equals_the_camel_case_renderer(self):
+        data = self.CASES["nested"]
+        media_type = "application/json; indent=2"
+
+        self.assertEqual(
+            EvibesJSONRenderer().render(data, media_type), CamelCaseJSONRenderer().render(data, media_type)
+        )
+
+    def test_serializer_data_is_rendered_like_the_camel_case_renderer(self):
+        product = Product.objects.create(
+            category=Category.objects.create(name="Rendered category"),
+            brand=Brand.objects.create(name="Rendered brand"),
+            name="Rendered product",
+        )
+        data = ProductDetailSerializer(product).data
+
+        self.assertEqual(EvibesJSONRenderer().render(data), CamelCaseJSONRenderer().render(data))
+
+    def test_keys_are_camelized_once(self):
+        camelize_key.cache_clear()
+        EvibesJSONRenderer().render([{"order_uuid": 1}, {"order_uuid": 2}])
+
+        self.assertEqual(camelize_key("order_uuid"), "orderUuid")
+        self.assertEqual(camelize_key.cache_info().misses, 1)
+        self.assertEqual(EvibesJSONRenderer().render(None), b"")
+
+
+class ConditionalGetTests(CatalogFixtureMixin, TestCase):
+    def retrieve(self, product, **headers):
+        request = APIRequestFactory().get(f"/products/{product.uuid}/", **headers)
+        with patch.object(ProductViewSet, "is_response_cacheable", return_value=False):
+            return ProductViewSet.as_view({"get": "retrieve"})(request, lookup=str(product.uuid))
+
+    def test_matching_etag_is_answered_with_304_without_queries(self):
+        product = self.create_catalog(1)[0]
+        response = self.retrieve(product)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            not_modified = self.retrieve(product, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        self.assertIn("Accept-Language", not_modified["Vary"])
+        self.assertIn("Authorization", not_modified["Vary"])
+
+    def test_catalog_changes_invalidate_the_etag(self):
+        product = self.create_catalog(1)[0]
+        etag = self.retrieve(product)["ETag"]
+
+        Stock.objects.filter(product=product).first().save()
+        response = self.retrieve(product, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_last_modified_is_honoured(self):
+        product = self.create_catalog(1)[0]
+        response = self.retrieve(product)
+
+        not_modified = self.retrieve(product, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_etag_varies_with_the_language(self):
+        product = self.create_catalog(1)[0]
+        etag = self.retrieve(product)["ETag"]
+
+        with translation.override("de-de"):
+            response = self.retrieve(product, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_languages_are_conditional(self):
+        response = SupportedLanguagesView.as_view()(RequestFactory().get("/app/languages/"))
+
+        not_modified = SupportedLanguagesView.as_view()(
+            RequestFactory().get("/app/languages/", HTTP_IF_NONE_MATCH=response["ETag"])
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_vendors_and_feedbacks_are_not_conditional(self):
+        admin = User.objects.create_superuser(email="conditional@example.com", password="Str0ng!pass")
+
+        for viewset in (VendorViewSet, FeedbackViewSet):
+            with self.subTest(viewset.__name__):
+                request = APIRequestFactory().get("/")
+                force_authenticate(request, user=admin)
+                response = viewset.as_view({"get": "list"})(request)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header("ETag"))
+
+
+class RestResponseCacheTests(CatalogFixtureMixin, TestCase):
+    def setUp(self):
+        self.product = self.create_catalog(1)[0]
+        self.key = f"rest_response:test:{self.product.uuid}"
+        self.addCleanup(cache.delete_many, [self.key, f"{self.key}:lock"])
+
+    def retrieve(self, user=None, **headers):
+        request = APIRequestFactory().get(f"/products/{self.product.uuid}/", **headers)
+        if user is not None:
+            force_authenticate(request, user=user)
+        return ProductViewSet.as_view({"get": "retrieve"})(request, lookup=str(self.product.uuid)).render()
+
+    def test_anonymous_reads_are_replayed_with_their_headers(self):
+        first = self.retrieve()
+
+        with self.assertNumQueries(0):
+            replayed = self.retrieve()
+
+        self.assertEqual(replayed.content, first.content)
+        self.assertEqual(replayed["Content-Type"], first["Content-Type"])
+        self.assertEqual(replayed["Vary"], first["Vary"])
+        self.assertEqual(replayed["ETag"], first["ETag"])
+
+    @override_settings(ALLOWED_HOSTS=["shop.example.com", "other.example.com"])
+    def test_responses_are_keyed_by_host(self):
+        self.retrieve(HTTP_HOST="shop.example.com")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.retrieve(HTTP_HOST="other.example.com")
+
+        self.assertTrue(queries)
+
+    def test_authenticated_reads_are_not_cached(self):
+        user = User.objects.create_user(email="uncached@example.com", password="Str0ng!pass", is_active=True)
+        self.retrieve(user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.retrieve(user=user)
+
+        self.assertTrue(queries)
+
+    @patch.object(ProductViewSet, "get_response_cache_key")
+    def test_stale_entry_is_served_while_another_request_renders(self, get_response_cache_key):
+        get_response_cache_key.return_value = self.key
+        stale = self.retrieve()
+        self.product.name = "Re-rendered product"
+        self.product.save()
+        cache.add(f"{self.key}:lock", 1)
+
+        with self.assertNumQueries(0):
+            response = self.retrieve()
+
+        self.assertEqual(response.content, stale.content)
+        self.assertFalse(response.has_header("ETag"))
+
+        cache.delete(f"{self.key}:lock")
+        self.assertIn(b"Re-rendered product", self.retrieve().content)
+
+    @patch.object(ProductViewSet, "get_response_cache_key")
+    def test_cold_miss_waits_for_the_request_rendering_it(self, get_response_cache_key):
+        get_response_cache_key.return_value = self.key
+        rendered = self.retrieve()
+        entry = cache.get(self.key)
+        cache.delete(self.key)
+        cache.add(f"{self.key}:lock", 1)
+
+        with (
+            patch("core.mixins.sleep", side_effect=lambda _seconds: cache.set(self.key, entry)),
+            self.assertNumQueries(0),
+        ):
+            response = self.retrieve()
+
+        self.assertEqual(response.content, rendered.content)
+
+    @override_settings(REST_RESPONSE_CACHE_WAIT=0.1)
+    @patch.object(ProductViewSet, "get_response_cache_key")
+    def test_cold_miss_renders_itself_when_the_wait_runs_out(self, get_response_cache_key):
+        get_response_cache_key.return_value = self.key
+        cache.add(f"{self.key}:lock", 1)
+
+        response = self.retrieve()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(cache.get(self.key))
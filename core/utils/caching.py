@@ -1,6 +1,7 @@
 import json
 import logging
 from pathlib import Path
+from time import time, time_ns
 
 from django.core.cache import cache
 from django.core.exceptions import BadRequest
@@ -11,6 +12,22 @@ from vibes_auth.models import User
 
 logger = logging.getLogger(__name__)
 
+# Models whose changes invalidate cached catalog responses, their versions are bumped by signals
+CATALOG_MODELS = (
+    "core.Attribute",
+    "core.AttributeGroup",
+    "core.AttributeValue",
+    "core.Brand",
+    "core.Category",
+    "core.Feedback",
+    "core.Product",
+    "core.ProductImage",
+    "core.ProductTag",
+    "core.Promotion",
+    "core.Stock",
+    "core.Vendor",
+)
+
 
 def is_safe_cache_key(key: str):
     return key not in UNSAFE_CACHE_KEYS
@@ -51,3 +68,49 @@ def set_default_cache():
             data = json.load(f)
         logger.info(f"Setting cache for {json_file.stem}")
         cache.set(json_file.stem, data, timeout=28800)
+
+
+def model_version_key(label: str) -> str:
+    return f"model_version:{label.lower()}"
+
+
+def model_modified_key(label: str) -> str:
+    return f"model_modified:{label.lower()}"
+
+
+def bump_model_version(label: str) -> None:
+    """Invalidate everything cached under the current version of the model `label`."""
+    key = model_version_key(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns(), timeout=None)
+    cache.set(model_modified_key(label), int(time()), timeout=None)
+
+
+def model_versions(labels) -> dict[str, int]:
+    """
+    Current versions of the models `labels`, for cache keys. Versions start from a timestamp,
+    so a version lost by the cache never matches entries stored before.
+    """
+    keys = {label: model_version_key(label) for label in labels}
+    versions = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in versions:
+            cache.add(key, time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return {label: versions[key] for label, key in keys.items()}
+
+
+def models_modified(labels) -> int:
+    """
+    Unix time of the latest change to any of the models `labels`. A time lost by the cache
+    restarts from now, so it never claims an older state than the real one.
+    """
+    keys = [model_modified_key(label) for label in labels]
+    modified = cache.get_many(keys)
+    for key in keys:
+        if key not in modified:
+            cache.add(key, int(time()), timeout=None)
+            modified[key] = cache.get(key)
+    return max(modified.values())
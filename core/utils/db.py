@@ -1,6 +1,16 @@
+import logging
+from time import sleep
+
+from cacheops import invalidate_model
+from django.conf import settings
+from django.db import router, transaction
 from django.db.models import Model
 from django.utils.translation import gettext_lazy as _
 
+from core.utils.caching import CATALOG_MODELS, bump_model_version
+
+logger = logging.getLogger(__name__)
+
 
 def list_to_queryset(model: Model, data: list):
     if not isinstance(model, Model):
@@ -10,3 +20,91 @@ def list_to_queryset(model: Model, data: list):
 
     pk_list = [obj.pk for obj in data]
     return model.objects.filter(pk__in=pk_list)
+
+
+def localized_columns(model, name: str) -> list[str]:
+    """Column `name` of `model` together with its modeltranslation columns, which its descriptor reads."""
+    localized = {f"{name}_{code.replace('-', '_')}" for code, _language in settings.LANGUAGES}
+    return [name, *(field.name for field in model._meta.concrete_fields if field.name in localized)]
+
+
+def required_columns(model) -> set[str]:
+    """Columns every `only()` of `model` has to keep: the primary key and the mptt tree fields."""
+    columns = {model._meta.pk.name}
+    mptt = getattr(model, "_mptt_meta", None)
+    if mptt is not None:
+        columns |= {mptt.parent_attr, mptt.left_attr, mptt.right_attr, mptt.tree_id_attr, mptt.level_attr}
+    return columns
+
+
+def chunked_delete(queryset, cascades=(), chunk_size: int = 500, pause: float = 0.1, on_chunk=None) -> int:
+    """
+    Delete every row matched by `queryset` in primary-key-ordered chunks.
+
+    Each chunk runs in its own short transaction: rows of the known dependent
+    relations listed in `cascades` are removed with raw DELETE statements first,
+    then the chunk itself. No objects are collected in memory and no per-object
+    signals are fired, so locks are held only for the duration of a chunk. Each chunk
+    is matched against `queryset` again under a row lock before it is deleted. The
+    cacheops caches and the catalog versions of the touched models are invalidated
+    once all chunks are deleted.
+
+    Parameters:
+        queryset: QuerySet selecting the rows to delete.
+        cascades: iterable of (model, fk_field_name) pairs for dependent rows to delete
+            alongside each chunk, e.g. ``((Stock, "product"),)``. M2M through models are accepted.
+        chunk_size: number of primary keys handled per transaction.
+        pause: seconds to sleep between chunks, yielding the tables to concurrent queries.
+        on_chunk: optional callable receiving the list of deleted primary keys after each commit.
+
+    Returns:
+        int: total number of deleted rows of the queryset's model.
+    """
+    model = queryset.model
+    using = router.db_for_write(model)
+    cascades = tuple(cascades)
+    pk_queryset = queryset.order_by("pk").values_list("pk", flat=True).distinct()
+
+    deleted = 0
+    last_pk = None
+
+    while True:
+        chunk_queryset = pk_queryset if last_pk is None else pk_queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            break
+
+        with transaction.atomic(using=using):
+            # Rows may have stopped matching since the chunk was read, lock the ones that still do
+            pks = list(
+                model._base_manager.using(using)
+                .filter(pk__in=queryset.filter(pk__in=chunk).values("pk"))
+                .select_for_update()
+                .values_list("pk", flat=True)
+            )
+            for related_model, field_name in cascades:
+                related_model._base_manager.using(using).filter(**{f"{field_name}__in": pks})._raw_delete(using)
+            deleted += model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
+
+        if on_chunk and pks:
+            try:
+                on_chunk(pks)
+            except Exception as e:
+                logger.warning(f"Post-delete hook failed for {len(pks)} {model.__name__} rows: {e!s}")
+
+        last_pk = chunk[-1]
+
+        if len(chunk) < chunk_size:
+            break
+
+        if pause:
+            sleep(pause)
+
+    for touched_model in {model, *(related_model for related_model, _field in cascades)}:
+        invalidate_model(touched_model)
+        if touched_model._meta.label in CATALOG_MODELS:
+            bump_model_version(touched_model._meta.label)
+
+    logger.info(f"Deleted {deleted} {model.__name__} rows in chunks of {chunk_size}")
+
+    return deleted
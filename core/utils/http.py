@@ -0,0 +1,43 @@
+import asyncio
+from weakref import WeakKeyDictionary
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+_clients = WeakKeyDictionary()
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """
+    The AsyncClient of the running event loop, for async views calling other services.
+
+    Under ASGI a worker serves every request from one loop, so they all share its connection
+    pool of HTTP_CLIENT_MAX_CONNECTIONS connections. A client is bound to the loop it was
+    created in, hence one per loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient(
+            timeout=settings.HTTP_CLIENT_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            ),
+        )
+    return client
+
+
+def call_upstream(function, coroutine_function, *args, **kwargs):
+    """
+    Call another service from a sync view.
+
+    Under ASGI sync views run in a thread, so `coroutine_function` is handed to the event loop of
+    the server with `async_to_sync`, where it shares the pooled clients while the thread waits.
+    WSGI workers have no such loop and call `function`.
+    """
+    if settings.SERVER_MODE == "asgi":
+        return async_to_sync(coroutine_function)(*args, **kwargs)
+    return function(*args, **kwargs)
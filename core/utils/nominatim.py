@@ -1,11 +1,14 @@
 from typing import Dict, List
 
 import requests
+from asgiref.sync import sync_to_async
 from constance import config
 from django.utils.translation import gettext as _
 
+from core.utils.http import async_http_client
 
-def fetch_address_suggestions(query: str, limit: int = 5) -> List[Dict]:
+
+def _search_request(query: str, limit: int) -> tuple[str, dict]:
     if not config.NOMINATIM_URL:
         raise ValueError(_("NOMINATIM_URL must be configured."))
 
@@ -16,10 +19,10 @@ def fetch_address_suggestions(query: str, limit: int = 5) -> List[Dict]:
         "q": query,
         "limit": limit,
     }
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    results = response.json()
+    return url, params
 
+
+def _suggestions(results: list) -> List[Dict]:
     suggestions = []
     for item in results:
         suggestions.append(
@@ -31,3 +34,19 @@ def fetch_address_suggestions(query: str, limit: int = 5) -> List[Dict]:
             }
         )
     return suggestions
+
+
+def fetch_address_suggestions(query: str, limit: int = 5) -> List[Dict]:
+    url, params = _search_request(query, limit)
+    response = requests.get(url, params=params)
+    response.raise_for_status()
+    return _suggestions(response.json())
+
+
+async def afetch_address_suggestions(query: str, limit: int = 5) -> List[Dict]:
+    """`fetch_address_suggestions` through the pooled async client, for async views."""
+    # The constance database backend can't be read from the event loop
+    url, params = await sync_to_async(_search_request)(query, limit)
+    response = await async_http_client().get(url, params=params)
+    response.raise_for_status()
+    return _suggestions(response.json())
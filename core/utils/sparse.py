@@ -0,0 +1,126 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from djangorestframework_camel_case.settings import api_settings
+from djangorestframework_camel_case.util import camel_to_underscore
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from core.utils.db import localized_columns, required_columns
+
+
+def parse_field_paths(value: str | None) -> dict | None:
+    """
+    Tree of the comma-separated dotted paths in a `fields` or `expand` query parameter.
+
+    `name,category.slug` becomes `{"name": {}, "category": {"slug": {}}}`, an empty branch
+    standing for all fields below it. Names may be camelCased like the rendered keys. None when
+    the parameter is missing or empty.
+    """
+    if not value:
+        return None
+
+    tree = {}
+    for path in value.split(","):
+        branch = tree
+        for name in path.strip().split("."):
+            if not name:
+                break
+            branch = branch.setdefault(camel_to_underscore(name, **api_settings.JSON_UNDERSCOREIZE), {})
+    return tree or None
+
+
+def _target(serializer):
+    return serializer.child if isinstance(serializer, ListSerializer) else serializer
+
+
+def shape_serializer(serializer, fields: dict | None = None, expand: dict | None = None, expandable=None):
+    """
+    Narrow `serializer`, or the child of a list serializer, to the `fields` tree and replace the
+    fields named in `expand` with the serializers `expandable` maps them to.
+
+    An expanded field keeps the source and cardinality of the field it replaces, one missing from
+    the serializer is added. Expanded fields count as requested. Returns `serializer`.
+    """
+    target = _target(serializer)
+    if not isinstance(target, BaseSerializer) or not hasattr(target, "fields"):
+        return serializer
+    serializer_fields = target.fields
+
+    for name in expand or ():
+        if name not in (expandable or {}):
+            continue
+        options = {"read_only": True}
+        current = serializer_fields.get(name)
+        if current is not None:
+            options["many"] = isinstance(current, ListSerializer)
+            if current.source != name:
+                options["source"] = current.source
+        serializer_fields[name] = expandable[name](**options)
+
+    if fields:
+        for name in list(serializer_fields):
+            if name not in fields and name not in (expand or {}):
+                del serializer_fields[name]
+
+        for name, field in serializer_fields.items():
+            if fields.get(name):
+                shape_serializer(field, fields[name])
+
+    return serializer
+
+
+def _flatten(lookups: dict, prefix: str = "") -> list[str]:
+    flat = []
+    for name, nested in lookups.items():
+        flat.append(f"{prefix}{name}")
+        flat.extend(_flatten(nested, f"{prefix}{name}__"))
+    return flat
+
+
+def _lookup_root(lookup) -> str:
+    return (lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup).split("__")[0]
+
+
+def sparse_queryset(queryset: QuerySet, serializer, field_sources=None) -> QuerySet:
+    """
+    Prune `queryset` to what a `shape_serializer`-narrowed `serializer` renders.
+
+    Relations no remaining field reads are dropped from `select_related()` and
+    `prefetch_related()`, and `only()` keeps the columns of the remaining fields. `field_sources`
+    maps fields whose source the serializer doesn't tell, such as method fields, to the model
+    lookups they read. Without a hint such a field keeps the queryset as it is, so pruning never
+    adds queries.
+    """
+    target = _target(serializer)
+    model = queryset.model
+    sources = set()
+    for name, field in target.fields.items():
+        if name in (field_sources or {}):
+            sources.update(field_sources[name])
+        elif field.source == "*":
+            return queryset
+        else:
+            sources.add(field.source.replace(".", "__"))
+    roots = {}
+    for root in {source.split("__")[0] for source in sources}:
+        try:
+            roots[root] = model._meta.get_field(root)
+        except FieldDoesNotExist:
+            # A property, it may read any relation
+            return queryset
+
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        kept = [lookup for lookup in _flatten(select_related) if lookup.split("__")[0] in roots]
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*kept)
+    kept = [lookup for lookup in queryset._prefetch_related_lookups if _lookup_root(lookup) in roots]
+    queryset = queryset.prefetch_related(None).prefetch_related(*kept)
+
+    if select_related is True:
+        return queryset
+    columns = required_columns(model)
+    for field in roots.values():
+        if field.concrete:
+            columns.update([field.name] if field.is_relation else localized_columns(model, field.name))
+    return queryset.only(*sorted(columns))
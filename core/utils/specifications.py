@@ -0,0 +1,50 @@
+from core.models import AttributeValue
+
+# Attributes the specification tree is hung on: the attributes of a group narrowed to one product,
+# and the values of such an attribute for that product.
+SPECIFICATION_ATTRIBUTES = "specification_attributes"
+SPECIFICATION_VALUES = "specification_values"
+
+
+def product_specifications(products) -> dict:
+    """
+    Specification trees of `products`, by primary key: the attribute groups a product has values
+    in, each with the attributes of that product in `specification_attributes`, each with the
+    values of that product in `specification_values`.
+
+    The whole batch is read in one query. Groups and attributes are distinct instances per
+    product, so trees of several products never share their narrowed lists.
+    """
+    specifications = {product.pk: [] for product in products}
+    values = (
+        AttributeValue.objects.filter(product__in=products)
+        .select_related("attribute__group")
+        .order_by("attribute__group__name", "attribute__name", "created")
+    )
+    specifications.update(specification_trees(values))
+    return specifications
+
+
+def specification_trees(values) -> dict:
+    """
+    Specification trees of the products `values` belong to, by primary key, built from attribute
+    values with their attribute and group loaded. The values are taken in the given order.
+    """
+    specifications = {}
+    groups = {}
+    attributes = {}
+    for value in values:
+        attribute = attributes.get((value.product_id, value.attribute_id))
+        if attribute is None:
+            attribute = attributes[(value.product_id, value.attribute_id)] = value.attribute
+            setattr(attribute, SPECIFICATION_VALUES, [])
+
+            group = groups.get((value.product_id, attribute.group_id))
+            if group is None:
+                group = groups[(value.product_id, attribute.group_id)] = attribute.group
+                setattr(group, SPECIFICATION_ATTRIBUTES, [])
+                specifications.setdefault(value.product_id, []).append(group)
+            getattr(group, SPECIFICATION_ATTRIBUTES).append(attribute)
+
+        getattr(attribute, SPECIFICATION_VALUES).append(value)
+    return specifications
@@ -4,11 +4,51 @@ from math import ceil
 
 from django.db import IntegrityError
 
-from core.elasticsearch import process_query
-from core.models import Attribute, AttributeGroup, AttributeValue, Brand, Category, Product, Stock, Vendor
+from core.elasticsearch import process_query, remove_from_index
+from core.models import (
+    Attribute,
+    AttributeGroup,
+    AttributeValue,
+    Brand,
+    Category,
+    Documentary,
+    Product,
+    ProductImage,
+    Promotion,
+    Stock,
+    Vendor,
+    Wishlist,
+)
+from core.utils.caching import bump_model_version
+from core.utils.db import chunked_delete
 from payments.errors import RatesError
 from payments.utils import get_rates
 
+PRODUCT_CASCADES = (
+    (Stock, "product"),
+    (AttributeValue, "product"),
+    (ProductImage, "product"),
+    (Documentary, "product"),
+    (Product.tags.through, "product"),
+    (Promotion.products.through, "product"),
+    (Wishlist.products.through, "product"),
+)
+
+
+def delete_products(queryset, chunk_size: int = 500, pause: float = 0.1) -> int:
+    """
+    Delete products selected by `queryset` together with their stocks, attribute values, images
+    and M2M links in small chunks, removing the deleted products from the search index in bulk.
+    Products referenced by order products are kept, the raw deletes would bypass their PROTECT.
+    """
+    return chunked_delete(
+        queryset.filter(orderproduct__isnull=True),
+        cascades=PRODUCT_CASCADES,
+        chunk_size=chunk_size,
+        pause=pause,
+        on_chunk=lambda pks: remove_from_index("products", pks),
+    )
+
 
 class AbstractVendor:
     """
@@ -204,14 +244,26 @@ class AbstractVendor:
 
     def prepare_for_stock_update(self):
         self.get_products_queryset().update(is_active=False)
+        # update() sends no signals
+        bump_model_version(Product._meta.label)
 
     def delete_inactives(self):
-        self.get_products_queryset().filter(is_active=False).delete()
+        delete_products(self.get_products_queryset().filter(is_active=False))
 
     def delete_belongings(self):
-        self.get_products_queryset().delete()
-        self.get_stocks_queryset().delete()
-        self.get_attribute_values_queryset().delete()
+        """
+        Delete the products stocked by the vendor. Products referenced by order products stay for
+        the orders: they are deactivated, dropped from the search index and lose the vendor's stocks.
+        """
+        vendor = self.get_vendor_instance()
+        delete_products(self.get_products_queryset())
+
+        kept = list(Product.objects.filter(stocks__vendor=vendor).values_list("pk", flat=True).distinct())
+        if kept:
+            Product.objects.filter(pk__in=kept).update(is_active=False)
+            bump_model_version(Product._meta.label)
+            remove_from_index("products", kept)
+        chunked_delete(Stock.objects.filter(vendor=vendor))
 
     def process_attribute(self, key: str, value, product: Product, attr_group: AttributeGroup):
         if not value:
@@ -263,7 +315,7 @@ class AbstractVendor:
 
 
 def delete_stale():
-    Product.objects.filter(stocks__isnull=True, orderproduct__isnull=True).delete()
+    delete_products(Product.objects.filter(stocks__isnull=True, orderproduct__isnull=True))
 
 
 class NotEnoughBalanceError(Exception):
@@ -0,0 +1,143 @@
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from math import log, sqrt
+from time import perf_counter
+
+from core.models import AttributeGroup, Product, Stock
+from core.vendors import AbstractVendor
+
+PRICE_DISTRIBUTIONS = ("uniform", "normal", "lognormal")
+
+
+def generate_feed(
+    products: int = 1000,
+    attributes: int = 10,
+    categories: int = 50,
+    brands: int = 20,
+    price_distribution: str = "lognormal",
+    min_price: float = 1.0,
+    max_price: float = 5000.0,
+    seed: int | None = None,
+    prefix: str = "bench",
+) -> list[dict]:
+    """
+    Build an in-memory vendor feed shaped like the payloads real vendors deliver.
+
+    Every item carries a SKU, part number, name, description, category and brand names,
+    purchase price, quantity and a dict of `attributes` typed values. Category and brand
+    names are drawn from pools of the given cardinality, prices follow `price_distribution`
+    clamped to [min_price, max_price]. The same `seed` always yields the same feed.
+    """
+    if price_distribution not in PRICE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown price distribution {price_distribution!r}, expected one of {PRICE_DISTRIBUTIONS}")
+
+    rng = random.Random(seed)
+    category_names = [f"{prefix} category {i}" for i in range(max(1, categories))]
+    brand_names = [f"{prefix} brand {i}" for i in range(max(1, brands))]
+    middle = (min_price + max_price) / 2
+    geometric_middle = log(sqrt(min_price * max_price))
+
+    def price():
+        match price_distribution:
+            case "uniform":
+                value = rng.uniform(min_price, max_price)
+            case "normal":
+                value = rng.gauss(middle, (max_price - min_price) / 6)
+            case _:
+                value = rng.lognormvariate(geometric_middle, 1)
+        return round(min(max(value, min_price), max_price), 2)
+
+    def attribute_value(index: int):
+        # Each attribute keeps a single value type so it resolves to the same Attribute row
+        match index % 4:
+            case 0:
+                return rng.randint(1, 1000)
+            case 1:
+                return round(rng.uniform(0.1, 100.0), 2)
+            case 2:
+                return rng.choice(("true", "false"))
+            case _:
+                return f"value {rng.randint(1, 50)}"
+
+    return [
+        {
+            "sku": f"{prefix}-sku-{i}",
+            "partnumber": f"{prefix}-pn-{i}",
+            "name": f"{prefix} product {i}",
+            "description": f"Synthetic product {i} generated for vendor sync benchmarking",
+            "category": rng.choice(category_names),
+            "brand": rng.choice(brand_names),
+            "price": price(),
+            "quantity": rng.randint(0, 500),
+            "attributes": {f"{prefix} attribute {a}": attribute_value(a) for a in range(attributes)},
+        }
+        for i in range(products)
+    ]
+
+
+class SyntheticVendor(AbstractVendor):
+    """
+    Reference vendor implementation ingesting a feed produced by `generate_feed`.
+
+    It follows the same path production vendors take - category and brand auto resolution,
+    product and stock upserts, attribute processing and stale product cleanup - and records
+    the wall time spent in each section in `timings`.
+    """
+
+    def __init__(self, feed: list[dict], vendor_name="Synthetic", currency="USD"):
+        super().__init__(vendor_name=vendor_name, currency=currency)
+        self.feed = feed
+        self.timings = defaultdict(float)
+
+    @contextmanager
+    def timed(self, section: str):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[section] += perf_counter() - started
+
+    def get_products(self):
+        return self.feed
+
+    def update_stock(self):
+        vendor = self.get_vendor_instance()
+        attr_group, _ = AttributeGroup.objects.get_or_create(name=f"{self.vendor_name} specifications")
+
+        with self.timed("db_writes"):
+            self.prepare_for_stock_update()
+
+        for item in self.get_products():
+            with self.timed("es_resolution"):
+                category = self.auto_resolve_category(item["category"])
+                brand = self.auto_resolve_brand(item["brand"])
+
+            with self.timed("db_writes"):
+                product, _ = Product.objects.update_or_create(
+                    partnumber=item["partnumber"],
+                    defaults={
+                        "name": item["name"],
+                        "description": item["description"],
+                        "category": category,
+                        "brand": brand,
+                        "is_active": True,
+                    },
+                )
+                Stock.objects.update_or_create(
+                    vendor=vendor,
+                    product=product,
+                    sku=item["sku"],
+                    defaults={
+                        "price": self.resolve_price(item["price"], vendor, category),
+                        "purchase_price": item["price"],
+                        "quantity": item["quantity"],
+                    },
+                )
+
+            with self.timed("attributes"):
+                for key, value in item["attributes"].items():
+                    self.process_attribute(key, value, product, attr_group)
+
+        with self.timed("db_writes"):
+            self.delete_inactives()
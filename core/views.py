@@ -2,21 +2,27 @@ import mimetypes
 import os
 
 import requests
+from django.conf import settings as django_settings
 from django.contrib.sitemaps.views import index as _sitemap_index_view
 from django.contrib.sitemaps.views import sitemap as _sitemap_detail_view
 from django.core.cache import cache
 from django.core.exceptions import BadRequest
-from django.http import FileResponse, Http404, JsonResponse
+from django.db import connection, transaction
+from django.http import FileResponse, Http404, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from django.utils.translation import gettext_lazy as _
 from django_ratelimit.decorators import ratelimit
-from djangorestframework_camel_case.render import CamelCaseJSONRenderer
 from djangorestframework_camel_case.util import camelize
 from drf_spectacular.utils import extend_schema_view
 from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import HttpError
 from graphene_file_upload.django import FileUploadGraphQLView
+from graphql import ExecutionResult, OperationType, execute, get_operation_ast, validate, validate_schema
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.renderers import MultiPartRenderer
@@ -27,6 +33,7 @@ from rest_framework_yaml.renderers import YAMLRenderer
 from sentry_sdk import capture_exception
 
 from core.docs.drf.views import (
+    AUTOCOMPLETE_SCHEMA,
     BUY_AS_BUSINESS_SCHEMA,
     CACHE_SCHEMA,
     CONTACT_US_SCHEMA,
@@ -35,8 +42,14 @@ from core.docs.drf.views import (
     REQUEST_CURSED_URL_SCHEMA,
     SEARCH_SCHEMA,
 )
-from core.elasticsearch import process_query
+from core.elasticsearch import autocomplete
+from core.elasticsearch.analytics import atracked_search, tracked_search
+from core.graphene.cost import query_cost_validator
+from core.graphene.persisted import PersistedQueryError, persisted_query, validated_document
+from core.graphene.response_cache import response_cache_key
+from core.mixins import ConditionalGetMixin
 from core.models import DigitalAssetDownload, Order
+from core.renderers import EvibesJSONRenderer
 from core.serializers import (
     BuyAsBusinessOrderSerializer,
     CacheOperatorSerializer,
@@ -46,8 +59,10 @@ from core.serializers import (
 from core.utils import get_project_parameters, is_url_safe
 from core.utils.caching import web_cache
 from core.utils.emailing import contact_us_email
+from core.utils.http import async_http_client, call_upstream
 from core.utils.languages import get_flag_by_language
 from evibes import settings
+from evibes.middleware import GrapheneJWTAuthorizationMiddleware
 from evibes.settings import LANGUAGES
 from payments.serializers import TransactionProcessSerializer
 
@@ -65,9 +80,134 @@ def sitemap_detail(request, *args, **kwargs):
 
 
 class CustomGraphQLView(FileUploadGraphQLView):
+    """
+    GraphQL endpoint with automatic persisted queries, memoized parsing and validation, query
+    cost limits, a response cache for anonymous catalog queries, and HTTP caching of anonymous
+    persisted queries sent over GET.
+    """
+
     def get_context(self, request):
         return request
 
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if getattr(request, "graphql_cacheable", False):
+            # Shared caches don't store responses setting cookies, and these don't need the CSRF one
+            response.cookies.pop(django_settings.CSRF_COOKIE_NAME, None)
+            if response.has_header("Vary"):
+                del response["Vary"]
+            patch_vary_headers(response, ("Accept-Language", "Authorization"))
+            patch_cache_control(response, public=True, max_age=settings.GRAPHQL_PERSISTED_QUERY_MAX_AGE)
+        return response
+
+    def get_response(self, request, data, show_graphiql=False):
+        try:
+            query = persisted_query(request, data)
+        except PersistedQueryError as e:
+            return self.json_encode(request, {"errors": [e.formatted]}), 200
+
+        if query is not None:
+            data = data.copy()
+            data["query"] = query
+
+        # Cost budgets and the response cache depend on the user, so the JWT is authenticated upfront
+        GrapheneJWTAuthorizationMiddleware.authenticate(request)
+
+        cache_key = None
+        if not show_graphiql:
+            query, variables, operation_name, _id = self.get_graphql_params(request, data)
+            cache_key = response_cache_key(request, self.schema, query, variables, operation_name)
+        if cache_key is not None:
+            response = cache.get(cache_key)
+            if response is not None:
+                request.graphql_cacheable = self._http_cacheable(request)
+                return response, 200
+            request.graphql_response_cache_key = cache_key
+
+        response, status_code = super().get_response(request, data, show_graphiql)
+        if cache_key is not None and getattr(request, "graphql_succeeded", False):
+            cache.set(cache_key, response, timeout=settings.GRAPHQL_RESPONSE_CACHE_TIMEOUT)
+        return response, status_code
+
+    @staticmethod
+    def _http_cacheable(request) -> bool:
+        return (
+            request.method == "GET"
+            and getattr(request, "graphql_persisted_query", None) is not None
+            and not request.user.is_authenticated
+        )
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        document, validation_errors = validated_document(self.schema, query)
+        if validation_errors:
+            return ExecutionResult(data=None, errors=list(validation_errors))
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if request.method == "GET" and operation_ast is not None and operation_ast.operation != OperationType.QUERY:
+            if show_graphiql:
+                return None
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"], f"Can only perform a {operation_ast.operation.value} operation from a POST request."
+                )
+            )
+
+        validation_errors = validate(schema, document, (query_cost_validator(request, variables, operation_name),))
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            result = execute(schema, document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        request.graphql_succeeded = not result.errors
+        request.graphql_cacheable = request.graphql_succeeded and self._http_cacheable(request)
+        return result
+
+    def json_encode(self, request, d, pretty=False):
+        cost = getattr(request, "graphql_cost", None)
+        if cost is not None:
+            if getattr(request, "graphql_cacheable", False) or hasattr(request, "graphql_response_cache_key"):
+                # The budget belongs to one client, shared caches would hand it to others
+                cost = {key: value for key, value in cost.items() if key != "budget"}
+            d = {**d, "extensions": {**d.get("extensions", {}), "cost": cost}}
+        return super().json_encode(request, d, pretty)
+
 
 class CustomSwaggerView(SpectacularSwaggerView):
     def get_context_data(self, **kwargs):
@@ -84,12 +224,15 @@ class CustomRedocView(SpectacularRedocView):
 
 
 @extend_schema_view(**LANGUAGE_SCHEMA)
-class SupportedLanguagesView(APIView):
+class SupportedLanguagesView(ConditionalGetMixin, APIView):
     serializer_class = LanguageSerializer
     permission_classes = [
         AllowAny,
     ]
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+
+    def get_conditional_validators(self, request):
+        return [settings.EVIBES_VERSION, LANGUAGES], None
 
     def get(self, request):
         return Response(
@@ -109,12 +252,15 @@ class SupportedLanguagesView(APIView):
 
 
 @extend_schema_view(**PARAMETERS_SCHEMA)
-class WebsiteParametersView(APIView):
+class WebsiteParametersView(ConditionalGetMixin, APIView):
     serializer_class = None
     permission_classes = [
         AllowAny,
     ]
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+
+    def get_conditional_validators(self, request):
+        return [get_project_parameters()], None
 
     def get(self, request):
         return Response(data=camelize(get_project_parameters()), status=status.HTTP_200_OK)
@@ -126,7 +272,7 @@ class CacheOperatorView(APIView):
     permission_classes = [
         AllowAny,
     ]
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
 
     def post(self, request, *args, **kwargs):
         return Response(
@@ -143,7 +289,7 @@ class CacheOperatorView(APIView):
 @extend_schema_view(**CONTACT_US_SCHEMA)
 class ContactUsView(APIView):
     serializer_class = ContactUsSerializer
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
 
     @ratelimit(key="ip", rate="2/h")
     def post(self, request, *args, **kwargs):
@@ -154,12 +300,26 @@ class ContactUsView(APIView):
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
+def _fetch_json(url: str):
+    response = requests.get(
+        url, headers={"content-type": "application/json"}, timeout=django_settings.HTTP_CLIENT_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def _afetch_json(url: str):
+    response = await async_http_client().get(url, headers={"content-type": "application/json"})
+    response.raise_for_status()
+    return response.json()
+
+
 @extend_schema_view(**REQUEST_CURSED_URL_SCHEMA)
 class RequestCursedURLView(APIView):
     permission_classes = [
         AllowAny,
     ]
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
 
     @ratelimit(key="ip", rate="10/h")
     def post(self, request, *args, **kwargs):
@@ -172,9 +332,7 @@ class RequestCursedURLView(APIView):
         try:
             data = cache.get(url, None)
             if not data:
-                response = requests.get(url, headers={"content-type": "application/json"})
-                response.raise_for_status()
-                data = camelize(response.json())
+                data = camelize(call_upstream(_fetch_json, _afetch_json, url))
                 cache.set(url, data, 86400)
             return Response(
                 data=data,
@@ -194,10 +352,30 @@ class GlobalSearchView(APIView):
     It returns a response grouping matched items by index.
     """
 
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get("q", "").strip()
+        return Response(camelize(call_upstream(tracked_search, atracked_search, query, source="rest")))
+
+
+@extend_schema_view(**AUTOCOMPLETE_SCHEMA)
+class AutocompleteView(APIView):
+    """
+    A typeahead endpoint answered by completion suggesters.
+    It returns uuid, name and slug of the suggestions in the request language, grouped by index.
+    """
+
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
 
     def get(self, request, *args, **kwargs):
-        return Response(camelize({"results": process_query(request.GET.get("q", "").strip())}))
+        try:
+            size = int(request.GET.get("size", 0)) or None
+            if size is not None and size < 1:
+                raise ValueError(_("size must be a positive integer."))
+            return Response({"results": autocomplete(request.GET.get("q", ""), size)})
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @extend_schema_view(**BUY_AS_BUSINESS_SCHEMA)
@@ -1,14 +1,16 @@
+from contextlib import suppress
 from uuid import UUID
 
+from django.db.models import Prefetch
 from django.http import Http404
 from django.utils.translation import gettext_lazy as _
 from django_filters.rest_framework import DjangoFilterBackend
 from django_ratelimit.decorators import ratelimit
-from djangorestframework_camel_case.render import CamelCaseJSONRenderer
 from drf_spectacular.utils import extend_schema_view
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.renderers import MultiPartRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
@@ -25,7 +27,9 @@ from core.docs.drf.viewsets import (
     PRODUCT_SCHEMA,
     WISHLIST_SCHEMA,
 )
+from core.elasticsearch.listing import get_product_listing
 from core.filters import BrandFilter, CategoryFilter, OrderFilter, ProductFilter
+from core.mixins import ConditionalGetMixin, ResponseCacheMixin
 from core.models import (
     Address,
     Attribute,
@@ -46,6 +50,7 @@ from core.models import (
     Wishlist,
 )
 from core.permissions import EvibesPermission
+from core.renderers import EvibesJSONRenderer
 from core.serializers import (
     AddOrderProductSerializer,
     AddressAutocompleteInputSerializer,
@@ -86,19 +91,63 @@ from core.serializers import (
     WishlistSimpleSerializer,
 )
 from core.utils import format_attributes
+from core.utils.caching import CATALOG_MODELS
+from core.utils.http import call_upstream
 from core.utils.messages import permission_denied_message
-from core.utils.nominatim import fetch_address_suggestions
+from core.utils.nominatim import afetch_address_suggestions, fetch_address_suggestions
+from core.utils.sparse import parse_field_paths, shape_serializer, sparse_queryset
 from payments.serializers import TransactionProcessSerializer
 
 
-class EvibesViewSet(ModelViewSet):
+class EvibesViewSet(ResponseCacheMixin, ConditionalGetMixin, ModelViewSet):
+    """
+    Base of the REST viewsets.
+
+    Reads take `?fields=` to render only the listed fields, dotted for nested ones, and `?expand=`
+    to render the fields in `expandable_fields` through their fuller serializer. The queryset is
+    pruned to the requested fields, `field_sources` tells the model lookups of fields whose
+    source is not on the serializer, such as method fields. Viewsets setting `conditional_models`
+    answer conditional reads from the version counters of these models, and serve anonymous
+    reads from rendered responses cached at these versions.
+    """
+
     action_serializer_classes = {}
+    expandable_fields = {}
+    field_sources = {}
     permission_classes = [EvibesPermission]
-    renderer_classes = [CamelCaseJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
+    renderer_classes = [EvibesJSONRenderer, MultiPartRenderer, XMLRenderer, YAMLRenderer]
 
     def get_serializer_class(self):
         return self.action_serializer_classes.get(self.action, super().get_serializer_class())
 
+    def is_conditional(self, request) -> bool:
+        return bool(self.conditional_models) and super().is_conditional(request)
+
+    def get_sparse_fields(self) -> tuple[dict | None, dict | None]:
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None, None
+        return (
+            parse_field_paths(request.query_params.get("fields")),
+            parse_field_paths(request.query_params.get("expand")),
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = self.get_sparse_fields()
+        if fields:
+            serializer = self.get_serializer_class()(context=self.get_serializer_context())
+            shape_serializer(serializer, fields, expand, self.expandable_fields)
+            queryset = sparse_queryset(queryset, serializer, self.field_sources)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields, expand = self.get_sparse_fields()
+        if fields or expand:
+            shape_serializer(serializer, fields, expand, self.expandable_fields)
+        return serializer
+
 
 @extend_schema_view(**ATTRIBUTE_GROUP_SCHEMA)
 class AttributeGroupViewSet(EvibesViewSet):
@@ -109,28 +158,31 @@ class AttributeGroupViewSet(EvibesViewSet):
     action_serializer_classes = {
         "list": AttributeGroupSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 @extend_schema_view(**ATTRIBUTE_SCHEMA)
 class AttributeViewSet(EvibesViewSet):
-    queryset = Attribute.objects.all()
+    queryset = Attribute.objects.select_related("group").prefetch_related("categories")
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["group", "value_type", "is_active"]
     serializer_class = AttributeDetailSerializer
     action_serializer_classes = {
         "list": AttributeSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 @extend_schema_view(**ATTRIBUTE_VALUE_SCHEMA)
 class AttributeValueViewSet(EvibesViewSet):
-    queryset = AttributeValue.objects.all()
+    queryset = AttributeValue.objects.select_related("attribute__group")
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["attribute", "is_active"]
     serializer_class = AttributeValueDetailSerializer
     action_serializer_classes = {
         "list": AttributeValueSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 @extend_schema_view(**CATEGORY_SCHEMA)
@@ -142,6 +194,7 @@ class CategoryViewSet(EvibesViewSet):
     action_serializer_classes = {
         "list": CategorySimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -153,27 +206,73 @@ class CategoryViewSet(EvibesViewSet):
 
 
 class BrandViewSet(EvibesViewSet):
-    queryset = Brand.objects.all()
+    queryset = Brand.objects.prefetch_related("categories")
     filter_backends = [DjangoFilterBackend]
     filterset_class = BrandFilter
     serializer_class = BrandDetailSerializer
     action_serializer_classes = {
         "list": BrandSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
+    expandable_fields = {
+        "categories": CategorySimpleSerializer,
+    }
 
 
 @extend_schema_view(**PRODUCT_SCHEMA)
 class ProductViewSet(EvibesViewSet):
-    queryset = Product.objects.prefetch_related("tags", "attributes", "stocks", "images").all()
+    queryset = Product.objects.select_related("category", "brand").prefetch_related(
+        "tags",
+        Prefetch("attributes", queryset=AttributeValue.objects.select_related("attribute__group")),
+        "stocks",
+        "images",
+    )
     filter_backends = [DjangoFilterBackend]
     filterset_class = ProductFilter
     serializer_class = ProductDetailSerializer
     action_serializer_classes = {
         "list": ProductSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
+    expandable_fields = {
+        "brand": BrandDetailSerializer,
+        "category": CategorySimpleSerializer,
+    }
+    # Computed from their own queries or, for attribute_groups, from the prefetched attributes
+    field_sources = {
+        "attribute_groups": ("attributes",),
+        "feedbacks_count": (),
+        "price": (),
+        "quantity": (),
+        "rating": (),
+    }
     lookup_field = "lookup"
     lookup_url_kwarg = "lookup"
 
+    def list(self, request, *args, **kwargs):
+        listing = None
+        if not request.user.has_perm("core.view_product"):
+            page_size = self.paginator.get_page_size(request)
+            with suppress(ValueError):
+                page_number = int(request.query_params.get(self.paginator.page_query_param, 1))
+                listing = get_product_listing(
+                    request.query_params,
+                    self.get_queryset(),
+                    start=max(page_number - 1, 0) * page_size,
+                    size=page_size,
+                    visible_only=True,
+                )
+
+        if listing is None:
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(listing)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data["facets"] = listing.facets
+        response.data["price_range"] = listing.price_range
+        return response
+
     def get_object(self):
         queryset = self.filter_queryset(self.get_queryset())
         lookup_value = self.kwargs[self.lookup_url_kwarg]
@@ -372,6 +471,7 @@ class ProductTagViewSet(EvibesViewSet):
     action_serializer_classes = {
         "list": ProductTagSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 class ProductImageViewSet(EvibesViewSet):
@@ -382,6 +482,7 @@ class ProductImageViewSet(EvibesViewSet):
     action_serializer_classes = {
         "list": ProductImageSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 class PromoCodeViewSet(EvibesViewSet):
@@ -402,6 +503,7 @@ class PromotionViewSet(EvibesViewSet):
     action_serializer_classes = {
         "list": PromotionSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 class StockViewSet(EvibesViewSet):
@@ -412,6 +514,7 @@ class StockViewSet(EvibesViewSet):
     action_serializer_classes = {
         "list": StockSimpleSerializer,
     }
+    conditional_models = CATALOG_MODELS
 
 
 @extend_schema_view(**WISHLIST_SCHEMA)
@@ -527,7 +630,7 @@ class AddressViewSet(EvibesViewSet):
         limit = serializer.validated_data["limit"]
 
         try:
-            suggestions = fetch_address_suggestions(query=q, limit=limit)
+            suggestions = call_upstream(fetch_address_suggestions, afetch_address_suggestions, query=q, limit=limit)
         except Exception as e:
             return Response(
                 {"detail": _(f"Geocoding error: {e}")},
@@ -5,15 +5,19 @@ from os import getenv
 from constance import config
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import DisallowedHost
+from django.db.models import Model, QuerySet
 from django.http import HttpResponseForbidden
 from django.middleware.common import CommonMiddleware
 from django.middleware.locale import LocaleMiddleware
 from django.shortcuts import redirect
 from django.utils import translation
+from graphene import relay
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
 from sentry_sdk import capture_exception
 
+from core.graphene.dataloaders import get_loaders
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,15 +45,26 @@ class CustomLocaleMiddleware(LocaleMiddleware):
 
 
 class GrapheneJWTAuthorizationMiddleware:
-    def resolve(self, next, root, info, **args):
-        context = info.context
+    """
+    Authenticate GraphQL requests by their JWT.
 
-        user = self.get_jwt_user(context)
+    Graphene runs middleware for every resolved field, so the user is resolved once per request
+    and memoized on the request context; the remaining fields only pay an attribute lookup.
+    """
 
-        info.context.user = user
+    context_attribute = "_graphene_jwt_authenticated"
 
+    def resolve(self, next, root, info, **args):
+        self.authenticate(info.context)
         return next(root, info, **args)
 
+    @classmethod
+    def authenticate(cls, context):
+        if not getattr(context, cls.context_attribute, False):
+            context.user = cls.get_jwt_user(context)
+            setattr(context, cls.context_attribute, True)
+        return context.user
+
     @staticmethod
     def get_jwt_user(request):
         jwt_authenticator = JWTAuthentication()
@@ -62,6 +77,28 @@ class GrapheneJWTAuthorizationMiddleware:
         return user
 
 
+class GrapheneDataLoaderMiddleware:
+    """
+    Prime the request's DataLoaders with the objects resolvers return, so that the first lookup
+    made for one of them is batched for the whole page or list it came with.
+    """
+
+    def resolve(self, next, root, info, **args):
+        result = next(root, info, **args)
+
+        if isinstance(result, QuerySet):
+            result = list(result)
+
+        if isinstance(result, relay.Connection):
+            get_loaders(info).prime(edge.node for edge in result.edges)
+        elif isinstance(result, list):
+            get_loaders(info).prime(result)
+        elif isinstance(result, Model):
+            get_loaders(info).prime((result,))
+
+        return result
+
+
 class BlockInvalidHostMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
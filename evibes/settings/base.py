@@ -69,6 +69,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "django.contrib.sitemaps",
     "django.contrib.gis",
+    "django.contrib.postgres",
     "django.contrib.humanize",
     "cacheops",
     "django_hosts",
@@ -188,6 +189,13 @@ WSGI_APPLICATION = "evibes.wsgi.application"
 
 ASGI_APPLICATION = "evibes.asgi.application"
 
+# uvicorn workers on evibes.asgi with "asgi", sync workers on evibes.wsgi otherwise
+SERVER_MODE = getenv("SERVER_MODE", "wsgi")
+
+# Connection pool of the HTTP client outbound calls share under ASGI, per event loop
+HTTP_CLIENT_TIMEOUT = float(getenv("HTTP_CLIENT_TIMEOUT", "10"))
+HTTP_CLIENT_MAX_CONNECTIONS = int(getenv("HTTP_CLIENT_MAX_CONNECTIONS", "200"))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 TIME_ZONE = getenv("TIME_ZONE", "Europe/London")
@@ -1,6 +1,7 @@
 from datetime import timedelta
 
 from evibes.settings import REDIS_PASSWORD
+from evibes.settings.elasticsearch import ELASTICSEARCH_COALESCE_INTERVAL
 
 CELERY_BROKER_URL = f"redis://:{REDIS_PASSWORD + '@'}redis:6379/0"
 CELERY_RESULT_BACKEND = f"redis://:{REDIS_PASSWORD + '@'}redis:6379/0"
@@ -24,6 +25,14 @@ CELERY_BEAT_SCHEDULE = {
         "task": "core.tasks.remove_stale_product_images",
         "schedule": timedelta(days=1),
     },
+    "flush_search_index_task": {
+        "task": "core.tasks.flush_search_index_task",
+        "schedule": timedelta(seconds=ELASTICSEARCH_COALESCE_INTERVAL),
+    },
+    "flush_search_analytics_task": {
+        "task": "core.tasks.flush_search_analytics_task",
+        "schedule": timedelta(minutes=1),
+    },
     "process_promotions": {
         "task": "core.tasks.process_promotions",
         "schedule": timedelta(hours=2),
@@ -10,7 +10,7 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
+        "core.renderers.EvibesJSONRenderer",
         "rest_framework.renderers.MultiPartRenderer",
         "rest_framework_xml.renderers.XMLRenderer",
         "rest_framework_yaml.renderers.YAMLRenderer",
@@ -21,13 +21,17 @@ REST_FRAMEWORK = {
         "rest_framework_xml.parsers.XMLParser",
         "rest_framework_yaml.parsers.YAMLParser",
     ),
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.generators.AutoSchema",
+    "DEFAULT_SCHEMA_CLASS": "core.docs.drf.schema.EvibesAutoSchema",
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
     "JSON_UNDERSCOREIZE": {
         "no_underscore_before_number": True,
     },
 }
 
+REST_RESPONSE_CACHE_TIMEOUT = int(getenv("REST_RESPONSE_CACHE_TIMEOUT", "3600"))  # noqa: F405
+REST_RESPONSE_CACHE_LOCK_TIMEOUT = 10
+REST_RESPONSE_CACHE_WAIT = 2
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=8)
     if not DEBUG  # noqa: F405
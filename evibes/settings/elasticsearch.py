@@ -11,4 +11,41 @@ ELASTICSEARCH_DSL = {
 
 ELASTICSEARCH_DSL_AUTOSYNC = True
 ELASTICSEARCH_DSL_PARALLEL = False
-ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = "evibes.signal_processors.SelectiveSignalProcessor"
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = "evibes.signal_processors.CoalescingSignalProcessor"
+
+ELASTICSEARCH_SEARCH_CACHE_TIMEOUT = int(getenv("ELASTICSEARCH_SEARCH_CACHE_TIMEOUT", "60"))  # noqa: F405
+ELASTICSEARCH_SEARCH_CACHE_LOCK_TIMEOUT = 10
+ELASTICSEARCH_SEARCH_TIMEOUT = float(getenv("ELASTICSEARCH_SEARCH_TIMEOUT", "2"))  # noqa: F405
+ELASTICSEARCH_ASYNC_CONNECTIONS = int(getenv("ELASTICSEARCH_ASYNC_CONNECTIONS", "100"))  # noqa: F405
+ELASTICSEARCH_BREAKER_FAILURES = int(getenv("ELASTICSEARCH_BREAKER_FAILURES", "5"))  # noqa: F405
+ELASTICSEARCH_BREAKER_WINDOW = 30
+ELASTICSEARCH_BREAKER_COOLDOWN = int(getenv("ELASTICSEARCH_BREAKER_COOLDOWN", "30"))  # noqa: F405
+ELASTICSEARCH_MAX_RESULT_WINDOW = 10000
+ELASTICSEARCH_SEARCH_MIN_HITS = int(getenv("ELASTICSEARCH_SEARCH_MIN_HITS", "5"))  # noqa: F405
+ELASTICSEARCH_AUTOCOMPLETE_SIZE = 8
+ELASTICSEARCH_AUTOCOMPLETE_CACHE_TIMEOUT = 5
+ELASTICSEARCH_INCREMENTAL_OVERLAP = 60
+ELASTICSEARCH_BULK_CHUNK_SIZE = int(getenv("ELASTICSEARCH_BULK_CHUNK_SIZE", "500"))  # noqa: F405
+ELASTICSEARCH_BULK_THREAD_COUNT = int(getenv("ELASTICSEARCH_BULK_THREAD_COUNT", "4"))  # noqa: F405
+ELASTICSEARCH_COALESCE_INTERVAL = int(getenv("ELASTICSEARCH_COALESCE_INTERVAL", "30"))  # noqa: F405
+ELASTICSEARCH_COALESCE_MAX_ITEMS = int(getenv("ELASTICSEARCH_COALESCE_MAX_ITEMS", "5000"))  # noqa: F405
+
+# Sub-fields indexed for the translated name and description of each language, "*" covers the
+# languages not listed. Double metaphone only encodes Latin script, and the standard tokenizer
+# splits CJK text into single characters that n-grams can't be built from. Set a language to ()
+# when nobody searches in it, so its text is only matched exactly.
+ELASTICSEARCH_LANGUAGE_SUBFIELDS = {
+    "*": ("ngram", "phonetic", "auto"),
+    "ar-ar": ("ngram", "auto"),
+    "hi-in": ("ngram", "auto"),
+    "ja-jp": ("auto",),
+    "kk-kz": ("ngram", "auto"),
+    "ru-ru": ("ngram", "auto"),
+    "zh-hans": ("auto",),
+}
+
+SEARCH_ANALYTICS_STREAM_MAXLEN = 100000
+SEARCH_ANALYTICS_RETENTION_DAYS = int(getenv("SEARCH_ANALYTICS_RETENTION_DAYS", "90"))  # noqa: F405
+SEARCH_ANALYTICS_FLUSH_LOCK_TIMEOUT = 600
+
+PRODUCT_LISTING_BACKEND = getenv("PRODUCT_LISTING_BACKEND", "database")  # noqa: F405
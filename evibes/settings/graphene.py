@@ -1,13 +1,29 @@
 from evibes.settings.base import *  # noqa: F403
 
+GRAPHQL_MAX_DEPTH = int(getenv("GRAPHQL_MAX_DEPTH", "10"))  # noqa: F405
+GRAPHQL_MAX_PAGE_SIZE = int(getenv("GRAPHQL_MAX_PAGE_SIZE", "100"))  # noqa: F405
+GRAPHQL_LIST_SIZE_ESTIMATE = 10
+GRAPHQL_MAX_QUERY_COST = int(getenv("GRAPHQL_MAX_QUERY_COST", "10000"))  # noqa: F405
+GRAPHQL_COST_BUDGET_WINDOW = 60
+GRAPHQL_IP_COST_BUDGET = int(getenv("GRAPHQL_IP_COST_BUDGET", "50000"))  # noqa: F405
+GRAPHQL_USER_COST_BUDGET = int(getenv("GRAPHQL_USER_COST_BUDGET", "100000"))  # noqa: F405
+
+GRAPHQL_DOCUMENT_CACHE_SIZE = 512
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = 60 * 60 * 24 * 30
+GRAPHQL_PERSISTED_QUERY_MAX_AGE = int(getenv("GRAPHQL_PERSISTED_QUERY_MAX_AGE", "60"))  # noqa: F405
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = int(getenv("GRAPHQL_RESPONSE_CACHE_TIMEOUT", "300"))  # noqa: F405
+
 GRAPHENE = {
     "MIDDLEWARE": [
         "evibes.middleware.GrapheneLoggingErrorsDebugMiddleware",
         "evibes.middleware.GrapheneJWTAuthorizationMiddleware",
+        "evibes.middleware.GrapheneDataLoaderMiddleware",
     ]
     if DEBUG  # noqa: F405
     else [
         "evibes.middleware.GrapheneJWTAuthorizationMiddleware",
+        "evibes.middleware.GrapheneDataLoaderMiddleware",
     ],
     "CAMELCASE_ERRORS": True,
+    "RELAY_CONNECTION_MAX_LIMIT": GRAPHQL_MAX_PAGE_SIZE,
 }
@@ -1,7 +1,10 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django_elasticsearch_dsl.registries import registry
 from django_elasticsearch_dsl.signals import CelerySignalProcessor
 
+from core.elasticsearch.coalescing import mark_dirty, mark_dirty_pks
+
 
 class SelectiveSignalProcessor(CelerySignalProcessor):
     def setup(self):
@@ -19,3 +22,75 @@ class SelectiveSignalProcessor(CelerySignalProcessor):
             models.signals.post_delete.disconnect(self.handle_delete, sender=model)
             models.signals.pre_delete.disconnect(self.handle_pre_delete, sender=model)
             models.signals.m2m_changed.disconnect(self.handle_m2m_changed, sender=model)
+
+
+class CoalescingSignalProcessor(SelectiveSignalProcessor):
+    """
+    Record changed objects in a Redis set instead of scheduling a Celery task per signal.
+
+    The set is drained in bulk by `core.tasks.flush_search_index_task`, which runs every
+    ELASTICSEARCH_COALESCE_INTERVAL seconds and is triggered early once the set holds
+    ELASTICSEARCH_COALESCE_MAX_ITEMS objects. Deleted objects are detected at flush time.
+    Saving or deleting an object of a document's `related_models` marks the indexed objects
+    returned by `get_instances_from_related` instead. A changed many-to-many relation marks the
+    indexed objects on both of its sides.
+    """
+
+    @staticmethod
+    def related_models() -> set:
+        return {model for doc in registry.get_documents() for model in getattr(doc.django, "related_models", ())}
+
+    def setup(self):
+        super().setup()
+        # m2m_changed is sent by the through models, not by the document models
+        models.signals.m2m_changed.connect(self.handle_m2m_changed, weak=False, dispatch_uid="coalescing_m2m_changed")
+        for model in self.related_models():
+            models.signals.post_save.connect(self.handle_related_change, sender=model, weak=False)
+            models.signals.post_delete.connect(self.handle_related_change, sender=model, weak=False)
+
+    def teardown(self):
+        super().teardown()
+        models.signals.m2m_changed.disconnect(dispatch_uid="coalescing_m2m_changed")
+        for model in self.related_models():
+            models.signals.post_save.disconnect(self.handle_related_change, sender=model)
+            models.signals.post_delete.disconnect(self.handle_related_change, sender=model)
+
+    def handle_related_change(self, sender, instance, **kwargs):
+        for doc in registry.get_documents():
+            if sender not in getattr(doc.django, "related_models", ()):
+                continue
+            try:
+                related = doc().get_instances_from_related(instance)
+            except ObjectDoesNotExist:
+                continue
+            if related is None:
+                continue
+            for indexed in related if isinstance(related, (list, tuple, set, models.QuerySet)) else (related,):
+                mark_dirty(indexed)
+
+    def handle_save(self, sender, instance, **kwargs):
+        mark_dirty(instance)
+
+    def handle_m2m_changed(self, sender, instance, action, model=None, pk_set=None, **kwargs):
+        if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+            return
+
+        indexed_models = {doc.django.model for doc in registry.get_documents()}
+        if action != "pre_clear" and type(instance) in indexed_models:
+            mark_dirty(instance)
+        if model not in indexed_models:
+            return
+
+        if action == "pre_clear":
+            # The cleared objects can only be told while the links still exist
+            source = next(f.name for f in sender._meta.concrete_fields if f.related_model is type(instance))
+            target = next(f.attname for f in sender._meta.concrete_fields if f.related_model is model)
+            pk_set = sender._default_manager.filter(**{source: instance.pk}).values_list(target, flat=True)
+        if action != "post_clear":
+            mark_dirty_pks(model, pk_set or ())
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        pass
+
+    def handle_delete(self, sender, instance, **kwargs):
+        mark_dirty(instance)
@@ -7,6 +7,7 @@ set "FRONTEND_DOMAIN=evibes.com"
 set "BASE_DOMAIN=evibes.com"
 set "SENTRY_DSN="
 set "DEBUG=1"
+set "SERVER_MODE=wsgi"
 
 set "ALLOWED_HOSTS=localhost 127.0.0.1 evibes.com api.evibes.com b2b.evibes.com"
 set "CSRF_TRUSTED_ORIGINS=http://api.localhost http://127.0.0.1 https://evibes.com https://api.evibes.com https://www.evibes.com https://b2b.evibes.com"
@@ -48,6 +49,7 @@ echo FRONTEND_DOMAIN="%FRONTEND_DOMAIN%"
 echo BASE_DOMAIN="%BASE_DOMAIN%"
 echo SENTRY_DSN="%SENTRY_DSN%"
 echo DEBUG=%DEBUG%
+echo SERVER_MODE="%SERVER_MODE%"
 echo.
 echo SECRET_KEY="%SECRET_KEY%"
 echo JWT_SIGNING_KEY="%JWT_SIGNING_KEY%"
@@ -7,6 +7,7 @@ FRONTEND_DOMAIN="evibes.com"
 BASE_DOMAIN="evibes.com"
 SENTRY_DSN=""
 DEBUG=1
+SERVER_MODE="wsgi"
 
 ALLOWED_HOSTS="localhost 127.0.0.1 evibes.com api.evibes.com b2b.evibes.com"
 CSRF_TRUSTED_ORIGINS="http://api.localhost http://127.0.0.1 https://evibes.com https://api.evibes.com https://www.evibes.com https://b2b.evibes.com"
@@ -50,6 +51,7 @@ FRONTEND_DOMAIN="${FRONTEND_DOMAIN}"
 BASE_DOMAIN="${BASE_DOMAIN}"
 SENTRY_DSN="${SENTRY_DSN}"
 DEBUG=${DEBUG}
+SERVER_MODE="${SERVER_MODE}"
 
 SECRET_KEY="${SECRET_KEY}"
 JWT_SIGNING_KEY="${JWT_SIGNING_KEY}"
@@ -1,11 +1,17 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 from django.utils.http import urlsafe_base64_encode
 from graphene.test import Client
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from core.graphene.schema import schema
+from evibes.middleware import GrapheneJWTAuthorizationMiddleware
 from vibes_auth.models import User
 
 
@@ -114,3 +120,41 @@ class AuthTests(TestCase):
         response = self.api_client.post(url, {"uidb64": uid, "token": token})
         self.assertEqual(response.status_code, 200)
         self.assertTrue(User.objects.get(pk=self.user.pk).is_active)
+
+
+class GrapheneJWTAuthorizationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = GrapheneJWTAuthorizationMiddleware()
+        self.user = User.objects.create_user(email="graphql@example.com", password="graphqlpassword", is_active=True)
+
+    def resolve_fields(self, request, count=5):
+        info = SimpleNamespace(context=request)
+        for _ in range(count):
+            self.middleware.resolve(lambda root, info, **args: None, None, info)
+
+    def test_user_is_resolved_once_per_request(self):
+        request = self.factory.post("/graphql/")
+
+        with patch.object(GrapheneJWTAuthorizationMiddleware, "get_jwt_user", return_value=self.user) as get_jwt_user:
+            self.resolve_fields(request)
+
+        get_jwt_user.assert_called_once_with(request)
+        self.assertEqual(request.user, self.user)
+
+    def test_valid_token_authenticates_the_user(self):
+        token = RefreshToken.for_user(self.user).access_token
+        request = self.factory.post("/graphql/", HTTP_X_EVIBES_AUTH=f"Bearer {token}")
+
+        self.resolve_fields(request)
+
+        self.assertEqual(request.user, self.user)
+
+    def test_missing_or_invalid_token_is_anonymous(self):
+        for headers in ({}, {"HTTP_X_EVIBES_AUTH": "Bearer invalid"}):
+            with self.subTest(headers=headers):
+                request = self.factory.post("/graphql/", **headers)
+
+                self.resolve_fields(request)
+
+                self.assertIsInstance(request.user, AnonymousUser)